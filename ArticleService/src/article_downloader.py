@@ -0,0 +1,227 @@
+"""
+This module defines the DownloadLedger and ArticleDownloader classes, which download the articles behind the
+stored ArticleLinks into an ArticleStore.
+"""
+
+# Standard library imports
+import datetime
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+
+from src.article_handler import ArticleLink, ArticleLinkAdapter
+from src.article_store import ArticleStore
+from src.fetch_policy import FetchPolicy
+from src.link_scraper import create_session
+from src.rate_limiter import RateLimiter
+
+try:
+    import lxml  # noqa: F401  pylint: disable=unused-import
+    TEXT_PARSER_FEATURES = 'lxml'
+except ImportError:  # pragma: no cover - depends on the environment
+    TEXT_PARSER_FEATURES = 'html.parser'
+
+BASE_URL = 'https://magic.wizards.com/'
+STATE_DONE = 'done'
+STATE_FAILED = 'failed'
+
+LEDGER_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS downloads ('
+    'url_hash TEXT PRIMARY KEY, state TEXT NOT NULL, attempts INTEGER NOT NULL, error TEXT, updated_at TEXT)'
+)
+
+
+def extract_article_text(html: bytes) -> str:
+    """
+    Extract the readable text of an article page: the text of its <article> element, or of the body if the
+    page has none, without scripts and styles and with one line per block
+    """
+    soup = BeautifulSoup(html, TEXT_PARSER_FEATURES)
+    for element in soup(['script', 'style', 'noscript', 'template']):
+        element.decompose()
+    content = soup.find('article') or soup.body or soup
+    return content.get_text('\n', strip=True)
+
+
+class DownloadLedger:
+    """
+    Fetch state of every article in a local SQLite database: whether it was downloaded, and how often and why
+    its download failed. Reruns skip downloaded articles and articles that have used up their attempts.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(LEDGER_SCHEMA)
+
+    def __enter__(self) -> 'DownloadLedger':
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the database connection
+        """
+        with self._lock:
+            self._connection.close()
+
+    def state(self, url_hash: str) -> Optional[Tuple[str, int]]:
+        """
+        Return the state and the attempts of an article, None if it was never attempted
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT state, attempts FROM downloads WHERE url_hash = ?',
+                                           (url_hash,)).fetchone()
+        return (row[0], row[1]) if row is not None else None
+
+    def is_pending(self, url_hash: str, max_attempts: int) -> bool:
+        """
+        Check whether the article still has to be downloaded
+        """
+        state = self.state(url_hash)
+        return state is None or (state[0] != STATE_DONE and state[1] < max_attempts)
+
+    def _record(self, url_hash: str, state: str, error: Optional[str]) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT INTO downloads (url_hash, state, attempts, error, updated_at) VALUES (?, ?, 1, ?, ?) '
+                'ON CONFLICT (url_hash) DO UPDATE SET state = excluded.state, attempts = attempts + 1, '
+                'error = excluded.error, updated_at = excluded.updated_at',
+                (url_hash, state, error, datetime.datetime.now().isoformat())
+            )
+
+    def mark_done(self, url_hash: str) -> None:
+        """
+        Record a successful download
+        """
+        self._record(url_hash, STATE_DONE, None)
+
+    def mark_failed(self, url_hash: str, error: str) -> None:
+        """
+        Record a failed download attempt
+        """
+        self._record(url_hash, STATE_FAILED, error)
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Return the number of articles in every state
+        """
+        with self._lock:
+            rows = self._connection.execute('SELECT state, COUNT(*) FROM downloads GROUP BY state').fetchall()
+        return dict(rows)
+
+
+class ArticleDownloader:  # pylint: disable=too-many-instance-attributes
+    """
+    Downloader of the articles behind the stored ArticleLinks.
+
+    Links are streamed from the adapter, and at most `max_concurrency` downloads run at a time on a pooled
+    keep-alive session, so memory stays bounded however many links are stored. Downloads share one rate
+    limiter and are retried according to the fetch policy. The state of every article is kept in the ledger;
+    without a ledger an article counts as pending until the store holds it.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, adapter: ArticleLinkAdapter, store: ArticleStore, ledger: Optional[DownloadLedger] = None,
+                 *, max_concurrency: int = 8, requests_per_second: Optional[float] = 2.0,
+                 session: Optional[requests.Session] = None, fetch_policy: Optional[FetchPolicy] = None,
+                 max_attempts: int = 3, base_url: str = BASE_URL) -> None:
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+        self.adapter = adapter
+        self.store = store
+        self.ledger = ledger
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self._owns_session = session is None
+        self.session = session if session is not None else create_session(max_concurrency)
+        self.fetch_policy = fetch_policy if fetch_policy is not None else FetchPolicy()
+        self.max_attempts = max_attempts
+        self.base_url = base_url
+        self.logger = logging.getLogger(__name__)
+
+    def __enter__(self) -> 'ArticleDownloader':
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the HTTP session if it was created by the downloader
+        """
+        if self._owns_session:
+            self.session.close()
+
+    def _is_pending(self, article_link: ArticleLink) -> bool:
+        if self.ledger is not None:
+            return self.ledger.is_pending(article_link.url_hash, self.max_attempts)
+        return not self.store.exists(article_link.url_hash)
+
+    def _mark_failed(self, url_hash: str, error: str) -> None:
+        if self.ledger is not None:
+            self.ledger.mark_failed(url_hash, error)
+
+    def _download(self, article_link: ArticleLink) -> bool:
+        """
+        Download, extract and store one article, returning whether it succeeded
+        """
+        url = urljoin(self.base_url, article_link.url)
+        url_hash = article_link.url_hash
+        response = self.fetch_policy.fetch(self.session, url, self.rate_limiter, timeout=60)
+        if response is None:
+            self._mark_failed(url_hash, 'fetch failed')
+            return False
+        try:
+            html = response.content
+            self.store.save(url_hash, html, extract_article_text(html))
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            self.logger.error('Failed to store article %s: %s', url, err)
+            self._mark_failed(url_hash, str(err))
+            return False
+        if self.ledger is not None:
+            self.ledger.mark_done(url_hash)
+        return True
+
+    def download_pending(self, start_date: Optional[datetime.datetime] = None,
+                         end_date: Optional[datetime.datetime] = None) -> Dict[str, float]:
+        """
+        Download every pending article, optionally only those whose links were added in the date range,
+        and return the number of downloaded, skipped and failed articles and the throughput
+        """
+        stats = {"downloaded": 0, "skipped": 0, "failed": 0}
+        start_time = time.monotonic()
+        self.logger.info('Starting article download with %s concurrent downloads', self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            running: Set['Future[bool]'] = set()
+            for article_link in self.adapter.iter_links(None, start_date, end_date):
+                if not self._is_pending(article_link):
+                    stats["skipped"] += 1
+                    continue
+                if len(running) >= self.max_concurrency:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    self._count(done, stats)
+                running.add(executor.submit(self._download, article_link))
+            self._count(wait(running).done, stats)
+        elapsed = time.monotonic() - start_time
+        result = dict(stats, elapsed_seconds=elapsed,
+                      articles_per_second=stats["downloaded"] / elapsed if elapsed > 0 else 0.0)
+        self.logger.info('Finished article download: %s', result)
+        return result
+
+    @staticmethod
+    def _count(done: Set['Future[bool]'], stats: Dict[str, int]) -> None:
+        for future in done:
+            stats["downloaded" if future.result() else "failed"] += 1
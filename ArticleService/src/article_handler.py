@@ -1,5 +1,6 @@
 """
-This module defines the ArticleLink class and ArticleLinkAdapter abstract base class.
+This module defines the ArticleLink and ArticleLinkBatch classes and the ArticleLinkAdapter and
+AsyncArticleLinkAdapter abstract base classes.
 """
 
 # Standard library imports
@@ -7,22 +8,68 @@ import abc
 import hashlib
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Set
 
 
 class ArticleLink:
     """
     Represents a link to an article with its URL, URL hash, and the time when the link was added.
+    The md5 URL hash is computed on first access unless it is passed in, e.g. from a Firestore document ID.
     """
-    def __init__(self, link_url: str, link_added_at: Optional[datetime] = None) -> None:
+    __slots__ = ('url', 'link_added_at', '_url_hash')
+
+    def __init__(self, link_url: str, link_added_at: Optional[datetime] = None,
+                 url_hash: Optional[str] = None) -> None:
         self.url = link_url
-        self.url_hash = hashlib.md5(link_url.encode()).hexdigest()
         self.link_added_at = link_added_at
+        self._url_hash = url_hash
+
+    @property
+    def url_hash(self) -> str:
+        """
+        md5 hex digest of the URL
+        """
+        if self._url_hash is None:
+            self._url_hash = hashlib.md5(self.url.encode()).hexdigest()
+        return self._url_hash
 
     def __str__(self) -> str:
         return self.url
 
 
+class ArticleLinkBatch:
+    """
+    Columnar container for many links: the URLs, their hashes and the times they were added are kept in
+    parallel lists, and ArticleLink objects are only created when the batch is iterated.
+    """
+    __slots__ = ('urls', 'link_added_at', '_url_hashes')
+
+    def __init__(self, urls: Iterable[str], link_added_at: Optional[datetime] = None,
+                 url_hashes: Optional[Iterable[str]] = None) -> None:
+        self.urls = list(urls)
+        self.link_added_at = link_added_at
+        self._url_hashes = list(url_hashes) if url_hashes is not None else None
+        if self._url_hashes is not None and len(self._url_hashes) != len(self.urls):
+            raise ValueError('urls and url_hashes must have the same length')
+
+    @property
+    def url_hashes(self) -> List[str]:
+        """
+        md5 hex digests of all URLs, computed in one pass on first access
+        """
+        if self._url_hashes is None:
+            md5 = hashlib.md5
+            self._url_hashes = [md5(url.encode()).hexdigest() for url in self.urls]
+        return self._url_hashes
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def __iter__(self) -> Iterator[ArticleLink]:
+        link_added_at = self.link_added_at
+        return (ArticleLink(url, link_added_at, url_hash) for url, url_hash in zip(self.urls, self.url_hashes))
+
+
 class ArticleLinkAdapter(abc.ABC):
     """
     Abstract base class for adapters that can save an ArticleLink and retrieve ArticleLinks.
@@ -34,7 +81,84 @@ class ArticleLinkAdapter(abc.ABC):
     def save_link(self, article_link: ArticleLink) -> None:  # pragma: no cover
         """Save an ArticleLink to the storage."""
 
+    def save_links(self, article_links: List[ArticleLink]) -> None:
+        """Save several ArticleLinks to the storage. Adapters should override this with a bulk write."""
+        for article_link in article_links:
+            self.save_link(article_link)
+
+    def flush(self) -> None:
+        """Wait until buffered writes are stored. Adapters that write synchronously have nothing to flush."""
+
+    def create_links(self, article_links: List[ArticleLink]) -> List[ArticleLink]:
+        """
+        Save the ArticleLinks that are not stored yet, leaving stored ones untouched, and return the created links.
+        Adapters should override this with an atomic create-if-absent write, as this checks and writes separately.
+        """
+        existing_hashes = self.existing_hashes([article_link.url_hash for article_link in article_links])
+        new_links = [article_link for article_link in article_links if article_link.url_hash not in existing_hashes]
+        self.save_links(new_links)
+        return new_links
+
+    def existing_hashes(self, url_hashes: List[str]) -> Set[str]:
+        """Return the given url hashes that are stored. Adapters should override this with a batched lookup."""
+        return {url_hash for url_hash in url_hashes if self.get_links(url_hash=url_hash)}
+
     @abc.abstractmethod
     def get_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
                   end_date: Optional[datetime] = None) -> List[ArticleLink]:  # pragma: no cover
         """Retrieve ArticleLinks from the storage, with optional filters for hash and date range."""
+
+    def iter_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
+                   end_date: Optional[datetime] = None) -> Iterator[ArticleLink]:
+        """Yield ArticleLinks with the filters of get_links. Adapters should override this with a paginated read."""
+        yield from self.get_links(url_hash, start_date, end_date)
+
+    def iter_link_hashes(self) -> Iterator[str]:
+        """Yield the url hash of every stored link. Adapters should override this with a keys-only read."""
+        for article_link in self.iter_links():
+            yield article_link.url_hash
+
+
+def copy_links(source: ArticleLinkAdapter, target: ArticleLinkAdapter, batch_size: int = 500) -> int:
+    """
+    Copy the links of one adapter to another, e.g. from a local SQLite run to Firestore, with create-if-absent
+    writes of batch_size links. Returns the number of links created in the target.
+    """
+    created = 0
+    batch: List[ArticleLink] = []
+    for article_link in source.iter_links():
+        batch.append(article_link)
+        if len(batch) >= batch_size:
+            created += len(target.create_links(batch))
+            batch = []
+    if batch:
+        created += len(target.create_links(batch))
+    return created
+
+
+class AsyncArticleLinkAdapter(abc.ABC):
+    """
+    Abstract base class for asyncio adapters that can save an ArticleLink and retrieve ArticleLinks.
+    """
+    def __init__(self) -> None:
+        self.logger = logging.getLogger(__name__)
+
+    @abc.abstractmethod
+    async def save_link(self, article_link: ArticleLink) -> None:  # pragma: no cover
+        """Save an ArticleLink to the storage."""
+
+    @abc.abstractmethod
+    async def get_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None) -> List[ArticleLink]:  # pragma: no cover
+        """Retrieve ArticleLinks from the storage, with optional filters for hash and date range."""
+
+    async def iter_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None) -> AsyncIterator[ArticleLink]:
+        """Yield ArticleLinks with the filters of get_links. Adapters should override this with a paginated read."""
+        for article_link in await self.get_links(url_hash, start_date, end_date):
+            yield article_link
+
+    async def iter_link_hashes(self) -> AsyncIterator[str]:
+        """Yield the url hash of every stored link. Adapters should override this with a keys-only read."""
+        async for article_link in self.iter_links():
+            yield article_link.url_hash
@@ -0,0 +1,128 @@
+"""
+This module defines the ArticleStore abstract base class with a local disk implementation and one for
+object storage buckets, which keep the downloaded HTML and extracted text of articles keyed by url hash.
+"""
+
+# Standard library imports
+import abc
+import gzip
+import logging
+import os
+from typing import Any, Optional
+
+HTML_SUFFIX = '.html.gz'
+TEXT_SUFFIX = '.txt.gz'
+
+
+class ArticleStore(abc.ABC):
+    """
+    Abstract base class for stores of downloaded articles. Both the HTML and the extracted text are stored
+    gzip compressed; the HTML is written last, so an article counts as stored once its HTML exists.
+    """
+    def __init__(self) -> None:
+        self.logger = logging.getLogger(__name__)
+
+    @abc.abstractmethod
+    def exists(self, url_hash: str) -> bool:
+        """Check whether the article is stored."""
+
+    @abc.abstractmethod
+    def save(self, url_hash: str, html: bytes, text: str) -> None:
+        """Store the HTML and the extracted text of an article."""
+
+    @abc.abstractmethod
+    def load_html(self, url_hash: str) -> Optional[bytes]:
+        """Return the decompressed HTML of an article, None if it is not stored."""
+
+    @abc.abstractmethod
+    def load_text(self, url_hash: str) -> Optional[str]:
+        """Return the extracted text of an article, None if it is not stored."""
+
+
+class LocalArticleStore(ArticleStore):
+    """
+    Store of articles in a local directory, fanned out into subdirectories by the first two characters of the
+    url hash. Files are written atomically.
+    """
+    def __init__(self, directory: str) -> None:
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url_hash: str, suffix: str) -> str:
+        return os.path.join(self.directory, url_hash[:2], url_hash + suffix)
+
+    def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as article_file:
+            article_file.write(gzip.compress(data))
+        os.replace(temp_path, path)
+
+    def _read(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, 'rb') as article_file:
+                return gzip.decompress(article_file.read())
+        except FileNotFoundError:
+            return None
+
+    def exists(self, url_hash: str) -> bool:
+        """Check whether the HTML of the article is stored."""
+        return os.path.exists(self._path(url_hash, HTML_SUFFIX))
+
+    def save(self, url_hash: str, html: bytes, text: str) -> None:
+        """Write the text and then the HTML of the article."""
+        self._write(self._path(url_hash, TEXT_SUFFIX), text.encode())
+        self._write(self._path(url_hash, HTML_SUFFIX), html)
+
+    def load_html(self, url_hash: str) -> Optional[bytes]:
+        """Return the decompressed HTML of an article, None if it is not stored."""
+        return self._read(self._path(url_hash, HTML_SUFFIX))
+
+    def load_text(self, url_hash: str) -> Optional[str]:
+        """Return the extracted text of an article, None if it is not stored."""
+        text = self._read(self._path(url_hash, TEXT_SUFFIX))
+        return text.decode() if text is not None else None
+
+
+class BucketArticleStore(ArticleStore):
+    """
+    Store of articles in an object storage bucket with the interface of `google.cloud.storage.Bucket`.
+    Objects are uploaded with `Content-Encoding: gzip`, so they are served decompressed to HTTP clients.
+    """
+    def __init__(self, bucket: Any, prefix: str = 'articles/') -> None:
+        super().__init__()
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _blob(self, url_hash: str, suffix: str) -> Any:
+        return self.bucket.blob(f'{self.prefix}{url_hash}{suffix}')
+
+    def _upload(self, url_hash: str, suffix: str, data: bytes, content_type: str) -> None:
+        blob = self._blob(url_hash, suffix)
+        blob.content_encoding = 'gzip'
+        blob.upload_from_string(gzip.compress(data), content_type=content_type)
+
+    def _download(self, url_hash: str, suffix: str) -> Optional[bytes]:
+        blob = self._blob(url_hash, suffix)
+        if not blob.exists():
+            return None
+        return gzip.decompress(blob.download_as_bytes(raw_download=True))
+
+    def exists(self, url_hash: str) -> bool:
+        """Check whether the HTML object of the article exists."""
+        return self._blob(url_hash, HTML_SUFFIX).exists()
+
+    def save(self, url_hash: str, html: bytes, text: str) -> None:
+        """Upload the text and then the HTML of the article."""
+        self._upload(url_hash, TEXT_SUFFIX, text.encode(), 'text/plain; charset=utf-8')
+        self._upload(url_hash, HTML_SUFFIX, html, 'text/html')
+
+    def load_html(self, url_hash: str) -> Optional[bytes]:
+        """Return the decompressed HTML of an article, None if it is not stored."""
+        return self._download(url_hash, HTML_SUFFIX)
+
+    def load_text(self, url_hash: str) -> Optional[str]:
+        """Return the extracted text of an article, None if it is not stored."""
+        text = self._download(url_hash, TEXT_SUFFIX)
+        return text.decode() if text is not None else None
@@ -0,0 +1,154 @@
+"""
+Module for AsyncScraper class
+"""
+
+import asyncio
+import datetime
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Deque, List, Optional, Tuple
+
+import aiohttp
+
+from src.article_handler import ArticleLink, AsyncArticleLinkAdapter
+from src.known_link_index import KnownLinkIndex
+from src.link_scraper import ARCHIVE_URL
+from src.page_parser import PageParser, create_page_parser
+from src.rate_limiter import AsyncRateLimiter
+
+
+class AsyncScraper:
+    """
+    asyncio counterpart of Scraper that overlaps page fetches and link writes on one event loop
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, adapter: AsyncArticleLinkAdapter, max_concurrency: int = 1,
+                 requests_per_second: Optional[float] = 0.5, *,
+                 session: Optional[aiohttp.ClientSession] = None, parser: Optional[PageParser] = None,
+                 archive_url: str = ARCHIVE_URL):
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        self.adapter = adapter
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = AsyncRateLimiter(requests_per_second)
+        self.session = session
+        self.parser = parser if parser is not None else create_page_parser()
+        self.archive_url = archive_url
+        self.logger = logging.getLogger(__name__)
+
+    async def _fetch_and_parse_page_content(self, session: aiohttp.ClientSession,
+                                            page_number: int) -> Optional[Any]:
+        """
+        Fetch and parse page content
+        """
+        await self.rate_limiter.acquire()
+        try:
+            async with session.get(self.archive_url.format(page_number=page_number),
+                                   timeout=aiohttp.ClientTimeout(total=60)) as response:
+                response.raise_for_status()
+                text = await response.text()
+            self.logger.info('Successfully fetched and parsed content from page number %s', page_number)
+        except aiohttp.ClientResponseError as http_err:
+            self.logger.error('HTTP error occurred: %s', http_err)
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            self.logger.error('Error occurred: %s', err)
+            return None
+
+        return self.parser.parse(text)
+
+    def _extract_links_from_soup(self, soup: Any) -> List[str]:
+        """
+        Extract links from the document produced by the parser backend
+        """
+        links = self.parser.extract_links(soup)
+        self.logger.info('Extracted %s links from the soup', len(links))
+        return links
+
+    async def _load_known_link_ids(self) -> KnownLinkIndex:
+        """
+        Load known link ids
+        """
+        known_link_ids = KnownLinkIndex()
+        async for url_hash in self.adapter.iter_link_hashes():
+            known_link_ids.add(url_hash)
+        return known_link_ids
+
+    async def _save_new_links(self, links: List[str], known_link_ids: KnownLinkIndex) -> bool:
+        """
+        Save new links, writing all new links of the page concurrently
+        """
+        found_only_new_links = True
+        new_links = []
+        for link in links:
+            link_info = ArticleLink(link_url=link, link_added_at=datetime.datetime.now())
+            if link_info.url_hash not in known_link_ids:
+                self.logger.info('Adding %s', link)
+                new_links.append(link_info)
+                known_link_ids.add(link_info.url_hash)
+            else:
+                self.logger.info('Link with Id %s already exists', link_info.url_hash)
+                found_only_new_links = False
+        await asyncio.gather(*(self.adapter.save_link(link_info) for link_info in new_links))
+        return found_only_new_links
+
+    async def _iter_fetched_pages(self, session: aiohttp.ClientSession, from_page: int,
+                                  to_page: int) -> AsyncIterator[Tuple[int, Optional[Any]]]:
+        """
+        Fetch pages with at most max_concurrency in flight and yield them in page order
+        """
+        pages = iter(range(from_page, to_page))
+        pending: Deque[Tuple[int, asyncio.Task]] = deque()
+        try:
+            for page_number in pages:
+                pending.append((page_number, asyncio.ensure_future(
+                    self._fetch_and_parse_page_content(session, page_number))))
+                if len(pending) >= self.max_concurrency:
+                    break
+            while pending:
+                page_number, task = pending.popleft()
+                soup = await task
+                next_page = next(pages, None)
+                if next_page is not None:
+                    pending.append((next_page, asyncio.ensure_future(
+                        self._fetch_and_parse_page_content(session, next_page))))
+                yield page_number, soup
+        finally:
+            for _, task in pending:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+    async def _scrape_links(self, session: aiohttp.ClientSession, from_page: int, to_page: int,
+                            stop_on_existing: bool) -> bool:
+        known_link_ids = await self._load_known_link_ids()
+        fetched_pages = self._iter_fetched_pages(session, from_page, to_page)
+        try:
+            async for i, soup in fetched_pages:
+                if soup is None:
+                    self.logger.warning('Failed to fetch and parse content from page %s', i)
+                    continue
+                links = self._extract_links_from_soup(soup)
+                only_new_link_found = await self._save_new_links(links, known_link_ids)
+                if stop_on_existing and not only_new_link_found:
+                    self.logger.info('Stopped scraping due to encountering an existing link at page %s', i)
+                    return True
+                if i % 10 == 0:
+                    self.logger.info('Page: %s', i)
+        finally:
+            await fetched_pages.aclose()
+        return False
+
+    async def scrape_links(self, from_page: int, to_page: int, stop_on_existing: bool = False) -> bool:
+        """
+        Scrape links
+        """
+        self.logger.info('Starting to scrape links from page %s to page %s', from_page, to_page)
+        if self.session is not None:
+            stopped_on_existing = await self._scrape_links(self.session, from_page, to_page, stop_on_existing)
+        else:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            async with aiohttp.ClientSession(connector=connector) as session:
+                stopped_on_existing = await self._scrape_links(session, from_page, to_page, stop_on_existing)
+        if not stopped_on_existing:
+            self.logger.info('Finished scraping links from page %s to page %s', from_page, to_page)
+        return stopped_on_existing
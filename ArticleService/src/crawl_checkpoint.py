@@ -0,0 +1,163 @@
+"""
+This module defines the CrawlCheckpoint class and the CheckpointStore abstract base class with its
+local file and Firestore implementations.
+"""
+
+# Standard library imports
+import abc
+import datetime
+import json
+import logging
+import os
+import uuid
+from typing import Any, Dict, List, Optional
+
+from google.cloud import firestore_v1
+
+
+class CrawlCheckpoint:  # pylint: disable=too-many-instance-attributes
+    """
+    Progress of a scrape_links run: the last page committed in order and the pages that failed.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, from_page: int, to_page: int, stop_on_existing: bool = False, *,
+                 run_id: Optional[str] = None, last_committed_page: Optional[int] = None,
+                 failed_pages: Optional[List[int]] = None, stopped_on_existing: bool = False,
+                 completed: bool = False) -> None:
+        self.run_id = run_id or uuid.uuid4().hex
+        self.from_page = from_page
+        self.to_page = to_page
+        self.stop_on_existing = stop_on_existing
+        self.last_committed_page = last_committed_page
+        self.failed_pages = sorted(set(failed_pages or []))
+        self.stopped_on_existing = stopped_on_existing
+        self.completed = completed
+
+    @property
+    def next_page(self) -> int:
+        """
+        First page of the range that has not been committed yet
+        """
+        if self.stopped_on_existing:
+            return self.to_page
+        if self.last_committed_page is None:
+            return self.from_page
+        return self.last_committed_page + 1
+
+    def matches(self, from_page: int, to_page: int, stop_on_existing: bool) -> bool:
+        """
+        Whether the checkpoint belongs to a run with these arguments
+        """
+        return (self.from_page, self.to_page, self.stop_on_existing) == (from_page, to_page, stop_on_existing)
+
+    def commit_page(self, page_number: int) -> None:
+        """
+        Record a page as committed
+        """
+        if page_number in self.failed_pages:
+            self.failed_pages.remove(page_number)
+        if page_number >= self.next_page:
+            self.last_committed_page = page_number
+
+    def fail_page(self, page_number: int) -> None:
+        """
+        Record a page as failed, so a resumed run retries it
+        """
+        if page_number not in self.failed_pages:
+            self.failed_pages.append(page_number)
+            self.failed_pages.sort()
+        if page_number >= self.next_page:
+            self.last_committed_page = page_number
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialise the checkpoint
+        """
+        return {
+            "run_id": self.run_id,
+            "from_page": self.from_page,
+            "to_page": self.to_page,
+            "stop_on_existing": self.stop_on_existing,
+            "last_committed_page": self.last_committed_page,
+            "failed_pages": list(self.failed_pages),
+            "stopped_on_existing": self.stopped_on_existing,
+            "completed": self.completed,
+            "updated_at": datetime.datetime.now().isoformat()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CrawlCheckpoint':
+        """
+        Deserialise a checkpoint
+        """
+        return cls(
+            data["from_page"],
+            data["to_page"],
+            data.get("stop_on_existing", False),
+            run_id=data["run_id"],
+            last_committed_page=data.get("last_committed_page"),
+            failed_pages=data.get("failed_pages"),
+            stopped_on_existing=data.get("stopped_on_existing", False),
+            completed=data.get("completed", False)
+        )
+
+
+class CheckpointStore(abc.ABC):
+    """
+    Abstract base class for durable storage of the checkpoint of a crawl.
+    """
+    def __init__(self) -> None:
+        self.logger = logging.getLogger(__name__)
+
+    @abc.abstractmethod
+    def load(self) -> Optional[CrawlCheckpoint]:  # pragma: no cover
+        """Load the stored checkpoint, if any."""
+
+    @abc.abstractmethod
+    def save(self, checkpoint: CrawlCheckpoint) -> None:  # pragma: no cover
+        """Store the checkpoint, replacing the previous one."""
+
+
+class FileCheckpointStore(CheckpointStore):
+    """
+    Checkpoint store writing JSON to a local file, replaced atomically on every save.
+    """
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+
+    def load(self) -> Optional[CrawlCheckpoint]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as checkpoint_file:
+                return CrawlCheckpoint.from_dict(json.load(checkpoint_file))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as err:
+            self.logger.warning('Ignoring unreadable checkpoint %s: %s', self.path, err)
+            return None
+
+    def save(self, checkpoint: CrawlCheckpoint) -> None:
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(checkpoint.to_dict(), checkpoint_file)
+        os.replace(temp_path, self.path)
+
+
+class FirestoreCheckpointStore(CheckpointStore):
+    """
+    Checkpoint store keeping the checkpoint in one Firestore document.
+    """
+    def __init__(self, document: firestore_v1.DocumentReference) -> None:
+        super().__init__()
+        self.document = document
+
+    def load(self) -> Optional[CrawlCheckpoint]:
+        doc = self.document.get()
+        if doc.exists:
+            data = doc.to_dict()
+            if data is not None:
+                return CrawlCheckpoint.from_dict(data)
+        return None
+
+    def save(self, checkpoint: CrawlCheckpoint) -> None:
+        self.document.set(checkpoint.to_dict())
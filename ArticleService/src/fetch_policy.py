@@ -0,0 +1,178 @@
+"""
+Module for FetchPolicy and AdaptiveRateController classes
+"""
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+from src.metrics import MetricsRegistry
+from src.rate_limiter import RateLimiter
+
+# Status codes worth another attempt: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class AdaptiveRateController:
+    """
+    Additive-increase/multiplicative-decrease controller for the requests per second of a RateLimiter.
+
+    The rate grows by `increase_step` after every response faster than `target_latency` and is
+    multiplied by `decrease_factor` on every error or throttling response, always staying between
+    `min_requests_per_second` and `max_requests_per_second`.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, min_requests_per_second: float = 0.2, max_requests_per_second: float = 5.0, *,
+                 target_latency: float = 1.0, increase_step: float = 0.05, decrease_factor: float = 0.5) -> None:
+        if not 0 < min_requests_per_second <= max_requests_per_second:
+            raise ValueError('Expected 0 < min_requests_per_second <= max_requests_per_second')
+        self.min_requests_per_second = min_requests_per_second
+        self.max_requests_per_second = max_requests_per_second
+        self.target_latency = target_latency
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def _clamp(self, requests_per_second: float) -> float:
+        return min(self.max_requests_per_second, max(self.min_requests_per_second, requests_per_second))
+
+    def on_success(self, rate_limiter: RateLimiter, latency: float) -> None:
+        """
+        Speed up after a fast response
+        """
+        if latency > self.target_latency:
+            return
+        with self._lock:
+            current = rate_limiter.requests_per_second or self.max_requests_per_second
+            rate_limiter.set_rate(self._clamp(current + self.increase_step))
+
+    def on_error(self, rate_limiter: RateLimiter) -> None:
+        """
+        Back off after an error or a throttling response
+        """
+        with self._lock:
+            current = rate_limiter.requests_per_second or self.max_requests_per_second
+            rate_limiter.set_rate(self._clamp(current * self.decrease_factor))
+            self.logger.info('Reduced request rate to %.2f requests per second', rate_limiter.requests_per_second)
+
+
+class FetchPolicy:
+    """
+    Retry policy for page fetches with jittered exponential backoff and Retry-After handling,
+    optionally driving an AdaptiveRateController.
+    """
+    def __init__(self, max_retries: int = 4, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 rate_controller: Optional[AdaptiveRateController] = None) -> None:
+        if max_retries < 0:
+            raise ValueError('max_retries must not be negative')
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_controller = rate_controller
+
+    @staticmethod
+    def is_retryable(status_code: int) -> bool:
+        """
+        Whether a response with this status code should be retried
+        """
+        return status_code in RETRYABLE_STATUS_CODES
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Parse a Retry-After header given as delay in seconds or as HTTP date into seconds from now
+        """
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before retry number `attempt + 1`: full jitter over the exponential backoff,
+        but never less than a Retry-After delay requested by the server
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def on_success(self, rate_limiter: RateLimiter, latency: float) -> None:
+        """
+        Record a successful fetch
+        """
+        if self.rate_controller is not None:
+            self.rate_controller.on_success(rate_limiter, latency)
+
+    def on_failure(self, rate_limiter: RateLimiter, retry_after: Optional[float] = None) -> None:
+        """
+        Record a failed fetch, holding back all workers if the server asked for it
+        """
+        if retry_after:
+            rate_limiter.pause(min(retry_after, self.backoff_max))
+        if self.rate_controller is not None:
+            self.rate_controller.on_error(rate_limiter)
+
+    @staticmethod
+    def _acquire(rate_limiter: RateLimiter, metrics: Optional[MetricsRegistry]) -> None:
+        waited = rate_limiter.acquire()
+        if metrics is not None:
+            metrics.observe('sleep', waited)
+
+    @staticmethod
+    def _get(session: requests.Session, url: str, metrics: Optional[MetricsRegistry],
+             request_kwargs: Dict[str, Any]) -> requests.Response:
+        if metrics is None:
+            return session.get(url, **request_kwargs)
+        with metrics.time('http'):
+            return session.get(url, **request_kwargs)
+
+    def fetch(self, session: requests.Session, url: str, rate_limiter: RateLimiter,
+              metrics: Optional[MetricsRegistry] = None, **request_kwargs: Any) -> Optional[requests.Response]:
+        """
+        GET a URL through the rate limiter, retrying transient failures. Returns None when the request fails
+        with an error that is not retryable or the retries are exhausted. With metrics, the waits are timed as
+        the sleep stage, the requests as the http stage, and retries are counted.
+        """
+        logger = logging.getLogger(__name__)
+        for attempt in range(self.max_retries + 1):
+            self._acquire(rate_limiter, metrics)
+            retry_after = None
+            start_time = time.monotonic()
+            try:
+                response = self._get(session, url, metrics, request_kwargs)
+                response.raise_for_status()
+            except requests.HTTPError as http_err:
+                logger.error('HTTP error occurred: %s', http_err)
+                error_response = http_err.response
+                if error_response is None or not self.is_retryable(error_response.status_code):
+                    return None
+                retry_after = self.parse_retry_after(error_response.headers.get('Retry-After'))
+            except requests.RequestException as err:
+                logger.error('Error occurred: %s', err)
+            else:
+                self.on_success(rate_limiter, time.monotonic() - start_time)
+                return response
+            self.on_failure(rate_limiter, retry_after)
+            if attempt < self.max_retries:
+                delay = self.backoff(attempt, retry_after)
+                logger.warning('Retrying %s in %.1f seconds (attempt %s of %s)',
+                               url, delay, attempt + 2, self.max_retries + 1)
+                if metrics is not None:
+                    metrics.inc('retries')
+                    metrics.observe('sleep', delay)
+                time.sleep(delay)
+        logger.error('Giving up on %s after %s attempts', url, self.max_retries + 1)
+        return None
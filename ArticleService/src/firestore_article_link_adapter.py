@@ -1,80 +1,296 @@
 """
 Module for Firestore Article Link Adapter
 """
+import itertools
+import threading
+import time
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Set
 
 from google.cloud import firestore_v1
+from google.cloud.firestore_v1.bulk_writer import BulkWriteFailure, BulkWriter
+from google.cloud.firestore_v1.field_path import FieldPath
 
 # Local imports
 from src.article_handler import ArticleLink, ArticleLinkAdapter
+from src.metrics import MetricsRegistry
 
+# Firestore rejects batched writes with more than 500 operations
+MAX_BATCH_SIZE = 500
+# gRPC status code of a create() on a document that already exists
+ALREADY_EXISTS = 6
+# Documents read per cursor page by iter_links
+DEFAULT_PAGE_SIZE = 1000
+# Attempts per write before a BulkWriter gives up on a transient error
+MAX_WRITE_ATTEMPTS = 5
 
-class FirestoreArticleLinkAdapter(ArticleLinkAdapter):
+
+class FirestoreArticleLinkAdapter(ArticleLinkAdapter):  # pylint: disable=too-many-instance-attributes
     """
-    Adapter to handle Article Links with Firestore
+    Adapter to handle Article Links with Firestore.
+
+    With write_behind, save_link and save_links only buffer the links and return. Duplicate url hashes are
+    coalesced in the buffer, and a background writer stores batches of batch_size links with create_links,
+    so concurrent scrapers never overwrite each other's documents. flush() and leaving the adapter as a
+    context manager wait until every buffered link is stored.
+
+    Documents read and written are counted in `metrics`, which a Scraper on the adapter shares by default.
     """
-    def __init__(self, firestore_collection: firestore_v1.CollectionReference) -> None:
+    # pylint: disable=too-many-arguments
+    def __init__(self, firestore_collection: firestore_v1.CollectionReference,
+                 batch_size: int = MAX_BATCH_SIZE, page_size: int = DEFAULT_PAGE_SIZE, *,
+                 write_behind: bool = False, flush_interval: float = 1.0,
+                 metrics: Optional[MetricsRegistry] = None) -> None:
         super().__init__()
+        if not 0 < batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f'batch_size must be between 1 and {MAX_BATCH_SIZE}')
+        if page_size < 1:
+            raise ValueError('page_size must be at least 1')
         self.collection = firestore_collection
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self._condition = threading.Condition()
+        self._pending: Dict[str, ArticleLink] = {}
+        self._in_flight = 0
+        self._flush_requests = 0
+        self._write_errors: List[Exception] = []
+        self._writer: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'FirestoreArticleLinkAdapter':
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
 
     def save_link(self, article_link: ArticleLink) -> None:
+        if self.write_behind:
+            self._enqueue([article_link])
+            return
         doc_ref = self.collection.document(article_link.url_hash)
         doc_ref.set({
             "url": article_link.url,
             "link_added_at": article_link.link_added_at
         })
+        self.metrics.inc('firestore_writes')
         self.logger.info('Successfully saved link: %s', article_link.url)
 
+    def save_links(self, article_links: List[ArticleLink]) -> None:
+        """Save ArticleLinks with one batched commit per batch_size links, or buffer them with write_behind."""
+        if self.write_behind:
+            self._enqueue(article_links)
+            return
+        for start in range(0, len(article_links), self.batch_size):
+            chunk = article_links[start:start + self.batch_size]
+            batch = self.collection._client.batch()  # pylint: disable=protected-access
+            for article_link in chunk:
+                batch.set(self.collection.document(article_link.url_hash), {
+                    "url": article_link.url,
+                    "link_added_at": article_link.link_added_at
+                })
+            batch.commit()
+            self.metrics.inc('firestore_writes', len(chunk))
+            self.logger.info('Successfully saved %s links in one batch', len(chunk))
+
+    def _enqueue(self, article_links: List[ArticleLink]) -> None:
+        with self._condition:
+            for article_link in article_links:
+                self._pending.setdefault(article_link.url_hash, article_link)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_pending, name='firestore-write-behind',
+                                                daemon=True)
+                self._writer.start()
+            self._condition.notify_all()
+
+    def _take_batch(self) -> Optional[List[ArticleLink]]:
+        """
+        Wait for buffered links and take up to batch_size of them; returns None once the adapter is closed
+        """
+        with self._condition:
+            while not self._pending and self._writer is not None:
+                self._condition.wait()
+            if not self._pending:
+                return None
+            # Give a partial batch flush_interval to fill up unless it is waited for; every enqueue notifies,
+            # so wait against a deadline
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._pending) < self.batch_size and not self._flush_requests and self._writer is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            url_hashes = list(itertools.islice(self._pending, self.batch_size))
+            batch = [self._pending.pop(url_hash) for url_hash in url_hashes]
+            self._in_flight += len(batch)
+            return batch
+
+    def _write_pending(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            try:
+                self.create_links(batch)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                self.logger.error('Failed to write %s buffered links: %s', len(batch), err)
+                with self._condition:
+                    self._write_errors.append(err)
+            finally:
+                with self._condition:
+                    self._in_flight -= len(batch)
+                    self._condition.notify_all()
+
+    def flush(self) -> None:
+        """Wait until every buffered link is stored, raising the first error of a failed background write."""
+        with self._condition:
+            self._flush_requests += 1
+            self._condition.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    self._condition.wait()
+            finally:
+                self._flush_requests -= 1
+            errors, self._write_errors = self._write_errors, []
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        """Flush the buffered links and stop the background writer."""
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                writer, self._writer = self._writer, None
+                self._condition.notify_all()
+            if writer is not None:
+                writer.join()
+
+    def create_links(self, article_links: List[ArticleLink]) -> List[ArticleLink]:
+        """
+        Create the documents of ArticleLinks with a BulkWriter, leaving existing documents untouched. Raises
+        RuntimeError if a create failed for another reason than an existing document, as BulkWriter.close()
+        does not, so a lost write is never mistaken for a link that was already stored.
+        """
+        links_by_hash = {article_link.url_hash: article_link for article_link in article_links}
+        created_links: List[ArticleLink] = []
+        conflicts: List[str] = []
+        failures: List[BulkWriteFailure] = []
+        bulk_writer = self.collection._client.bulk_writer()  # pylint: disable=protected-access
+        bulk_writer.on_write_result(
+            lambda reference, _result, _bulk_writer: created_links.append(links_by_hash[reference.id])
+        )
+        bulk_writer.on_write_error(
+            lambda failure, bulk_writer: self._retry_unless_exists(failure, bulk_writer, conflicts, failures)
+        )
+        for article_link in links_by_hash.values():
+            bulk_writer.create(self.collection.document(article_link.url_hash), {
+                "url": article_link.url,
+                "link_added_at": article_link.link_added_at
+            })
+        bulk_writer.close()
+        # Only creates that succeeded are writes, links that already existed are counted separately
+        self.metrics.inc('firestore_writes', len(created_links))
+        self.metrics.inc('firestore_create_conflicts', len(conflicts))
+        self.logger.info('Created %s of %s links', len(created_links), len(links_by_hash))
+        if failures:
+            failure = failures[0]
+            raise RuntimeError(f'Failed to create {len(failures)} of {len(links_by_hash)} links, the first '
+                               f'{failure.operation.reference.id} with code {failure.code}: {failure.message}')
+        return created_links
+
+    @staticmethod
+    def _retry_unless_exists(failure: BulkWriteFailure, _bulk_writer: BulkWriter, conflicts: List[str],
+                             failures: List[BulkWriteFailure]) -> bool:
+        if failure.code == ALREADY_EXISTS:
+            conflicts.append(failure.operation.reference.id)
+            return False
+        if failure.attempts < MAX_WRITE_ATTEMPTS:
+            return True
+        failures.append(failure)
+        return False
+
+    def existing_hashes(self, url_hashes: List[str]) -> Set[str]:
+        """Return the given url hashes that are stored, looked up with one keys-only batched get per batch_size."""
+        existing: Set[str] = set()
+        for start in range(0, len(url_hashes), self.batch_size):
+            references = [self.collection.document(url_hash) for url_hash in url_hashes[start:start + self.batch_size]]
+            # An empty field mask returns only the document names
+            for doc in self.collection._client.get_all(references, field_paths=[]):  # pylint: disable=protected-access
+                if doc.exists:
+                    existing.add(doc.id)
+            self.metrics.inc('firestore_reads', len(references))
+        return existing
+
     def get_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
                   end_date: Optional[datetime] = None) -> List[ArticleLink]:
         """Retrieve ArticleLinks from Firestore, with optional filters for hash and date range."""
+        return list(self.iter_links(url_hash, start_date, end_date))
+
+    def iter_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
+                   end_date: Optional[datetime] = None) -> Iterator[ArticleLink]:
+        """Yield ArticleLinks read in cursor pages of page_size documents, with the filters of get_links."""
         if url_hash:
-            return self._get_link_by_hash(url_hash)
+            yield from self._get_link_by_hash(url_hash)
         elif start_date and end_date:
-            return self._get_links_by_date_range(start_date, end_date)
+            yield from self._iter_links_by_date_range(start_date, end_date)
         else:
-            return self._get_all_links()
+            yield from self._iter_all_links()
 
-    def _get_all_links(self) -> List[ArticleLink]:
-        links = []
-        for doc in self.collection.stream():
-            data = doc.to_dict()
-            if data is not None and "url" in data and "link_added_at" in data:
-                link = ArticleLink(
-                    link_url=data["url"],
-                    link_added_at=data["link_added_at"]
-                )
-                links.append(link)
-        return links
+    def iter_link_hashes(self) -> Iterator[str]:
+        """Yield the url hash of every stored link, read as document IDs through a keys-only projection."""
+        query = self.collection.select([FieldPath.document_id()])
+        reads = 0
+        try:
+            for doc in query.stream():
+                reads += 1
+                yield doc.id
+        finally:
+            self.metrics.inc('firestore_reads', reads)
+
+    def _iter_query(self, query: firestore_v1.Query) -> Iterator[ArticleLink]:
+        """Run an ordered query in pages of page_size documents, continuing after the last document of a page."""
+        last_doc = None
+        while True:
+            page_query = query.limit(self.page_size)
+            if last_doc is not None:
+                page_query = page_query.start_after(last_doc)
+            docs = list(page_query.stream())
+            # Firestore bills an empty query result as one read
+            self.metrics.inc('firestore_reads', max(len(docs), 1))
+            for doc in docs:
+                data = doc.to_dict()
+                if data is not None and "url" in data and "link_added_at" in data:
+                    # The document ID is the url hash, so it does not have to be computed again
+                    yield ArticleLink(
+                        link_url=data["url"],
+                        link_added_at=data["link_added_at"],
+                        url_hash=doc.id
+                    )
+            if len(docs) < self.page_size:
+                return
+            last_doc = docs[-1]
+
+    def _iter_all_links(self) -> Iterator[ArticleLink]:
+        return self._iter_query(self.collection.order_by(FieldPath.document_id()))
 
     def _get_link_by_hash(self, url_hash: str) -> List[ArticleLink]:
         doc_ref = self.collection.document(url_hash)
         doc = doc_ref.get()  # Get the DocumentSnapshot
+        self.metrics.inc('firestore_reads')
 
         if doc.exists:  # Now you can use .exists
             data = doc.to_dict()
             if data is not None:
                 return [ArticleLink(
                     link_url=data["url"],
-                    link_added_at=data["link_added_at"]
+                    link_added_at=data["link_added_at"],
+                    url_hash=url_hash
                 )]
         return []
 
-    def _get_links_by_date_range(self, start_date: datetime, end_date: datetime) -> List[ArticleLink]:
+    def _iter_links_by_date_range(self, start_date: datetime, end_date: datetime) -> Iterator[ArticleLink]:
         self.logger.info('Retrieving links between dates: %s - %s', start_date, end_date)
-        links = []
         query = self.collection.where("link_added_at", ">=", start_date).where("link_added_at", "<=", end_date)
-        docs = query.stream()
-
-        for doc in docs:
-            if doc.exists:  # Check if the document exists
-                data = doc.to_dict()
-                if data is not None and "url" in data and "link_added_at" in data:
-                    link = ArticleLink(
-                        link_url=data["url"],
-                        link_added_at=data["link_added_at"]
-                    )
-                    links.append(link)
-
-        return links
+        return self._iter_query(query.order_by("link_added_at").order_by(FieldPath.document_id()))
@@ -0,0 +1,100 @@
+"""
+Module for Firestore Async Article Link Adapter
+"""
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from google.cloud import firestore_v1
+from google.cloud.firestore_v1.field_path import FieldPath
+
+# Local imports
+from src.article_handler import ArticleLink, AsyncArticleLinkAdapter
+from src.firestore_article_link_adapter import DEFAULT_PAGE_SIZE
+
+
+class FirestoreAsyncArticleLinkAdapter(AsyncArticleLinkAdapter):
+    """
+    Adapter to handle Article Links with the asyncio Firestore client
+    """
+    def __init__(self, firestore_collection: firestore_v1.AsyncCollectionReference,
+                 page_size: int = DEFAULT_PAGE_SIZE) -> None:
+        super().__init__()
+        if page_size < 1:
+            raise ValueError('page_size must be at least 1')
+        self.collection = firestore_collection
+        self.page_size = page_size
+
+    async def save_link(self, article_link: ArticleLink) -> None:
+        doc_ref = self.collection.document(article_link.url_hash)
+        await doc_ref.set({
+            "url": article_link.url,
+            "link_added_at": article_link.link_added_at
+        })
+        self.logger.info('Successfully saved link: %s', article_link.url)
+
+    async def get_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None) -> List[ArticleLink]:
+        """Retrieve ArticleLinks from Firestore, with optional filters for hash and date range."""
+        return [article_link async for article_link in self.iter_links(url_hash, start_date, end_date)]
+
+    async def iter_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None) -> AsyncIterator[ArticleLink]:
+        """Yield ArticleLinks read in cursor pages of page_size documents, with the filters of get_links."""
+        if url_hash:
+            for article_link in await self._get_link_by_hash(url_hash):
+                yield article_link
+        elif start_date and end_date:
+            async for article_link in self._iter_links_by_date_range(start_date, end_date):
+                yield article_link
+        else:
+            async for article_link in self._iter_all_links():
+                yield article_link
+
+    async def iter_link_hashes(self) -> AsyncIterator[str]:
+        """Yield the url hash of every stored link, read as document IDs through a keys-only projection."""
+        query = self.collection.select([FieldPath.document_id()])
+        async for doc in query.stream():
+            yield doc.id
+
+    async def _iter_query(self, query: firestore_v1.AsyncQuery) -> AsyncIterator[ArticleLink]:
+        """Run an ordered query in pages of page_size documents, continuing after the last document of a page."""
+        last_doc = None
+        while True:
+            page_query = query.limit(self.page_size)
+            if last_doc is not None:
+                page_query = page_query.start_after(last_doc)
+            docs = [doc async for doc in page_query.stream()]
+            for doc in docs:
+                data = doc.to_dict()
+                if data is not None and "url" in data and "link_added_at" in data:
+                    # The document ID is the url hash, so it does not have to be computed again
+                    yield ArticleLink(
+                        link_url=data["url"],
+                        link_added_at=data["link_added_at"],
+                        url_hash=doc.id
+                    )
+            if len(docs) < self.page_size:
+                return
+            last_doc = docs[-1]
+
+    def _iter_all_links(self) -> AsyncIterator[ArticleLink]:
+        return self._iter_query(self.collection.order_by(FieldPath.document_id()))
+
+    async def _get_link_by_hash(self, url_hash: str) -> List[ArticleLink]:
+        doc_ref = self.collection.document(url_hash)
+        doc = await doc_ref.get()
+
+        if doc.exists:
+            data = doc.to_dict()
+            if data is not None:
+                return [ArticleLink(
+                    link_url=data["url"],
+                    link_added_at=data["link_added_at"],
+                    url_hash=url_hash
+                )]
+        return []
+
+    def _iter_links_by_date_range(self, start_date: datetime, end_date: datetime) -> AsyncIterator[ArticleLink]:
+        self.logger.info('Retrieving links between dates: %s - %s', start_date, end_date)
+        query = self.collection.where("link_added_at", ">=", start_date).where("link_added_at", "<=", end_date)
+        return self._iter_query(query.order_by("link_added_at").order_by(FieldPath.document_id()))
@@ -0,0 +1,204 @@
+"""
+Module for HttpCache class
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import requests
+
+INDEX_FILE_NAME = 'index.json'
+NOT_MODIFIED = 304
+
+
+class CacheEntry:
+    """
+    Validators and content digest of a cached response body.
+    """
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], digest: str, size: int,
+                 committed: bool = False) -> None:
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.size = size
+        self.committed = committed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialise the entry
+        """
+        return {"etag": self.etag, "last_modified": self.last_modified, "digest": self.digest, "size": self.size}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CacheEntry':
+        """
+        Deserialise a committed entry
+        """
+        return cls(data.get("etag"), data.get("last_modified"), data["digest"], data["size"], committed=True)
+
+
+class HttpCache:  # pylint: disable=too-many-instance-attributes
+    """
+    Size-bounded on-disk cache of response bodies for conditional GET requests.
+
+    Requests for a cached URL send If-None-Match and If-Modified-Since. A 304 response, or a 200 response
+    whose body has the digest of the cached body, is an unchanged page. A changed body is written to a
+    temporary file, and only replaces the cached body and is used for validation once the caller commits
+    it, i.e. after the links of the page have been saved. So an interrupted run never skips a page whose
+    links were not stored, and the index on disk always matches the bodies on disk. The least recently
+    used bodies are evicted once the cached bodies exceed `max_bytes`.
+    """
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024) -> None:
+        if max_bytes < 0:
+            raise ValueError('max_bytes must not be negative')
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def _body_path(self, url: str) -> str:
+        return os.path.join(self.directory, self._key(url) + '.body')
+
+    def _entry_path(self, url: str, entry: CacheEntry) -> str:
+        # Bodies that are not committed yet are kept next to the committed body of the url
+        body_path = self._body_path(url)
+        return body_path if entry.committed else body_path + '.tmp'
+
+    def _load_index(self) -> None:
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE_NAME), 'r', encoding='utf-8') as index_file:
+                index = json.load(index_file)
+            for url, data in index.items():
+                if os.path.exists(self._body_path(url)):
+                    entry = CacheEntry.from_dict(data)
+                    self._entries[url] = entry
+                    self._size += entry.size
+        except FileNotFoundError:
+            return
+        except (ValueError, KeyError, TypeError, AttributeError) as err:
+            self.logger.warning('Ignoring unreadable HTTP cache index in %s: %s', self.directory, err)
+            self._entries.clear()
+            self._size = 0
+
+    def _save_index(self) -> None:
+        index_path = os.path.join(self.directory, INDEX_FILE_NAME)
+        temp_path = index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump({url: entry.to_dict() for url, entry in self._entries.items() if entry.committed}, index_file)
+        os.replace(temp_path, index_path)
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            url, entry = self._entries.popitem(last=False)
+            self._size -= entry.size
+            self.evictions += 1
+            body_path = self._body_path(url)
+            for path in (body_path, body_path + '.tmp'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _committed_entry(self, url: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(url)
+        return entry if entry is not None and entry.committed else None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Return the validator headers for a request of the url
+        """
+        headers = {}
+        with self._lock:
+            entry = self._committed_entry(url)
+            if entry is not None:
+                if entry.etag:
+                    headers['If-None-Match'] = entry.etag
+                if entry.last_modified:
+                    headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def is_unchanged(self, url: str, response: requests.Response) -> bool:
+        """
+        Check whether the response repeats the committed body of the url, and cache the body if it does not
+        """
+        with self._lock:
+            # A 304 answers validators taken from a committed entry, even if that entry was evicted since
+            if response.status_code == NOT_MODIFIED:
+                self.hits += 1
+                if url in self._entries:
+                    self._entries.move_to_end(url)
+                return True
+            entry = self._committed_entry(url)
+            content = response.content
+            digest = hashlib.sha256(content).hexdigest()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if entry is not None and entry.digest == digest:
+                self.hits += 1
+                entry.etag, entry.last_modified = etag, last_modified
+                self._entries.move_to_end(url)
+                return True
+            self.misses += 1
+            previous = self._entries.pop(url, None)
+            if previous is not None:
+                self._size -= previous.size
+            entry = CacheEntry(etag, last_modified, digest, len(content))
+            with open(self._entry_path(url, entry), 'wb') as body_file:
+                body_file.write(content)
+            self._entries[url] = entry
+            self._size += len(content)
+            return False
+
+    def commit(self, url: str) -> None:
+        """
+        Use the cached body of the url for validation, once the content of the page has been processed
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return
+            if not entry.committed:
+                os.replace(self._entry_path(url, entry), self._body_path(url))
+                entry.committed = True
+            self._evict()
+            self._save_index()
+
+    def read_body(self, url: str) -> Optional[bytes]:
+        """
+        Return the cached body of the url
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            with open(self._entry_path(url, entry), 'rb') as body_file:
+                return body_file.read()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the hit, miss and eviction counters and the size of the cache
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size
+            }
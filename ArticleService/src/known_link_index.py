@@ -0,0 +1,86 @@
+"""
+Module for KnownLinkIndex class
+"""
+
+import sys
+from typing import Iterable, Iterator, Set
+
+DIGEST_SIZE = 16
+
+
+class KnownLinkIndex:
+    """
+    Set of known link url hashes with O(1) membership test and insert.
+
+    The md5 hex hashes are stored as 16 byte binary digests in a built-in set, which is filled and probed
+    at C speed and needs about two thirds of the memory of a set of 32 character hex strings.
+    """
+    def __init__(self, url_hashes: Iterable[str] = ()) -> None:
+        self._digests: Set[bytes] = set()
+        self.update(url_hashes)
+
+    @staticmethod
+    def _to_digest(url_hash: str) -> bytes:
+        digest = bytes.fromhex(url_hash)
+        if len(digest) != DIGEST_SIZE:
+            raise ValueError(f'Not an md5 hex digest: {url_hash}')
+        return digest
+
+    def contains_digest(self, digest: bytes) -> bool:
+        """
+        Check whether a binary digest is known
+        """
+        return digest in self._digests
+
+    def add_digest(self, digest: bytes) -> bool:
+        """
+        Add a binary digest and return True if it was not known before
+        """
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
+
+    def update_digests(self, digests: Iterable[bytes]) -> None:
+        """
+        Add several binary digests
+        """
+        self._digests.update(digests)
+
+    def add(self, url_hash: str) -> bool:
+        """
+        Add an md5 hex hash and return True if it was not known before
+        """
+        return self.add_digest(self._to_digest(url_hash))
+
+    def update(self, url_hashes: Iterable[str]) -> None:
+        """
+        Add several md5 hex hashes
+        """
+        self._digests.update(map(self._to_digest, url_hashes))
+
+    def digests(self) -> Iterator[bytes]:
+        """
+        Iterate over the known binary digests in no particular order
+        """
+        return iter(self._digests)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the set and its digests in bytes
+        """
+        return sys.getsizeof(self._digests) + len(self._digests) * sys.getsizeof(bytes(DIGEST_SIZE))
+
+    def __contains__(self, url_hash: object) -> bool:
+        # Only 16 byte digests are stored, so anything that is not an md5 hex hash is never found
+        try:
+            return bytes.fromhex(url_hash) in self._digests
+        except (TypeError, ValueError):
+            return False
+
+    def __iter__(self) -> Iterator[str]:
+        return (digest.hex() for digest in self._digests)
+
+    def __len__(self) -> int:
+        return len(self._digests)
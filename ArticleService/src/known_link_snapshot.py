@@ -0,0 +1,136 @@
+"""
+Module for KnownLinkSnapshot class
+"""
+
+import datetime
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Optional, Tuple
+
+from src.article_handler import ArticleLinkAdapter
+from src.known_link_index import DIGEST_SIZE, KnownLinkIndex
+
+SNAPSHOT_MAGIC = b'KLS1'
+# magic, digest count, high-water mark and last reconciliation as POSIX timestamps (0 means unset)
+SNAPSHOT_HEADER = struct.Struct('<4sQdd')
+
+
+class KnownLinkSnapshot:  # pylint: disable=too-many-instance-attributes
+    """
+    Local on-disk snapshot of the known link hashes.
+
+    The file holds a fixed header followed by the sorted 16 byte digests, and is read through mmap.
+    The high-water mark is the `link_added_at` up to which the snapshot is complete: a sync only
+    queries links added since the mark. A full keys-only read of the adapter is reconciled into the
+    snapshot in a background thread once `reconcile_interval` has passed, to pick up links that were
+    written with an older `link_added_at` by other writers.
+    """
+    def __init__(self, path: str, reconcile_interval: datetime.timedelta = datetime.timedelta(days=1)) -> None:
+        self.path = path
+        self.reconcile_interval = reconcile_interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._reconcile_thread: Optional[threading.Thread] = None
+        self._sync_started_at: Optional[datetime.datetime] = None
+        self._reconciled_at: Optional[datetime.datetime] = None
+        self._reconciled_index: Optional[KnownLinkIndex] = None
+
+    @staticmethod
+    def _to_datetime(timestamp: float) -> Optional[datetime.datetime]:
+        return datetime.datetime.fromtimestamp(timestamp) if timestamp else None
+
+    @staticmethod
+    def _to_timestamp(value: Optional[datetime.datetime]) -> float:
+        return value.timestamp() if value is not None else 0.0
+
+    def load(self) -> Tuple[Optional[KnownLinkIndex], Optional[datetime.datetime], Optional[datetime.datetime]]:
+        """
+        Load the snapshot and return the index, the high-water mark and the time of the last reconciliation.
+        Returns (None, None, None) when there is no usable snapshot.
+        """
+        try:
+            with open(self.path, 'rb') as snapshot_file, \
+                    mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as digests:
+                magic, count, high_water_mark, reconciled_at = SNAPSHOT_HEADER.unpack_from(digests, 0)
+                end = SNAPSHOT_HEADER.size + count * DIGEST_SIZE
+                if magic != SNAPSHOT_MAGIC or len(digests) != end:
+                    raise ValueError('Corrupt known link snapshot')
+                index = KnownLinkIndex()
+                index.update_digests(digests[offset:offset + DIGEST_SIZE]
+                                     for offset in range(SNAPSHOT_HEADER.size, end, DIGEST_SIZE))
+        except FileNotFoundError:
+            return None, None, None
+        except (OSError, ValueError, struct.error) as err:
+            self.logger.warning('Ignoring known link snapshot %s: %s', self.path, err)
+            return None, None, None
+        self.logger.info('Loaded %s known link ids from snapshot %s', len(index), self.path)
+        return index, self._to_datetime(high_water_mark), self._to_datetime(reconciled_at)
+
+    def _write(self, index: KnownLinkIndex, high_water_mark: Optional[datetime.datetime],
+               reconciled_at: Optional[datetime.datetime]) -> None:
+        digests = sorted(index.digests())
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as snapshot_file:
+            snapshot_file.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, len(digests), self._to_timestamp(high_water_mark), self._to_timestamp(reconciled_at)
+            ))
+            snapshot_file.write(b''.join(digests))
+        os.replace(temp_path, self.path)
+
+    def sync(self, adapter: ArticleLinkAdapter) -> KnownLinkIndex:
+        """
+        Return the known link ids, loading only the links added since the high-water mark from the adapter
+        """
+        self._sync_started_at = datetime.datetime.now()
+        index, high_water_mark, reconciled_at = self.load()
+        if index is None or high_water_mark is None:
+            self.logger.info('No known link snapshot, loading all known link ids')
+            self._reconciled_at = self._sync_started_at
+            return KnownLinkIndex(adapter.iter_link_hashes())
+
+        self._reconciled_at = reconciled_at
+        for link_info in adapter.iter_links(start_date=high_water_mark, end_date=self._sync_started_at):
+            index.add(link_info.url_hash)
+        self.logger.info('Synced known link ids added since %s', high_water_mark)
+
+        if reconciled_at is None or self._sync_started_at - reconciled_at >= self.reconcile_interval:
+            self._reconcile_thread = threading.Thread(
+                target=self._reconcile, args=(adapter, self._sync_started_at), daemon=True
+            )
+            self._reconcile_thread.start()
+        return index
+
+    def _reconcile(self, adapter: ArticleLinkAdapter, started_at: datetime.datetime) -> None:
+        reconciled = KnownLinkIndex(adapter.iter_link_hashes())
+        with self._lock:
+            index, high_water_mark, _ = self.load()
+            if index is None:
+                index = reconciled
+            else:
+                index.update_digests(reconciled.digests())
+            self._reconciled_at = started_at
+            self._reconciled_index = reconciled
+            self._write(index, high_water_mark, started_at)
+        self.logger.info('Reconciled known link snapshot with %s stored link ids', len(reconciled))
+
+    def wait_for_reconcile(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until a running background reconciliation has been written
+        """
+        if self._reconcile_thread is not None:
+            self._reconcile_thread.join(timeout)
+
+    def save(self, index: KnownLinkIndex) -> None:
+        """
+        Write the known link ids with the high-water mark of the last sync, merging a finished reconciliation
+        """
+        if self._sync_started_at is None:
+            raise RuntimeError('save() requires a preceding sync()')
+        with self._lock:
+            if self._reconciled_index is not None:
+                index.update_digests(self._reconciled_index.digests())
+            self._write(index, self._sync_started_at, self._reconciled_at)
+        self.logger.info('Saved %s known link ids to snapshot %s', len(index), self.path)
@@ -0,0 +1,271 @@
+"""
+This module defines the LinkWriter abstract base class with its JSONL and Parquet implementations, the
+ExportWatermark class and export_links, which stream the stored links of an adapter into an export file.
+
+Run it as a command to export a Firestore collection:
+
+    python -m src.link_export --collection article_links --output links.jsonl.gz --watermark export.json
+"""
+
+# Standard library imports
+import abc
+import argparse
+import datetime
+import gzip
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from google.cloud import firestore_v1
+
+from src.article_handler import ArticleLink, ArticleLinkAdapter
+from src.firestore_article_link_adapter import FirestoreArticleLinkAdapter
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - depends on the environment
+    pyarrow = None  # pylint: disable=invalid-name
+
+EXPORT_FORMATS = ('jsonl', 'parquet')
+# Links buffered per Parquet row group, which bounds the memory of a Parquet export
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+
+class LinkWriter(abc.ABC):
+    """
+    Abstract base class for export files of links. The file is written to a temporary path and only moved to
+    `path` when the writer is closed, so an interrupted export never leaves a partial file behind.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.temp_path = path + '.tmp'
+        self.count = 0
+
+    def __enter__(self) -> 'LinkWriter':
+        return self
+
+    def __exit__(self, exc_type: Any, *_exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @abc.abstractmethod
+    def write(self, article_link: ArticleLink) -> None:
+        """Write one link."""
+
+    @abc.abstractmethod
+    def _close_file(self) -> None:
+        """Write the remaining buffered links and close the temporary file."""
+
+    def close(self) -> None:
+        """
+        Finish the file and move it to its path
+        """
+        self._close_file()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self) -> None:
+        """
+        Close and remove the temporary file
+        """
+        self._close_file()
+        os.remove(self.temp_path)
+
+
+class JsonlLinkWriter(LinkWriter):
+    """
+    Writer of gzip compressed JSON lines with the url hash, the url and the ISO 8601 time the link was added.
+    """
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._file = gzip.open(self.temp_path, 'wt', encoding='utf-8')
+
+    def write(self, article_link: ArticleLink) -> None:
+        link_added_at = article_link.link_added_at
+        self._file.write(json.dumps({
+            "url_hash": article_link.url_hash,
+            "url": article_link.url,
+            "link_added_at": link_added_at.isoformat() if link_added_at is not None else None
+        }) + '\n')
+        self.count += 1
+
+    def _close_file(self) -> None:
+        self._file.close()
+
+
+class ParquetLinkWriter(LinkWriter):
+    """
+    Writer of a Parquet file with the columns url_hash, url and link_added_at, written in row groups of
+    row_group_size links. Times are stored in UTC; naive times are taken as UTC, as Firestore does.
+    Requires the pyarrow package.
+    """
+    def __init__(self, path: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> None:
+        if pyarrow is None:
+            raise ImportError('ParquetLinkWriter requires the pyarrow package')
+        super().__init__(path)
+        self.row_group_size = row_group_size
+        self.schema = pyarrow.schema([
+            ('url_hash', pyarrow.string()),
+            ('url', pyarrow.string()),
+            ('link_added_at', pyarrow.timestamp('us', tz='UTC'))
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(self.temp_path, self.schema, compression='zstd')
+        self._columns: Dict[str, List[Any]] = {name: [] for name in self.schema.names}
+
+    def write(self, article_link: ArticleLink) -> None:
+        self._columns['url_hash'].append(article_link.url_hash)
+        self._columns['url'].append(article_link.url)
+        self._columns['link_added_at'].append(article_link.link_added_at)
+        self.count += 1
+        if len(self._columns['url']) >= self.row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self) -> None:
+        if self._columns['url']:
+            self._writer.write_table(pyarrow.table(self._columns, schema=self.schema))
+            self._columns = {name: [] for name in self.schema.names}
+
+    def _close_file(self) -> None:
+        try:
+            self._write_row_group()
+        finally:
+            self._writer.close()
+
+
+def create_link_writer(path: str, export_format: str = 'jsonl') -> LinkWriter:
+    """
+    Create the writer of an export format
+    """
+    if export_format == 'jsonl':
+        return JsonlLinkWriter(path)
+    if export_format == 'parquet':
+        return ParquetLinkWriter(path)
+    raise ValueError(f'Unknown export format {export_format}, expected one of {EXPORT_FORMATS}')
+
+
+class ExportWatermark:
+    """
+    Time the latest exported link was added, kept in a JSON file so the next export only adds later links.
+
+    The watermark follows link_added_at, not the time a link was stored, so links stored after an export with
+    an earlier link_added_at, e.g. by link_import from an older file, are never picked up by the next
+    incremental export. Export those with an explicit date range instead.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+
+    def load(self) -> Optional[datetime.datetime]:
+        """
+        Return the watermark, None before the first export
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as watermark_file:
+                return datetime.datetime.fromisoformat(json.load(watermark_file)["link_added_at"])
+        except FileNotFoundError:
+            return None
+
+    def save(self, link_added_at: datetime.datetime) -> None:
+        """
+        Store the watermark
+        """
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as watermark_file:
+            json.dump({"link_added_at": link_added_at.isoformat()}, watermark_file)
+        os.replace(temp_path, self.path)
+        self.logger.info('Saved export watermark %s', link_added_at)
+
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    """
+    Return a time as an aware UTC time, taking naive times as UTC like Firestore does
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+def _iter_links_after(links: Iterator[ArticleLink], watermark: Optional[datetime.datetime]) -> Iterator[ArticleLink]:
+    # The date range of the adapter includes its start, so links at the watermark were exported before
+    watermark = _as_utc(watermark) if watermark is not None else None
+    for article_link in links:
+        if watermark is None or (article_link.link_added_at is not None
+                                 and _as_utc(article_link.link_added_at) > watermark):
+            yield article_link
+
+
+def export_links(adapter: ArticleLinkAdapter, path: str, *,  # pylint: disable=too-many-arguments
+                 export_format: str = 'jsonl', start_date: Optional[datetime.datetime] = None,
+                 end_date: Optional[datetime.datetime] = None,
+                 watermark: Optional[ExportWatermark] = None) -> Dict[str, Any]:
+    """
+    Stream the links of the adapter into an export file and return the number of exported links and the
+    throughput. Links are read in the pages of iter_links and written one by one, so memory stays constant.
+
+    With start_date and end_date only links added in that range are exported. With a watermark, only links
+    added after the previous export are exported and the watermark is moved to the latest exported link.
+    Naive and aware times are compared in UTC, naive times being taken as UTC.
+    """
+    logger = logging.getLogger(__name__)
+    since = watermark.load() if watermark is not None else None
+    if since is not None and (start_date is None or _as_utc(since) > _as_utc(start_date)):
+        # Keep a naive start naive, the adapter compares it with the stored times
+        if start_date is None or start_date.tzinfo is not None:
+            start_date = since
+        else:
+            start_date = _as_utc(since).replace(tzinfo=None)
+    # The adapters filter by date only with both bounds
+    if start_date is not None and end_date is None:
+        end_date = datetime.datetime.now(start_date.tzinfo)
+    elif start_date is None and end_date is not None:
+        start_date = datetime.datetime.min.replace(tzinfo=end_date.tzinfo)
+    latest = since
+    start_time = time.monotonic()
+    logger.info('Exporting links added between %s and %s to %s', start_date, end_date, path)
+    with create_link_writer(path, export_format) as writer:
+        for article_link in _iter_links_after(adapter.iter_links(None, start_date, end_date), since):
+            writer.write(article_link)
+            if article_link.link_added_at is not None and (
+                    latest is None or _as_utc(article_link.link_added_at) > _as_utc(latest)):
+                latest = article_link.link_added_at
+    elapsed = time.monotonic() - start_time
+    if watermark is not None and latest is not None and latest != since:
+        watermark.save(latest)
+    stats = {
+        "exported": writer.count,
+        "elapsed_seconds": elapsed,
+        "docs_per_second": writer.count / elapsed if elapsed > 0 else 0.0,
+        "watermark": latest.isoformat() if latest is not None else None
+    }
+    logger.info('Finished export to %s: %s', path, stats)
+    return stats
+
+
+def main() -> None:
+    """
+    Export a Firestore collection of links
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--collection', required=True, help='Firestore collection of the links')
+    arg_parser.add_argument('--output', required=True, help='Path of the export file')
+    arg_parser.add_argument('--format', choices=EXPORT_FORMATS, default='jsonl')
+    arg_parser.add_argument('--start', type=datetime.datetime.fromisoformat, help='Earliest link_added_at')
+    arg_parser.add_argument('--end', type=datetime.datetime.fromisoformat, help='Latest link_added_at')
+    arg_parser.add_argument('--watermark', help='JSON file of the watermark for incremental exports. The watermark is '
+                            'the latest link_added_at, so links imported later with older times are not exported')
+    arg_parser.add_argument('--page-size', type=int, default=1000, help='Documents read per cursor page')
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    adapter = FirestoreArticleLinkAdapter(firestore_v1.Client().collection(args.collection), page_size=args.page_size)
+    stats = export_links(adapter, args.output, export_format=args.format, start_date=args.start, end_date=args.end,
+                         watermark=ExportWatermark(args.watermark) if args.watermark else None)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+This module defines the ImportProgress and LinkImporter classes and read_link_records, which bulk import links
+from JSONL or CSV files into an adapter, e.g. to seed a new environment or to restore an export.
+
+Run it as a command to import into a Firestore collection:
+
+    python -m src.link_import --collection article_links --input links.jsonl.gz --progress import.json
+"""
+
+# Standard library imports
+import argparse
+import csv
+import datetime
+import gzip
+import itertools
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from google.cloud import firestore_v1
+
+from src.article_handler import ArticleLink, ArticleLinkAdapter, ArticleLinkBatch
+from src.firestore_article_link_adapter import MAX_BATCH_SIZE, FirestoreArticleLinkAdapter
+
+IMPORT_FORMATS = ('jsonl', 'csv')
+
+# A url and the time it was added, if the file has one
+LinkRecord = Tuple[str, Optional[datetime.datetime]]
+
+
+def detect_format(path: str) -> str:
+    """
+    Return the import format of a file from its extension, ignoring a .gz suffix
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.json')):
+        return 'jsonl'
+    raise ValueError(f'Cannot detect the import format of {path}, expected one of {IMPORT_FORMATS}')
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime.datetime]:
+    return datetime.datetime.fromisoformat(value) if value else None
+
+
+def _open_text(path: str) -> IO[str]:
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')  # pylint: disable=consider-using-with
+
+
+def _iter_csv_records(input_file: IO[str]) -> Iterator[LinkRecord]:
+    rows = csv.reader(input_file)
+    first_row = next(rows, None)
+    if first_row is None:
+        return
+    # Files with a header name their columns, files without one hold the url and the optional time
+    columns = [column.strip().lower() for column in first_row]
+    if 'url' in columns:
+        url_index = columns.index('url')
+        time_index = columns.index('link_added_at') if 'link_added_at' in columns else None
+    else:
+        url_index, time_index = 0, 1
+        rows = itertools.chain([first_row], rows)
+    for row in rows:
+        if len(row) > url_index and row[url_index].strip():
+            link_added_at = row[time_index].strip() if time_index is not None and len(row) > time_index else None
+            yield row[url_index].strip(), _parse_time(link_added_at)
+
+
+def _iter_jsonl_records(input_file: IO[str]) -> Iterator[LinkRecord]:
+    for line in input_file:
+        if line.strip():
+            record = json.loads(line)
+            yield record["url"], _parse_time(record.get("link_added_at"))
+
+
+def read_link_records(path: str, import_format: Optional[str] = None) -> Iterator[LinkRecord]:
+    """
+    Stream the urls and optional ISO 8601 times of the links in a JSONL file with the fields url and
+    link_added_at, as written by link_export, or in a CSV file with the columns url and link_added_at.
+    Files ending in .gz are decompressed.
+    """
+    import_format = import_format or detect_format(path)
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(f'Unknown import format {import_format}, expected one of {IMPORT_FORMATS}')
+    with _open_text(path) as input_file:
+        if import_format == 'csv':
+            yield from _iter_csv_records(input_file)
+        else:
+            yield from _iter_jsonl_records(input_file)
+
+
+class ImportProgress:
+    """
+    Progress of an import in a JSON file: the number of records of the input file whose links are stored,
+    and the counters of the import so far. A rerun of the same input continues after those records.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+
+    def load(self, input_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the progress of an earlier import of the input file, None if there is none
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as progress_file:
+                progress = json.load(progress_file)
+        except FileNotFoundError:
+            return None
+        if progress.get("input") != os.path.abspath(input_path):
+            self.logger.info('Ignoring progress of another input file in %s', self.path)
+            return None
+        return progress
+
+    def save(self, input_path: str, stats: Dict[str, Any]) -> None:
+        """
+        Store the progress of the import of the input file
+        """
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as progress_file:
+            json.dump(dict(stats, input=os.path.abspath(input_path)), progress_file)
+        os.replace(temp_path, self.path)
+
+
+class LinkImporter:
+    """
+    Bulk importer of links from files.
+
+    Records are read in batches of batch_size. The url hashes of a batch are computed in one pass, links that
+    appear earlier in the file are dropped, and the remaining links are written with the create-if-absent
+    create_links of the adapter, so links that are already stored, also by a concurrent scraper, are left
+    untouched. Up to write_workers batches are written in parallel. Batches are recorded in the progress file
+    in file order once they are committed and the adapter is flushed, so an interrupted import continues after
+    the last batch whose predecessors are all stored.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, adapter: ArticleLinkAdapter, *, batch_size: int = MAX_BATCH_SIZE, write_workers: int = 8,
+                 progress: Optional[ImportProgress] = None, report_every: int = 10000) -> None:
+        if batch_size < 1 or write_workers < 1:
+            raise ValueError('batch_size and write_workers must be at least 1')
+        self.adapter = adapter
+        self.batch_size = batch_size
+        self.write_workers = write_workers
+        self.progress = progress
+        self.report_every = report_every
+        self.logger = logging.getLogger(__name__)
+
+    def _hash_batch(self, records: List[LinkRecord], seen_hashes: Set[str],
+                    default_time: datetime.datetime) -> List[ArticleLink]:
+        """
+        Create the ArticleLinks of a batch, dropping links whose url hash was seen before in the file
+        """
+        url_hashes = ArticleLinkBatch(url for url, _ in records).url_hashes
+        links = []
+        for (url, link_added_at), url_hash in zip(records, url_hashes):
+            if url_hash not in seen_hashes:
+                seen_hashes.add(url_hash)
+                links.append(ArticleLink(url, link_added_at or default_time, url_hash=url_hash))
+        return links
+
+    def _write_batch(self, links: List[ArticleLink]) -> int:
+        """
+        Create the links of a batch that are not stored yet and return how many were created
+        """
+        return len(self.adapter.create_links(links)) if links else 0
+
+    def _complete_batch(self, batch: Tuple[int, int, 'Future[int]'], stats: Dict[str, Any], path: str,
+                        start_time: float) -> None:
+        record_count, link_count, future = batch
+        imported = future.result()
+        stats["records"] += record_count
+        stats["imported"] += imported
+        stats["existing"] += link_count - imported
+        stats["duplicates"] += record_count - link_count
+        if self.progress is not None:
+            # Buffered writes of the adapter must be stored before the batch counts as done
+            self.adapter.flush()
+            self.progress.save(path, stats)
+        if stats["records"] // self.report_every > (stats["records"] - record_count) // self.report_every:
+            elapsed = time.monotonic() - start_time
+            self.logger.info('Imported %s of %s records, %s already stored (%.0f records/s)', stats["imported"],
+                             stats["records"], stats["existing"],
+                             (stats["records"] - stats["resumed_from"]) / elapsed if elapsed > 0 else 0.0)
+
+    def import_file(self, path: str, import_format: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Import the links of a file, continuing an interrupted import of it if a progress file is configured,
+        and return the counters and the throughput
+        """
+        stats: Dict[str, Any] = {"records": 0, "imported": 0, "existing": 0, "duplicates": 0}
+        if self.progress is not None:
+            stats.update({key: value for key, value in (self.progress.load(path) or {}).items() if key in stats})
+        stats["resumed_from"] = stats["records"]
+        records = itertools.islice(read_link_records(path, import_format), stats["records"], None)
+        default_time = datetime.datetime.now()
+        seen_hashes: Set[str] = set()
+        start_time = time.monotonic()
+        self.logger.info('Importing links from %s after record %s', path, stats["records"])
+        with ThreadPoolExecutor(max_workers=self.write_workers) as executor:
+            pending: Deque[Tuple[int, int, 'Future[int]']] = deque()
+            while True:
+                batch_records = list(itertools.islice(records, self.batch_size))
+                if not batch_records:
+                    break
+                links = self._hash_batch(batch_records, seen_hashes, default_time)
+                pending.append((len(batch_records), len(links), executor.submit(self._write_batch, links)))
+                if len(pending) >= self.write_workers:
+                    self._complete_batch(pending.popleft(), stats, path, start_time)
+            while pending:
+                self._complete_batch(pending.popleft(), stats, path, start_time)
+        self.adapter.flush()
+        elapsed = time.monotonic() - start_time
+        stats["elapsed_seconds"] = elapsed
+        stats["records_per_second"] = (stats["records"] - stats["resumed_from"]) / elapsed if elapsed > 0 else 0.0
+        self.logger.info('Finished import from %s: %s', path, stats)
+        return stats
+
+
+def main() -> None:
+    """
+    Import links from a file into a Firestore collection
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--collection', required=True, help='Firestore collection of the links')
+    arg_parser.add_argument('--input', required=True, help='JSONL or CSV file of the links, optionally gzipped')
+    arg_parser.add_argument('--format', choices=IMPORT_FORMATS, help='Format of the input, from its extension if unset')
+    arg_parser.add_argument('--batch-size', type=int, default=MAX_BATCH_SIZE, help='Links per lookup and commit')
+    arg_parser.add_argument('--workers', type=int, default=8, help='Batches committed in parallel')
+    arg_parser.add_argument('--progress', help='JSON file of the progress, to resume an interrupted import')
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    adapter = FirestoreArticleLinkAdapter(firestore_v1.Client().collection(args.collection),
+                                          batch_size=min(args.batch_size, MAX_BATCH_SIZE))
+    importer = LinkImporter(adapter, batch_size=args.batch_size, write_workers=args.workers,
+                            progress=ImportProgress(args.progress) if args.progress else None)
+    print(json.dumps(importer.import_file(args.input, args.format), indent=2))
+
+
+if __name__ == '__main__':
+    main()
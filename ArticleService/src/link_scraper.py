@@ -2,121 +2,444 @@
 Module for Scraper class
 """
 
+import contextlib
 import datetime
+import itertools
+import json
 import logging
-import time
-from typing import List, Optional
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, ContextManager, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
 
-from src.article_handler import ArticleLink
-from src.firestore_article_link_adapter import FirestoreArticleLinkAdapter
+from src.article_handler import ArticleLink, ArticleLinkAdapter, ArticleLinkBatch
+from src.crawl_checkpoint import CheckpointStore, CrawlCheckpoint
+from src.fetch_policy import FetchPolicy
+# Re-exported, callers import the Firestore adapter together with the Scraper
+from src.firestore_article_link_adapter import FirestoreArticleLinkAdapter  # noqa: F401  pylint: disable=unused-import
+from src.http_cache import HttpCache
+from src.known_link_index import KnownLinkIndex
+from src.known_link_snapshot import KnownLinkSnapshot
+from src.metrics import MetricsRegistry
+from src.page_fingerprints import PageFingerprints, fingerprint_links
+from src.page_parser import PageParser, create_page_parser
+from src.profiling import RunProfiler, profiled
+from src.rate_limiter import RateLimiter
 
 
-class Scraper:
+ARCHIVE_URL = (
+    'https://magic.wizards.com/en/news/archive?search&page={page_number}'
+    '&category=all&author=all&order=newest'
+)
+# Returned instead of a parsed document for pages the HTTP cache reports as unchanged
+PAGE_UNCHANGED = object()
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """
+    Create a keep-alive session whose connection pool holds up to `pool_size` connections per host.
+    Compressed responses are negotiated for every encoding urllib3 can decode (brotli if installed).
+    """
+    session = requests.Session()
+    http_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+    session.mount('https://', http_adapter)
+    session.mount('http://', http_adapter)
+    session.headers.update({
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive'
+    })
+    return session
+
+
+class Scraper:  # pylint: disable=too-many-instance-attributes
     """
     Class for Scraping web pages
     """
-    def __init__(self, adapter: FirestoreArticleLinkAdapter):
+    # pylint: disable=too-many-arguments,too-many-locals
+    def __init__(self, adapter: ArticleLinkAdapter, max_workers: int = 1,
+                 requests_per_second: Optional[float] = 0.5, *, session: Optional[requests.Session] = None,
+                 pool_size: Optional[int] = None, snapshot: Optional[KnownLinkSnapshot] = None,
+                 parser: Optional[PageParser] = None, archive_url: str = ARCHIVE_URL,
+                 fetch_policy: Optional[FetchPolicy] = None, checkpoint_store: Optional[CheckpointStore] = None,
+                 create_if_absent: bool = False, http_cache: Optional[HttpCache] = None,
+                 page_fingerprints: Optional[PageFingerprints] = None, metrics: Optional[MetricsRegistry] = None,
+                 profiler: Optional[RunProfiler] = None):
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1')
         self.adapter = adapter
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self._owns_session = session is None
+        self.session = session if session is not None else create_session(pool_size or max_workers)
+        self.snapshot = snapshot
+        self.parser = parser if parser is not None else create_page_parser()
+        self.archive_url = archive_url
+        self.fetch_policy = fetch_policy if fetch_policy is not None else FetchPolicy()
+        self.checkpoint_store = checkpoint_store
+        self.create_if_absent = create_if_absent
+        self.http_cache = http_cache
+        self.page_fingerprints = page_fingerprints
+        self.metrics = metrics if metrics is not None else self._default_metrics(adapter)
+        # Profiling is opt-in, through the parameter or the ARTICLE_SERVICE_PROFILE_DIR environment variable
+        self.profiler = profiler if profiler is not None else RunProfiler.from_env()
+        self._run_start_metrics = self.metrics.snapshot()
+        self.last_run_metrics: Optional[Dict[str, Any]] = None
+        self._index_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
 
-    def _fetch_and_parse_page_content(self, page_number: int) -> Optional[BeautifulSoup]:
+    @staticmethod
+    def _default_metrics(adapter: ArticleLinkAdapter) -> MetricsRegistry:
         """
-        Fetch and parse page content
+        Share the metrics registry of the adapter if it has one, so one summary covers the run
         """
-        time.sleep(2)
-        response = None
-        try:
-            response = requests.get(
-                (
-                    f'https://magic.wizards.com/en/news/archive?search&page={page_number}'
-                    f'&category=all&author=all&order=newest'
-                ),
-                timeout=60
-            )
-            response.raise_for_status()
-            self.logger.info('Successfully fetched and parsed content from page number %s', page_number)
-        except requests.HTTPError as http_err:
-            self.logger.error('HTTP error occurred: %s', http_err)
-        except requests.RequestException as err:
-            self.logger.error('Error occurred: %s', err)
-
-        if response is not None:
-            return BeautifulSoup(response.text, 'html.parser')
-        else:
+        adapter_metrics = getattr(adapter, 'metrics', None)
+        return adapter_metrics if isinstance(adapter_metrics, MetricsRegistry) else MetricsRegistry()
+
+    def __enter__(self) -> 'Scraper':
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the HTTP session if it was created by the scraper
+        """
+        if self._owns_session:
+            self.session.close()
+
+    def _profile(self, page_number: Optional[int] = None) -> ContextManager[None]:
+        """
+        Profile a page, or the block if no page number is given, when a profiler is configured
+        """
+        return self.profiler.profile(page_number) if self.profiler is not None else contextlib.nullcontext()
+
+    def _fetch_page_response(self, page_number: int) -> Optional[requests.Response]:
+        """
+        Fetch an archive page, retrying transient failures according to the fetch policy
+        """
+        url = self.archive_url.format(page_number=page_number)
+        request_kwargs: Dict[str, Any] = {'timeout': 60}
+        if self.http_cache is not None:
+            request_kwargs['headers'] = self.http_cache.conditional_headers(url)
+        return self.fetch_policy.fetch(self.session, url, self.rate_limiter, self.metrics, **request_kwargs)
+
+    def _fetch_page_text(self, page_number: int) -> Optional[Any]:
+        """
+        Fetch the HTML of a page, or return PAGE_UNCHANGED when the HTTP cache has the page
+        """
+        response = self._fetch_page_response(page_number)
+        if response is None:
+            self.metrics.inc('page_failures')
             return None
+        self.metrics.inc('pages')
+        if self.http_cache is not None and self.http_cache.is_unchanged(
+                self.archive_url.format(page_number=page_number), response):
+            self.logger.info('Page number %s is unchanged, skipping parsing', page_number)
+            return PAGE_UNCHANGED
+        return response.text
+
+    def _fetch_and_parse_page_content(self, page_number: int) -> Optional[Any]:
+        """
+        Fetch and parse page content, or return PAGE_UNCHANGED without parsing when the HTTP cache has the page
+        """
+        with self._profile(page_number):
+            text = self._fetch_page_text(page_number)
+            if text is None or text is PAGE_UNCHANGED:
+                return text
+            with self.metrics.time('parse'):
+                soup = self.parser.parse(text)
+        self.logger.info('Successfully fetched and parsed content from page number %s', page_number)
+        return soup
 
-    def _extract_links_from_soup(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_links_from_soup(self, soup: Any) -> List[str]:
         """
-        Extract links from BeautifulSoup object
+        Extract links from the document produced by the parser backend
         """
-        links = []
-        entry_list = soup.find_all("article", class_="css-415ug css-o3Y69")
-        for entry in entry_list:
-            link_tag = entry.find("a", href=True)
-            if link_tag:
-                link_path = link_tag.get('href')
-                if link_path.startswith("/"):
-                    links.append('https://magic.wizards.com' + link_path)
+        with self.metrics.time('extract'):
+            links = self.parser.extract_links(soup)
         self.logger.info('Extracted %s links from the soup', len(links))
         return links
 
-    def _create_link_info(self, link: str) -> ArticleLink:
+    def _create_link_info(self, link: str, url_hash: Optional[str] = None) -> ArticleLink:
         """
         Create link info
         """
         return ArticleLink(
             link_url=link,
-            link_added_at=datetime.datetime.now()
+            link_added_at=datetime.datetime.now(),
+            url_hash=url_hash
         )
 
-    def _load_known_link_ids(self) -> List[str]:
+    def _load_known_link_ids(self) -> KnownLinkIndex:
         """
-        Load known link ids
+        Start a run: take a snapshot of the metrics for the run summary and load known link ids,
+        incrementally through the local snapshot if one is configured
         """
-        known_link_ids = []
-        link_list = self.adapter.get_links()
-        for link_info in link_list:
-            known_link_ids.append(link_info.url_hash)
-        return known_link_ids
+        self._run_start_metrics = self.metrics.snapshot()
+        with self._profile():
+            if self.snapshot is not None:
+                return self.snapshot.sync(self.adapter)
+            return KnownLinkIndex(self.adapter.iter_link_hashes())
 
-    def _save_new_links(self, links: List[str], known_link_ids: List[str]) -> bool:
+    def _save_new_links(self, links: List[str], known_link_ids: KnownLinkIndex) -> bool:
         """
-        Save new links
+        Save new links, flushing the new links of the page with one bulk write. With create_if_absent, links
+        that a concurrent writer stored first are left untouched and count as existing links.
         """
         found_only_new_links = True
-        for link in links:
-            link_info = self._create_link_info(link)
-            if link_info.url_hash not in known_link_ids:
-                self.logger.info('Adding %s', link)
-                self.adapter.save_link(link_info)
-                known_link_ids.append(link_info.url_hash)
-            else:
-                self.logger.info('Link with Id %s already exists', link_info.url_hash)
+        new_links = []
+        with self.metrics.time('dedup'):
+            # Hash the links of the page in one pass and only create ArticleLinks for the new ones
+            url_hashes = ArticleLinkBatch(links).url_hashes
+            with self._index_lock:
+                for link, url_hash in zip(links, url_hashes):
+                    if url_hash not in known_link_ids:
+                        self.logger.info('Adding %s', link)
+                        new_links.append(self._create_link_info(link, url_hash))
+                        known_link_ids.add(url_hash)
+                    else:
+                        self.logger.info('Link with Id %s already exists', url_hash)
+                        found_only_new_links = False
+        stored_links = len(new_links)
+        if new_links and self.create_if_absent:
+            with self.metrics.time('write'):
+                stored_links = len(self.adapter.create_links(new_links))
+            if stored_links < len(new_links):
+                self.logger.info('%s links were already stored by another writer', len(new_links) - stored_links)
                 found_only_new_links = False
+        elif new_links:
+            with self.metrics.time('write'):
+                self.adapter.save_links(new_links)
+        self.metrics.inc('links_new', stored_links)
+        self.metrics.inc('links_duplicate', len(links) - stored_links)
         return found_only_new_links
 
-    def scrape_links(self, from_page: int, to_page: int, stop_on_existing: bool = False) -> bool:
+    def _save_snapshot(self, known_link_ids: KnownLinkIndex) -> None:
+        """
+        Persist the known link ids of a completed run to the local snapshot if one is configured
+        """
+        if self.snapshot is not None:
+            self.snapshot.save(known_link_ids)
+
+    def _finish_run(self, known_link_ids: KnownLinkIndex) -> None:
+        """
+        Wait for buffered writes of the adapter, then persist the snapshot and the page fingerprints and log
+        the metrics summary of the run
+        """
+        self.adapter.flush()
+        self._save_snapshot(known_link_ids)
+        if self.page_fingerprints is not None:
+            self.page_fingerprints.save()
+        # The registry may be shared with the adapter and outlive the run, so only the run's values are reported
+        self.last_run_metrics = self.metrics.since(self._run_start_metrics).summary()
+        self.logger.info('Run metrics: %s', json.dumps(self.last_run_metrics, sort_keys=True))
+
+    def _iter_fetched_pages(self, executor: ThreadPoolExecutor,
+                            page_numbers: Iterable[int]) -> Iterator[Tuple[int, Optional[Any]]]:
         """
-        Scrape links
+        Fetch pages with at most max_workers in flight and yield them in the given order
+        """
+        pages = iter(page_numbers)
+        pending: Deque[Tuple[int, Future]] = deque()
+        try:
+            for page_number in pages:
+                pending.append((page_number, executor.submit(self._fetch_and_parse_page_content, page_number)))
+                if len(pending) >= self.max_workers:
+                    break
+            while pending:
+                page_number, future = pending.popleft()
+                soup = future.result()
+                next_page = next(pages, None)
+                if next_page is not None:
+                    pending.append((next_page, executor.submit(self._fetch_and_parse_page_content, next_page)))
+                yield page_number, soup
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _start_checkpoint(self, from_page: int, to_page: int, stop_on_existing: bool,
+                          resume: bool) -> Optional[CrawlCheckpoint]:
+        """
+        Load the checkpoint of an interrupted run to resume, or start a new one
+        """
+        if self.checkpoint_store is None:
+            if resume:
+                raise ValueError('resume=True requires a checkpoint_store')
+            return None
+        checkpoint = self.checkpoint_store.load() if resume else None
+        if checkpoint is not None and checkpoint.matches(from_page, to_page, stop_on_existing) and (
+                not checkpoint.completed or checkpoint.failed_pages):
+            self.logger.info('Resuming run %s at page %s, retrying failed pages %s',
+                             checkpoint.run_id, checkpoint.next_page, checkpoint.failed_pages)
+            checkpoint.completed = False
+            return checkpoint
+        if resume:
+            self.logger.info('No unfinished run to resume from page %s to page %s', from_page, to_page)
+        return CrawlCheckpoint(from_page, to_page, stop_on_existing)
+
+    def _save_checkpoint(self, checkpoint: Optional[CrawlCheckpoint]) -> None:
+        if checkpoint is not None:
+            # Pages only count as committed once the adapter has stored their links
+            self.adapter.flush()
+            self.checkpoint_store.save(checkpoint)
+
+    def _save_page_links(self, page_number: int, soup: Any, known_link_ids: KnownLinkIndex) -> bool:
+        """
+        Save the new links of a parsed page unless the HTTP cache or the page fingerprint shows that the page
+        is unchanged. Returns whether only new links were found; an unchanged page counts as existing links.
+        """
+        if soup is PAGE_UNCHANGED:
+            # The links of an unchanged page were saved when its cached body was committed
+            return False
+        with self._profile(page_number):
+            return self._save_extracted_links(page_number, self._extract_links_from_soup(soup), known_link_ids)
+
+    def _save_extracted_links(self, page_number: int, links: List[str], known_link_ids: KnownLinkIndex) -> bool:
+        """
+        Save the new links extracted from a page unless they match the page fingerprint, and commit the page to
+        the HTTP cache. Safe to call from several threads.
+        """
+        self.metrics.inc('links_found', len(links))
+        fingerprint = fingerprint_links(links) if self.page_fingerprints is not None else None
+        if fingerprint is not None and self.page_fingerprints.matches(page_number, fingerprint):
+            self.logger.info('Links of page %s are unchanged, skipping', page_number)
+            return False
+        only_new_link_found = self._save_new_links(links, known_link_ids)
+        if fingerprint is not None or self.http_cache is not None:
+            # The page may only be skipped by later runs once its links are stored
+            self.adapter.flush()
+        if fingerprint is not None:
+            self.page_fingerprints.record(page_number, fingerprint)
+        if self.http_cache is not None:
+            self.http_cache.commit(self.archive_url.format(page_number=page_number))
+        return only_new_link_found
+
+    def _commit_page(self, page_number: int, soup: Optional[Any], known_link_ids: KnownLinkIndex,
+                     checkpoint: Optional[CrawlCheckpoint]) -> bool:
+        """
+        Save the new links of a fetched page and record the page in the checkpoint.
+        Returns whether only new links were found.
+        """
+        if soup is None:
+            self.logger.warning('Failed to fetch and parse content from page %s', page_number)
+            if checkpoint is not None:
+                checkpoint.fail_page(page_number)
+                self._save_checkpoint(checkpoint)
+            return True
+        only_new_link_found = self._save_page_links(page_number, soup, known_link_ids)
+        if checkpoint is not None:
+            checkpoint.commit_page(page_number)
+            self._save_checkpoint(checkpoint)
+        return only_new_link_found
+
+    @profiled('scrape_links')
+    def scrape_links(self, from_page: int, to_page: int, stop_on_existing: bool = False,
+                     resume: bool = False) -> bool:
+        """
+        Scrape links. With a checkpoint store, progress is recorded after every page and resume=True
+        continues an interrupted run after its last committed page, retrying only the pages that failed.
         """
         stopped_on_existing = False
         self.logger.info('Starting to scrape links from page %s to page %s', from_page, to_page)
+        checkpoint = self._start_checkpoint(from_page, to_page, stop_on_existing, resume)
+        retry_pages = list(checkpoint.failed_pages) if checkpoint is not None else []
         known_link_ids = self._load_known_link_ids()
-        for i in range(from_page, to_page):
-            soup = self._fetch_and_parse_page_content(i)
-            if soup is None:
-                self.logger.warning('Failed to fetch and parse content from page %s', i)
-                continue
-            links = self._extract_links_from_soup(soup)
-            only_new_link_found = self._save_new_links(links, known_link_ids)
-            if stop_on_existing and not only_new_link_found:
-                self.logger.info('Stopped scraping due to encountering an existing link at page %s', i)
-                stopped_on_existing = True
-                return stopped_on_existing
-            if i % 10 == 0:
-                self.logger.info('Page: %s', i)
-        self.logger.info('Finished scraping links from page %s to page %s', from_page, to_page)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            fetched_pages = self._iter_fetched_pages(executor, itertools.chain(
+                retry_pages, range(checkpoint.next_page if checkpoint is not None else from_page, to_page)
+            ))
+            for i, soup in fetched_pages:
+                retried_page = bool(retry_pages) and i == retry_pages[0]
+                if retried_page:
+                    retry_pages.pop(0)
+                only_new_link_found = self._commit_page(i, soup, known_link_ids, checkpoint)
+                # Retried pages lie before the resumed position, their known links must not end the run
+                if stop_on_existing and not only_new_link_found and not retried_page:
+                    self.logger.info('Stopped scraping due to encountering an existing link at page %s', i)
+                    stopped_on_existing = True
+                    fetched_pages.close()
+                    break
+                if i % 10 == 0:
+                    self.logger.info('Page: %s', i)
+        if checkpoint is not None:
+            checkpoint.stopped_on_existing = stopped_on_existing
+            checkpoint.completed = True
+            self._save_checkpoint(checkpoint)
+        self._finish_run(known_link_ids)
+        if not stopped_on_existing:
+            self.logger.info('Finished scraping links from page %s to page %s', from_page, to_page)
         return stopped_on_existing
+
+    def _page_is_known(self, soup: Optional[Any], known_link_ids: KnownLinkIndex) -> bool:
+        """
+        Whether every link of a fetched page is known. A page that failed to fetch counts as not known.
+        """
+        if soup is PAGE_UNCHANGED:
+            return True
+        if soup is None:
+            return False
+        return all(url_hash in known_link_ids
+                   for url_hash in ArticleLinkBatch(self._extract_links_from_soup(soup)).url_hashes)
+
+    def _find_boundary(self, from_page: int, to_page: int, known_link_ids: KnownLinkIndex,
+                       probed_pages: Dict[int, Optional[Any]]) -> int:
+        """
+        Find the first page whose links are all known by probing pages from_page - 1 + 1, 2, 4, 8, ... and
+        then binary searching between the last probe with new links and the first known probe.
+        Fetched pages are kept in probed_pages. Returns to_page when no known page is found.
+        """
+        def is_known(page_number: int) -> bool:
+            if page_number not in probed_pages:
+                probed_pages[page_number] = self._fetch_and_parse_page_content(page_number)
+            return self._page_is_known(probed_pages[page_number], known_link_ids)
+
+        last_new_page = from_page - 1
+        step = 1
+        while True:
+            probe = min(from_page - 1 + step, to_page - 1)
+            if probe <= last_new_page:
+                return to_page
+            if is_known(probe):
+                break
+            last_new_page = probe
+            step *= 2
+        first_known_page = probe
+        while first_known_page - last_new_page > 1:
+            middle = (last_new_page + first_known_page) // 2
+            if is_known(middle):
+                first_known_page = middle
+            else:
+                last_new_page = middle
+        return first_known_page
+
+    @profiled('scrape_new_links')
+    def scrape_new_links(self, from_page: int, to_page: int) -> int:
+        """
+        Scrape only the pages before the first page whose links are all known. The boundary is found with
+        O(log n) fetches, then the remaining pages before it are fetched concurrently. Returns the boundary.
+        """
+        known_link_ids = self._load_known_link_ids()
+        probed_pages: Dict[int, Optional[Any]] = {}
+        boundary = self._find_boundary(from_page, to_page, known_link_ids, probed_pages)
+        self.logger.info('Found first known page %s after %s probes', boundary, len(probed_pages))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            fetched_pages = self._iter_fetched_pages(
+                executor, [page for page in range(from_page, boundary) if probed_pages.get(page) is None]
+            )
+            for page_number in range(from_page, boundary):
+                # Probes that failed to fetch are fetched again with the other pages
+                soup = probed_pages.pop(page_number, None)
+                if soup is None:
+                    _, soup = next(fetched_pages)
+                if soup is None:
+                    self.logger.warning('Failed to fetch and parse content from page %s', page_number)
+                else:
+                    self._save_page_links(page_number, soup, known_link_ids)
+        self._finish_run(known_link_ids)
+        self.logger.info('Finished scraping new links from page %s to page %s', from_page, boundary)
+        return boundary
@@ -0,0 +1,75 @@
+"""
+Module for In-Memory Article Link Adapter
+"""
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# Local imports
+from src.article_handler import ArticleLink, ArticleLinkAdapter
+
+
+class InMemoryArticleLinkAdapter(ArticleLinkAdapter):
+    """
+    Thread-safe adapter keeping Article Links in a dict keyed by url hash, for local runs and tests
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._links: Dict[str, Tuple[str, Optional[datetime]]] = {}
+
+    def save_link(self, article_link: ArticleLink) -> None:
+        with self._lock:
+            self._links[article_link.url_hash] = (article_link.url, article_link.link_added_at)
+
+    def save_links(self, article_links: List[ArticleLink]) -> None:
+        """Save ArticleLinks under one lock acquisition."""
+        with self._lock:
+            for article_link in article_links:
+                self._links[article_link.url_hash] = (article_link.url, article_link.link_added_at)
+
+    def create_links(self, article_links: List[ArticleLink]) -> List[ArticleLink]:
+        """Store the ArticleLinks whose url hash is not stored yet and return them."""
+        created_links = []
+        with self._lock:
+            for article_link in article_links:
+                if article_link.url_hash not in self._links:
+                    self._links[article_link.url_hash] = (article_link.url, article_link.link_added_at)
+                    created_links.append(article_link)
+        return created_links
+
+    def existing_hashes(self, url_hashes: List[str]) -> Set[str]:
+        """Return the given url hashes that are stored."""
+        with self._lock:
+            return {url_hash for url_hash in url_hashes if url_hash in self._links}
+
+    def get_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
+                  end_date: Optional[datetime] = None) -> List[ArticleLink]:
+        """Retrieve ArticleLinks, with optional filters for hash and date range."""
+        return list(self.iter_links(url_hash, start_date, end_date))
+
+    def iter_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
+                   end_date: Optional[datetime] = None) -> Iterator[ArticleLink]:
+        """Yield ArticleLinks from a copy of the stored links, ordered like the Firestore adapter."""
+        with self._lock:
+            if url_hash:
+                items = [(url_hash, self._links[url_hash])] if url_hash in self._links else []
+            elif start_date and end_date:
+                items = sorted(
+                    ((link_hash, link) for link_hash, link in self._links.items()
+                     if link[1] is not None and start_date <= link[1] <= end_date),
+                    key=lambda item: (item[1][1], item[0])
+                )
+            else:
+                items = sorted(self._links.items())
+        for link_hash, (url, link_added_at) in items:
+            yield ArticleLink(url, link_added_at, url_hash=link_hash)
+
+    def iter_link_hashes(self) -> Iterator[str]:
+        """Yield the url hash of every stored link."""
+        with self._lock:
+            url_hashes = list(self._links)
+        yield from url_hashes
+
+    def __len__(self) -> int:
+        return len(self._links)
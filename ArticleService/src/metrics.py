@@ -0,0 +1,249 @@
+"""
+Module for Histogram and MetricsRegistry classes
+"""
+
+import bisect
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+# Upper bounds in seconds of the histogram buckets, from sub-millisecond parsing to minute-long backoffs
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+COUNTER_HELP = {
+    "pages": "Pages fetched",
+    "page_failures": "Pages that could not be fetched",
+    "links_found": "Links extracted from pages",
+    "links_new": "Links that were not stored yet",
+    "links_duplicate": "Links that were already stored",
+    "retries": "Retried HTTP requests",
+    "firestore_reads": "Documents read from Firestore",
+    "firestore_writes": "Documents written to Firestore",
+    "firestore_create_conflicts": "Document creates skipped because the document already existed",
+}
+
+
+class Histogram:
+    """
+    Cumulative histogram of durations over fixed bucket bounds, with count, sum and maximum.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # One count per bucket plus the +Inf bucket; counts are not cumulative until exported
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record one value
+        """
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def copy(self) -> 'Histogram':
+        """
+        Return an independent copy of the histogram
+        """
+        histogram = Histogram(self.buckets)
+        histogram.bucket_counts = list(self.bucket_counts)
+        histogram.count, histogram.sum, histogram.max = self.count, self.sum, self.max
+        return histogram
+
+    def since(self, earlier: 'Histogram') -> 'Histogram':
+        """
+        Return the values recorded since an earlier copy of this histogram. The maximum of those values is not
+        kept, so it is estimated as the bound of the highest non-empty bucket, capped by the overall maximum.
+        """
+        histogram = Histogram(self.buckets)
+        histogram.bucket_counts = [count - earlier_count
+                                   for count, earlier_count in zip(self.bucket_counts, earlier.bucket_counts)]
+        histogram.count = self.count - earlier.count
+        histogram.sum = self.sum - earlier.sum
+        highest = max((i for i, count in enumerate(histogram.bucket_counts) if count), default=None)
+        if highest is not None:
+            histogram.max = min(self.buckets[highest], self.max) if highest < len(self.buckets) else self.max
+        return histogram
+
+    def cumulative_counts(self) -> List[int]:
+        """
+        Return the number of values up to each bucket bound, the last entry being the +Inf bucket
+        """
+        counts, total = [], 0
+        for bucket_count in self.bucket_counts:
+            total += bucket_count
+            counts.append(total)
+        return counts
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket that contains it, capped by the maximum
+        """
+        if not self.count:
+            return 0.0
+        rank = math.ceil(fraction * self.count)
+        for bound, cumulative_count in zip(self.buckets, self.cumulative_counts()):
+            if cumulative_count >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Summarise the histogram
+        """
+        return {
+            "count": self.count,
+            "sum_seconds": self.sum,
+            "mean_seconds": self.sum / self.count if self.count else 0.0,
+            "max_seconds": self.max,
+            "p50_seconds": self.quantile(0.50),
+            "p90_seconds": self.quantile(0.90),
+            "p99_seconds": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and per-stage timing histograms of a scraper and its adapter. The Scraper times the
+    stages sleep (rate limiter and retry backoff), http, parse, extract, dedup and write.
+
+    Values accumulate over the lifetime of the registry. They are exported in the OpenMetrics text format,
+    e.g. for a Prometheus scrape or a Cloud Monitoring agent. A snapshot taken at the start of a run gives
+    the values of that run with since(), which the Scraper logs as a JSON summary at the end of the run.
+    """
+    def __init__(self, namespace: str = 'article_service', buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {name: 0 for name in COUNTER_HELP}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, amount: float = 1) -> None:
+        """
+        Increase a counter
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        Record the duration of one pass through a stage
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """
+        Time the enclosed block as one pass through a stage
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start_time)
+
+    def snapshot(self) -> 'MetricsRegistry':
+        """
+        Return a copy of the current values
+        """
+        # pylint: disable=protected-access
+        registry = MetricsRegistry(self.namespace, self.buckets)
+        with self._lock:
+            registry._counters = dict(self._counters)
+            registry._histograms = {stage: histogram.copy() for stage, histogram in self._histograms.items()}
+        return registry
+
+    def since(self, snapshot: 'MetricsRegistry') -> 'MetricsRegistry':
+        """
+        Return the values recorded since the snapshot was taken
+        """
+        # pylint: disable=protected-access
+        registry = MetricsRegistry(self.namespace, self.buckets)
+        with self._lock:
+            registry._counters = {name: value - snapshot._counters.get(name, 0)
+                                  for name, value in self._counters.items()}
+            registry._histograms = {
+                stage: histogram.since(snapshot._histograms[stage]) if stage in snapshot._histograms
+                else histogram.copy()
+                for stage, histogram in self._histograms.items()
+            }
+        return registry
+
+    def counter(self, name: str) -> float:
+        """
+        Return the value of a counter
+        """
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def histogram(self, stage: str) -> Optional[Histogram]:
+        """
+        Return the histogram of a stage, None if the stage was never observed
+        """
+        with self._lock:
+            return self._histograms.get(stage)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return the counters and the summarised stage timings
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "stages": {stage: histogram.to_dict() for stage, histogram in sorted(self._histograms.items())},
+            }
+
+    def to_json(self) -> str:
+        """
+        Return the summary as JSON
+        """
+        return json.dumps(self.summary(), sort_keys=True)
+
+    def write_summary(self, path: str) -> None:
+        """
+        Write the summary to a JSON file
+        """
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as summary_file:
+            json.dump(self.summary(), summary_file, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _format_number(value: float) -> str:
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    def to_openmetrics(self) -> str:
+        """
+        Export the counters and histograms in the OpenMetrics text format
+        """
+        lines = []
+        with self._lock:
+            for name, value in sorted(self._counters.items()):
+                metric = f'{self.namespace}_{name}'
+                lines.append(f'# TYPE {metric} counter')
+                if name in COUNTER_HELP:
+                    lines.append(f'# HELP {metric} {COUNTER_HELP[name]}')
+                lines.append(f'{metric}_total {self._format_number(value)}')
+            metric = f'{self.namespace}_stage_seconds'
+            lines.append(f'# TYPE {metric} histogram')
+            lines.append(f'# HELP {metric} Time spent per pass through a stage of the scraper')
+            lines.append(f'# UNIT {metric} seconds')
+            for stage, histogram in sorted(self._histograms.items()):
+                bounds = [repr(float(bound)) for bound in histogram.buckets] + ['+Inf']
+                for bound, cumulative_count in zip(bounds, histogram.cumulative_counts()):
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {cumulative_count}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {repr(histogram.sum)}')
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,75 @@
+"""
+Module for PageFingerprints class
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+
+def fingerprint_links(links: List[str]) -> str:
+    """
+    Return the digest of the link list extracted from a page
+    """
+    return hashlib.sha1('\n'.join(links).encode()).hexdigest()
+
+
+class PageFingerprints:
+    """
+    Digests of the link lists extracted from archive pages, keyed by page number.
+
+    A fingerprint is only recorded after the links of the page have been saved, so a page whose link list
+    matches its fingerprint holds no links that are not stored yet. With a path the fingerprints are kept
+    in a JSON file between runs.
+    """
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[int, str] = {}
+        if path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as fingerprint_file:
+                self._fingerprints = {int(page): digest for page, digest in json.load(fingerprint_file).items()}
+        except FileNotFoundError:
+            return
+        except (ValueError, TypeError, AttributeError) as err:
+            self.logger.warning('Ignoring unreadable page fingerprints %s: %s', self.path, err)
+            self._fingerprints = {}
+
+    def matches(self, page_number: int, fingerprint: str) -> bool:
+        """
+        Check whether the page had the same link list when it was last recorded
+        """
+        with self._lock:
+            return self._fingerprints.get(page_number) == fingerprint
+
+    def record(self, page_number: int, fingerprint: str) -> None:
+        """
+        Record the fingerprint of a page whose links have been saved
+        """
+        with self._lock:
+            self._fingerprints[page_number] = fingerprint
+
+    def save(self) -> None:
+        """
+        Write the fingerprints to the file if a path is configured
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            fingerprints = {str(page): digest for page, digest in self._fingerprints.items()}
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as fingerprint_file:
+            json.dump(fingerprints, fingerprint_file)
+        os.replace(temp_path, self.path)
+        self.logger.info('Saved %s page fingerprints to %s', len(fingerprints), self.path)
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
@@ -0,0 +1,91 @@
+"""
+This module defines the PageParser abstract base class and the parser backends for archive pages.
+"""
+
+# Standard library imports
+import abc
+from typing import Any, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:  # pragma: no cover
+    lxml = None  # pylint: disable=invalid-name
+
+BASE_URL = 'https://magic.wizards.com'
+ARTICLE_CLASS = 'css-415ug css-o3Y69'
+
+
+class PageParser(abc.ABC):
+    """
+    Abstract base class for parser backends that turn an archive page into its article links.
+    """
+    @abc.abstractmethod
+    def parse(self, html: str) -> Any:  # pragma: no cover
+        """Parse the HTML of an archive page into a document."""
+
+    @abc.abstractmethod
+    def extract_links(self, document: Any) -> List[str]:  # pragma: no cover
+        """Extract the absolute article links from a parsed document."""
+
+
+class SoupPageParser(PageParser):
+    """
+    BeautifulSoup backend. With `only_articles` a SoupStrainer materialises only the article elements.
+    """
+    def __init__(self, features: str = 'html.parser', only_articles: bool = False) -> None:
+        self.features = features
+        self.parse_only = SoupStrainer('article', class_=ARTICLE_CLASS) if only_articles else None
+
+    def parse(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, self.features, parse_only=self.parse_only)
+
+    def extract_links(self, document: BeautifulSoup) -> List[str]:
+        links = []
+        entry_list = document.find_all("article", class_=ARTICLE_CLASS)
+        for entry in entry_list:
+            link_tag = entry.find("a", href=True)
+            if link_tag:
+                link_path = link_tag.get('href')
+                if link_path.startswith("/"):
+                    links.append(BASE_URL + link_path)
+        return links
+
+
+class LxmlPageParser(PageParser):
+    """
+    lxml backend that selects the article links with XPath on the C-level tree.
+    """
+    ARTICLE_XPATH = f'//article[@class="{ARTICLE_CLASS}"]'
+
+    def __init__(self) -> None:
+        if lxml is None:
+            raise ImportError('LxmlPageParser requires the lxml package')
+
+    def parse(self, html: str) -> Any:
+        if not html.strip():
+            return lxml.html.Element('html')
+        return lxml.html.document_fromstring(html)
+
+    def extract_links(self, document: Any) -> List[str]:
+        links = []
+        for entry in document.xpath(self.ARTICLE_XPATH):
+            link_paths = entry.xpath('(.//a[@href])[1]/@href')
+            if link_paths and link_paths[0].startswith("/"):
+                links.append(BASE_URL + link_paths[0])
+        return links
+
+
+def create_page_parser(backend: Optional[str] = None) -> PageParser:
+    """
+    Create a parser backend by name: 'lxml', 'strainer' (the default) or 'html.parser' (full tree, the
+    previous behaviour). The strainer backend builds its partial tree with lxml when it is installed.
+    """
+    if backend == 'lxml':
+        return LxmlPageParser()
+    if backend == 'html.parser':
+        return SoupPageParser()
+    if backend not in (None, 'strainer'):
+        raise ValueError(f'Unknown parser backend: {backend}')
+    return SoupPageParser(features='lxml' if lxml is not None else 'html.parser', only_articles=True)
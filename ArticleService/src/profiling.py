@@ -0,0 +1,282 @@
+"""
+This module defines the RunProfiler and StackSampler classes and the profiled decorator, which capture
+cProfile statistics, collapsed stack samples and tracemalloc allocations of scrape runs.
+"""
+
+# Standard library imports
+import collections
+import contextlib
+import cProfile
+import datetime
+import functools
+import logging
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from typing import Any, Callable, Counter, Dict, Iterator, Mapping, Optional, TypeVar
+
+# Environment variables enabling the profiler of a Scraper that is not given one
+PROFILE_DIR_ENV = 'ARTICLE_SERVICE_PROFILE_DIR'
+PROFILE_SAMPLE_ENV = 'ARTICLE_SERVICE_PROFILE_SAMPLE_EVERY'
+PROFILE_MEMORY_ENV = 'ARTICLE_SERVICE_PROFILE_MEMORY'
+# From Python 3.12 cProfile is built on sys.monitoring: a profile sees every thread, and enabling a second one
+# while another is active raises ValueError
+PROFILE_ALL_THREADS = sys.version_info >= (3, 12)
+
+Method = TypeVar('Method', bound=Callable[..., Any])
+
+
+class StackSampler:
+    """
+    Background thread sampling the stacks of all other threads every `interval` seconds. The samples are
+    written in the collapsed stack format read by flamegraph.pl and speedscope: one line per distinct stack,
+    thread name first and frames separated by semicolons, followed by the number of samples.
+    """
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: Counter[str] = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Start sampling
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop sampling and wait for the sampling thread
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                    frame = frame.f_back
+                frames.append(thread_names.get(thread_id, str(thread_id)))
+                self.samples[';'.join(reversed(frames))] += 1
+
+    def write(self, path: str) -> None:
+        """
+        Write the samples in the collapsed stack format
+        """
+        with open(path, 'w', encoding='utf-8') as collapsed_file:
+            for stack, count in self.samples.most_common():
+                collapsed_file.write(f'{stack} {count}\n')
+
+
+class RunProfiler:  # pylint: disable=too-many-instance-attributes
+    """
+    Opt-in profiler of scrape runs writing its artifacts to `directory`.
+
+    A profiled run samples the stacks of all threads and, with trace_memory, traces allocations with
+    tracemalloc. Before Python 3.12 cProfile only sees the thread it is enabled in, so the run is profiled in
+    the calling thread and every page separately in the worker thread that fetches it, and the profiles are
+    merged. From Python 3.12 one profile covers all threads and only one may be active, so a single profile is
+    enabled while any profiled block runs. With sample_every, only every n-th page and the load of the known
+    links are profiled with cProfile, which keeps the overhead of long crawls low; from Python 3.12 pages that
+    overlap a sampled page are profiled too. A profiler that cannot be enabled, e.g. because a debugger or
+    coverage tool is active, is logged and the run continues without cProfile statistics.
+
+    Every run writes `<name>-<timestamp>.pstats` for pstats or snakeviz, `<name>-<timestamp>.collapsed` as
+    flamegraph input and, with trace_memory, `<name>-<timestamp>.memory.txt` with the top allocations.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, directory: str, *, sample_every: Optional[int] = None, trace_memory: bool = True,
+                 top_allocations: int = 25, sample_interval: float = 0.005) -> None:
+        if sample_every is not None and sample_every < 1:
+            raise ValueError('sample_every must be at least 1')
+        self.directory = directory
+        self.sample_every = sample_every
+        self.trace_memory = trace_memory
+        self.top_allocations = top_allocations
+        self.sample_interval = sample_interval
+        self.artifacts: Dict[str, str] = {}
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats: Optional[pstats.Stats] = None
+        self._shared_profile: Optional[cProfile.Profile] = None
+        self._shared_users = 0
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> Optional['RunProfiler']:
+        """
+        Create a profiler from the environment, None unless ARTICLE_SERVICE_PROFILE_DIR is set
+        """
+        environ = os.environ if environ is None else environ
+        directory = environ.get(PROFILE_DIR_ENV)
+        if not directory:
+            return None
+        sample_every = environ.get(PROFILE_SAMPLE_ENV)
+        return cls(directory, sample_every=int(sample_every) if sample_every else None,
+                   trace_memory=environ.get(PROFILE_MEMORY_ENV, '1') != '0')
+
+    def should_profile(self, page_number: int) -> bool:
+        """
+        Whether the page is in the sampled subset
+        """
+        return self.sample_every is None or page_number % self.sample_every == 0
+
+    def _enable(self, profile: cProfile.Profile) -> bool:
+        try:
+            profile.enable()
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            self.logger.warning('Continuing without cProfile, the profiler could not be enabled: %s', err)
+            return False
+        return True
+
+    def _disable_and_collect(self, profile: cProfile.Profile) -> None:
+        """
+        Stop a profile and merge its statistics into those of the run; the caller holds the lock
+        """
+        try:
+            profile.disable()
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            self.logger.warning('Dropping a cProfile profile that could not be collected: %s', err)
+
+    @contextlib.contextmanager
+    def profile(self, page_number: Optional[int] = None) -> Iterator[None]:
+        """
+        Profile the enclosed block with cProfile, unless the page is not sampled or the thread is already
+        being profiled
+        """
+        if page_number is not None and not self.should_profile(page_number):
+            yield
+        elif PROFILE_ALL_THREADS:
+            with self._profile_all_threads():
+                yield
+        else:
+            with self._profile_thread():
+                yield
+
+    @contextlib.contextmanager
+    def _profile_thread(self) -> Iterator[None]:
+        """
+        Profile the enclosed block in the current thread, nested blocks are part of the outer profile
+        """
+        profile = cProfile.Profile()
+        if getattr(self._local, 'active', False) or not self._enable(profile):
+            yield
+            return
+        self._local.active = True
+        try:
+            yield
+        finally:
+            self._local.active = False
+            with self._lock:
+                self._disable_and_collect(profile)
+
+    @contextlib.contextmanager
+    def _profile_all_threads(self) -> Iterator[None]:
+        """
+        Keep one profile of all threads enabled while any profiled block runs
+        """
+        with self._lock:
+            if self._shared_profile is None:
+                profile = cProfile.Profile()
+                if self._enable(profile):
+                    self._shared_profile = profile
+            joined = self._shared_profile is not None
+            if joined:
+                self._shared_users += 1
+        try:
+            yield
+        finally:
+            if joined:
+                with self._lock:
+                    self._shared_users -= 1
+                    if not self._shared_users:
+                        profile, self._shared_profile = self._shared_profile, None
+                        self._disable_and_collect(profile)
+
+    @contextlib.contextmanager
+    def run(self, name: str) -> Iterator[None]:
+        """
+        Profile a run and write its artifacts when it ends
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._stats = None
+        sampler = StackSampler(self.sample_interval)
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        sampler.start()
+        try:
+            if self.sample_every is None:
+                with self.profile():
+                    yield
+            else:
+                yield
+        finally:
+            sampler.stop()
+            try:
+                self._write_artifacts(name, sampler, started_tracing)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                self.logger.error('Failed to write the profile of %s: %s', name, err)
+
+    def _write_artifacts(self, name: str, sampler: StackSampler, started_tracing: bool) -> None:
+        prefix = os.path.join(self.directory, f'{name}-{datetime.datetime.now():%Y%m%dT%H%M%S%f}')
+        artifacts = {"collapsed": prefix + '.collapsed'}
+        sampler.write(artifacts["collapsed"])
+        with self._lock:
+            stats, self._stats = self._stats, None
+        if stats is not None:
+            artifacts["pstats"] = prefix + '.pstats'
+            stats.dump_stats(artifacts["pstats"])
+        if self.trace_memory and tracemalloc.is_tracing():
+            artifacts["memory"] = prefix + '.memory.txt'
+            self._write_allocations(artifacts["memory"])
+            if started_tracing:
+                tracemalloc.stop()
+        self.artifacts = artifacts
+        self.logger.info('Wrote profile of %s to %s', name, artifacts)
+
+    def _write_allocations(self, path: str) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        )).statistics('lineno')
+        with open(path, 'w', encoding='utf-8') as memory_file:
+            memory_file.write(f'Traced memory: current {current / 2 ** 20:.1f} MiB, peak {peak / 2 ** 20:.1f} MiB\n')
+            memory_file.write(f'Top {self.top_allocations} allocations by line:\n')
+            for statistic in statistics[:self.top_allocations]:
+                memory_file.write(f'{statistic}\n')
+
+
+def profiled(name: str) -> Callable[[Method], Method]:
+    """
+    Decorate a method of an object with a `profiler` attribute to run as a profiled run. Without a profiler
+    the method is called directly.
+    """
+    def decorator(method: Method) -> Method:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            if self.profiler is None:
+                return method(self, *args, **kwargs)
+            with self.profiler.run(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,85 @@
+"""
+Module for RateLimiter and AsyncRateLimiter classes
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Thread-safe politeness budget that spaces requests to at most `requests_per_second`.
+
+    Slots are reserved under a lock and waited for outside of it, so concurrent workers
+    share one global budget without serialising on the sleep itself. A budget of None disables
+    throttling; zero or negative budgets are rejected so a mistyped setting cannot disable it.
+    """
+    def __init__(self, requests_per_second: Optional[float]) -> None:
+        self.interval = self._interval(requests_per_second)
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    @staticmethod
+    def _interval(requests_per_second: Optional[float]) -> float:
+        if requests_per_second is None:
+            return 0.0
+        if requests_per_second <= 0:
+            raise ValueError('requests_per_second must be positive, or None for no limit')
+        return 1.0 / requests_per_second
+
+    @property
+    def requests_per_second(self) -> Optional[float]:
+        """
+        Current budget in requests per second, None if unlimited
+        """
+        return 1.0 / self.interval if self.interval else None
+
+    def set_rate(self, requests_per_second: Optional[float]) -> None:
+        """
+        Change the budget for all following requests
+        """
+        interval = self._interval(requests_per_second)
+        with self._lock:
+            self.interval = interval
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back all requests for at least `seconds`, e.g. to honour a Retry-After header
+        """
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+    def _reserve_slot(self) -> float:
+        """
+        Reserve the next request slot and return the seconds until it starts
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        return slot - now
+
+    def acquire(self) -> float:
+        """
+        Block until the next request slot is available and return the seconds waited
+        """
+        wait = self._reserve_slot()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class AsyncRateLimiter(RateLimiter):
+    """
+    RateLimiter variant for asyncio code that waits with asyncio.sleep instead of blocking the event loop.
+    """
+    async def acquire(self) -> float:  # pylint: disable=invalid-overridden-method
+        """
+        Wait until the next request slot is available and return the seconds waited
+        """
+        wait = self._reserve_slot()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
@@ -0,0 +1,204 @@
+"""
+This module defines the ScrapePipeline class, which runs the fetch, parse and persist steps of a Scraper as
+separate stages connected by bounded queues.
+"""
+
+# Standard library imports
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.link_scraper import PAGE_UNCHANGED, Scraper
+from src.page_parser import PageParser
+
+# The pipeline drives the per-page steps of the Scraper it wraps
+# pylint: disable=protected-access
+
+# Queue item telling a stage worker to stop
+_STOP = object()
+
+
+def extract_page_links(parser: PageParser, html: str) -> List[str]:
+    """
+    Parse an archive page and extract its links. Module level so it can run in a process pool.
+    """
+    return parser.extract_links(parser.parse(html))
+
+
+class StageMetrics:
+    """
+    Throughput and queue depth of one pipeline stage.
+    """
+    def __init__(self, name: str, input_queue: 'queue.Queue[Any]') -> None:
+        self.name = name
+        self.input_queue = input_queue
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+    def record(self, busy_seconds: float, failed: bool) -> None:
+        """
+        Record one processed item
+        """
+        with self._lock:
+            self.processed += 1
+            self.failed += int(failed)
+            self.busy_seconds += busy_seconds
+            self.max_queue_depth = max(self.max_queue_depth, self.input_queue.qsize())
+
+    def to_dict(self, elapsed: float) -> Dict[str, float]:
+        """
+        Return the metrics of the stage, with the throughput over the elapsed run time
+        """
+        with self._lock:
+            return {
+                "processed": self.processed,
+                "failed": self.failed,
+                "queue_depth": self.input_queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "busy_seconds": self.busy_seconds,
+                "items_per_second": self.processed / elapsed if elapsed > 0 else 0.0
+            }
+
+
+class ScrapePipeline:  # pylint: disable=too-many-instance-attributes
+    """
+    Pipeline running the network-bound fetch, the CPU-bound parse and the RPC-bound persist steps of a scrape
+    concurrently. Each stage has its own number of workers and reads from a bounded queue, so a slow stage
+    applies backpressure to the stages before it. With parse_processes the parsing runs in a process pool,
+    outside of the GIL.
+
+    Pages are persisted as they complete, not in page order, so the pipeline is meant for range crawls;
+    incremental runs should use scrape_links with stop_on_existing or scrape_new_links.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, scraper: Scraper, *, fetch_workers: int = 1, parse_workers: int = 1, write_workers: int = 1,
+                 queue_size: int = 16, parse_processes: Optional[int] = None) -> None:
+        if min(fetch_workers, parse_workers, write_workers, queue_size) < 1:
+            raise ValueError('Stage workers and queue_size must be at least 1')
+        self.scraper = scraper
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.write_workers = write_workers
+        self.queue_size = queue_size
+        self.parse_processes = parse_processes
+        self.logger = logging.getLogger(__name__)
+        self._stages: Dict[str, StageMetrics] = {}
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def _run_stage(self, metrics: StageMetrics, process: Callable[[Any], Any],
+                   output_queue: Optional['queue.Queue[Any]']) -> None:
+        """
+        Worker loop of a stage: process items from the input queue until the stop marker arrives
+        """
+        while True:
+            item = metrics.input_queue.get()
+            if item is _STOP:
+                return
+            start_time = time.monotonic()
+            try:
+                result = process(item)
+                failed = False
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                self.logger.error('Stage %s failed on %s: %s', metrics.name, item, err)
+                result = None
+                failed = True
+            metrics.record(time.monotonic() - start_time, failed)
+            if output_queue is not None and result is not None:
+                output_queue.put(result)
+
+    def _fetch(self, page_number: int) -> Tuple[int, Any]:
+        text = self.scraper._fetch_page_text(page_number)
+        if text is None:
+            raise RuntimeError(f'Failed to fetch content from page {page_number}')
+        return page_number, text
+
+    def _parse(self, item: Tuple[int, Any], executor: Optional[Executor]) -> Tuple[int, Any]:
+        page_number, text = item
+        if text is PAGE_UNCHANGED:
+            return page_number, PAGE_UNCHANGED
+        # Parsing and link extraction run as one call here, so both are timed as the parse stage
+        with self.scraper.metrics.time('parse'):
+            if executor is not None:
+                return page_number, executor.submit(extract_page_links, self.scraper.parser, text).result()
+            return page_number, extract_page_links(self.scraper.parser, text)
+
+    def _write(self, item: Tuple[int, Any], known_link_ids: Any) -> None:
+        page_number, links = item
+        if links is not PAGE_UNCHANGED:
+            self.scraper._save_extracted_links(page_number, links, known_link_ids)
+
+    def _start_workers(self, metrics: StageMetrics, count: int, process: Callable[[Any], Any],
+                       output_queue: Optional['queue.Queue[Any]']) -> List[threading.Thread]:
+        workers = [
+            threading.Thread(target=self._run_stage, args=(metrics, process, output_queue),
+                             name=f'{metrics.name}-{i}', daemon=True)
+            for i in range(count)
+        ]
+        for worker in workers:
+            worker.start()
+        return workers
+
+    @staticmethod
+    def _stop_workers(metrics: StageMetrics, workers: List[threading.Thread]) -> None:
+        for _ in workers:
+            metrics.input_queue.put(_STOP)
+        for worker in workers:
+            worker.join()
+
+    def run(self, from_page: int, to_page: int) -> Dict[str, Dict[str, float]]:
+        """
+        Scrape the pages [from_page, to_page) and return the metrics of every stage
+        """
+        page_queue: 'queue.Queue[Any]' = queue.Queue()
+        parse_queue: 'queue.Queue[Any]' = queue.Queue(self.queue_size)
+        write_queue: 'queue.Queue[Any]' = queue.Queue(self.queue_size)
+        self._stages = {
+            "fetch": StageMetrics("fetch", page_queue),
+            "parse": StageMetrics("parse", parse_queue),
+            "write": StageMetrics("write", write_queue)
+        }
+        for page_number in range(from_page, to_page):
+            page_queue.put(page_number)
+        known_link_ids = self.scraper._load_known_link_ids()
+        # The pool starts its workers on the first submit, when the stage threads are already running, and forking
+        # a multi-threaded process can deadlock the child, so the workers are spawned
+        executor = None
+        if self.parse_processes:
+            executor = ProcessPoolExecutor(self.parse_processes, mp_context=multiprocessing.get_context('spawn'))
+        self._started_at = time.monotonic()
+        self._finished_at = None
+        self.logger.info('Starting pipeline from page %s to page %s', from_page, to_page)
+        try:
+            writers = self._start_workers(self._stages["write"], self.write_workers,
+                                          lambda item: self._write(item, known_link_ids), None)
+            parsers = self._start_workers(self._stages["parse"], self.parse_workers,
+                                          lambda item: self._parse(item, executor), write_queue)
+            fetchers = self._start_workers(self._stages["fetch"], self.fetch_workers, self._fetch, parse_queue)
+            self._stop_workers(self._stages["fetch"], fetchers)
+            self._stop_workers(self._stages["parse"], parsers)
+            self._stop_workers(self._stages["write"], writers)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self._finished_at = time.monotonic()
+        self.scraper._finish_run(known_link_ids)
+        metrics = self.metrics()
+        self.logger.info('Finished pipeline from page %s to page %s: %s', from_page, to_page, metrics)
+        return metrics
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the queue depth and throughput of every stage, also while the pipeline is running
+        """
+        if self._started_at is None:
+            return {}
+        elapsed = (self._finished_at or time.monotonic()) - self._started_at
+        return {name: stage.to_dict(elapsed) for name, stage in self._stages.items()}
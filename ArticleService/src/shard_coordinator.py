@@ -0,0 +1,121 @@
+"""
+This module defines the ShardCoordinator class, which splits a page range into shards and runs them in a
+local process pool or as independent Cloud Run task instances.
+"""
+
+# Standard library imports
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Mapping, Optional, Tuple
+
+from src.link_scraper import Scraper
+
+# Environment variables set by Cloud Run jobs on every task instance
+TASK_INDEX_ENV = 'CLOUD_RUN_TASK_INDEX'
+TASK_COUNT_ENV = 'CLOUD_RUN_TASK_COUNT'
+
+# Creates the Scraper of a shard from the shard index. It must be picklable (a module level function) to run
+# in a process pool, and should give every shard its own snapshot and checkpoint paths.
+ScraperFactory = Callable[[int], Scraper]
+
+
+def split_page_range(from_page: int, to_page: int, shard_count: int) -> List[Tuple[int, int]]:
+    """
+    Split the pages [from_page, to_page) into shard_count contiguous ranges whose sizes differ by at most one
+    """
+    if shard_count < 1:
+        raise ValueError('shard_count must be at least 1')
+    page_count = max(to_page - from_page, 0)
+    shard_size, remainder = divmod(page_count, shard_count)
+    page_ranges = []
+    start = from_page
+    for shard_index in range(shard_count):
+        end = start + shard_size + (1 if shard_index < remainder else 0)
+        page_ranges.append((start, end))
+        start = end
+    return page_ranges
+
+
+def task_shard_from_env(environ: Optional[Mapping[str, str]] = None) -> Tuple[int, int]:
+    """
+    Return the task index and task count of a Cloud Run task, (0, 1) outside of a Cloud Run job
+    """
+    environ = os.environ if environ is None else environ
+    task_index = int(environ.get(TASK_INDEX_ENV, '0'))
+    task_count = int(environ.get(TASK_COUNT_ENV, '1'))
+    if not 0 <= task_index < task_count:
+        raise ValueError(f'Invalid task index {task_index} for {task_count} tasks')
+    return task_index, task_count
+
+
+def share_rate_limit(scraper: Scraper, shard_count: int) -> None:
+    """
+    Divide the requests per second of a shard's scraper, and the bounds of its adaptive rate controller, by the
+    number of shards running at once, so that all shards together stay within the budget of one scraper
+    """
+    if shard_count < 1:
+        raise ValueError('shard_count must be at least 1')
+    requests_per_second = scraper.rate_limiter.requests_per_second
+    if requests_per_second is not None:
+        scraper.rate_limiter.set_rate(requests_per_second / shard_count)
+    rate_controller = scraper.fetch_policy.rate_controller
+    if rate_controller is not None:
+        rate_controller.min_requests_per_second /= shard_count
+        rate_controller.max_requests_per_second /= shard_count
+
+
+def run_shard(scraper_factory: ScraperFactory, shard_index: int, from_page: int, to_page: int,
+              shard_count: int = 1) -> None:
+    """
+    Scrape the pages of one shard with its share of the rate limit of shard_count concurrent shards. Shards
+    write with create-if-absent semantics, so a link that is found by several shards keeps the document of
+    the shard that stored it first.
+    """
+    logger = logging.getLogger(__name__)
+    logger.info('Starting shard %s with pages %s to %s', shard_index, from_page, to_page)
+    with scraper_factory(shard_index) as scraper:
+        scraper.create_if_absent = True
+        share_rate_limit(scraper, shard_count)
+        scraper.scrape_links(from_page, to_page)
+    logger.info('Finished shard %s', shard_index)
+
+
+class ShardCoordinator:
+    """
+    Coordinator running the shards of a page range, either in a local process pool or one shard per task.
+    The scrapers of the shards run in separate processes, so instead of sharing one rate limiter every shard
+    gets an equal share of the configured requests per second.
+    """
+    def __init__(self, scraper_factory: ScraperFactory) -> None:
+        self.scraper_factory = scraper_factory
+        self.logger = logging.getLogger(__name__)
+
+    def run_local(self, from_page: int, to_page: int, shard_count: int,
+                  max_processes: Optional[int] = None) -> None:
+        """
+        Run all shards of the page range in a process pool, raising the first error of a failed shard
+        """
+        page_ranges = split_page_range(from_page, to_page, shard_count)
+        shards = [(shard_index, start, end) for shard_index, (start, end) in enumerate(page_ranges) if start < end]
+        max_processes = max_processes or shard_count
+        concurrent_shards = max(1, min(max_processes, len(shards)))
+        self.logger.info('Running %s shards of pages %s to %s locally', shard_count, from_page, to_page)
+        with ProcessPoolExecutor(max_workers=max_processes) as executor:
+            futures = [
+                executor.submit(run_shard, self.scraper_factory, shard_index, start, end, concurrent_shards)
+                for shard_index, start, end in shards
+            ]
+            for future in futures:
+                future.result()
+
+    def run_task(self, from_page: int, to_page: int, task_index: Optional[int] = None,
+                 task_count: Optional[int] = None) -> None:
+        """
+        Run the shard of this task instance, taken from the Cloud Run environment unless given explicitly. The
+        tasks may all run at once, so the shard gets 1 / task_count of the rate limit.
+        """
+        if task_index is None or task_count is None:
+            task_index, task_count = task_shard_from_env()
+        start, end = split_page_range(from_page, to_page, task_count)[task_index]
+        run_shard(self.scraper_factory, task_index, start, end, task_count)
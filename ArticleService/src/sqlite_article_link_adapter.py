@@ -0,0 +1,167 @@
+"""
+Module for SQLite Article Link Adapter
+"""
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence, Set, Tuple
+
+# Local imports
+from src.article_handler import ArticleLink, ArticleLinkAdapter
+
+# Rows read per query by iter_links
+DEFAULT_PAGE_SIZE = 1000
+# SQLite builds before 3.32 allow at most 999 parameters per statement
+MAX_VARIABLES = 999
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS article_links ('
+    'url_hash TEXT PRIMARY KEY, url TEXT NOT NULL, link_added_at TEXT)',
+    'CREATE INDEX IF NOT EXISTS article_links_link_added_at ON article_links (link_added_at, url_hash)'
+)
+
+
+class SqliteArticleLinkAdapter(ArticleLinkAdapter):
+    """
+    Adapter to handle Article Links in a local SQLite database in WAL mode.
+    link_added_at is stored as ISO 8601 text, so date ranges compare correctly for naive timestamps.
+    """
+    def __init__(self, path: str, page_size: int = DEFAULT_PAGE_SIZE) -> None:
+        super().__init__()
+        if page_size < 1:
+            raise ValueError('page_size must be at least 1')
+        self.path = path
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+
+    def __enter__(self) -> 'SqliteArticleLinkAdapter':
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the database connection
+        """
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _to_row(article_link: ArticleLink) -> Tuple[str, str, Optional[str]]:
+        link_added_at = article_link.link_added_at
+        return (article_link.url_hash, article_link.url,
+                link_added_at.isoformat() if link_added_at is not None else None)
+
+    @staticmethod
+    def _to_link(row: Sequence[Any]) -> ArticleLink:
+        url_hash, url, link_added_at = row
+        return ArticleLink(url, datetime.fromisoformat(link_added_at) if link_added_at else None, url_hash=url_hash)
+
+    def save_link(self, article_link: ArticleLink) -> None:
+        self.save_links([article_link])
+
+    def save_links(self, article_links: List[ArticleLink]) -> None:
+        """Save ArticleLinks with one bulk insert in a single transaction."""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO article_links (url_hash, url, link_added_at) VALUES (?, ?, ?)',
+                [self._to_row(article_link) for article_link in article_links]
+            )
+
+    def create_links(self, article_links: List[ArticleLink]) -> List[ArticleLink]:
+        """Insert the ArticleLinks whose url hash is not stored yet in one transaction and return them."""
+        created_links = []
+        with self._lock, self._connection:
+            for article_link in article_links:
+                cursor = self._connection.execute(
+                    'INSERT OR IGNORE INTO article_links (url_hash, url, link_added_at) VALUES (?, ?, ?)',
+                    self._to_row(article_link)
+                )
+                if cursor.rowcount == 1:
+                    created_links.append(article_link)
+        return created_links
+
+    def existing_hashes(self, url_hashes: List[str]) -> Set[str]:
+        """
+        Return the given url hashes that are stored, looked up with one query per page_size hashes, at most
+        MAX_VARIABLES
+        """
+        existing: Set[str] = set()
+        chunk_size = min(self.page_size, MAX_VARIABLES)
+        for start in range(0, len(url_hashes), chunk_size):
+            chunk = url_hashes[start:start + chunk_size]
+            placeholders = ', '.join('?' * len(chunk))
+            existing.update(url_hash for (url_hash,) in self._fetch(
+                f'SELECT url_hash FROM article_links WHERE url_hash IN ({placeholders})', chunk
+            ))
+        return existing
+
+    def get_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
+                  end_date: Optional[datetime] = None) -> List[ArticleLink]:
+        """Retrieve ArticleLinks, with optional filters for hash and date range."""
+        return list(self.iter_links(url_hash, start_date, end_date))
+
+    def iter_links(self, url_hash: Optional[str] = None, start_date: Optional[datetime] = None,
+                   end_date: Optional[datetime] = None) -> Iterator[ArticleLink]:
+        """Yield ArticleLinks read in keyset pages of page_size rows, with the filters of get_links."""
+        if url_hash:
+            for row in self._fetch('SELECT url_hash, url, link_added_at FROM article_links WHERE url_hash = ?',
+                                   (url_hash,)):
+                yield self._to_link(row)
+        elif start_date and end_date:
+            yield from self._iter_links_by_date_range(start_date.isoformat(), end_date.isoformat())
+        else:
+            yield from self._iter_all_links()
+
+    def iter_link_hashes(self) -> Iterator[str]:
+        """Yield the url hash of every stored link from the primary key index."""
+        last_hash = ''
+        while True:
+            rows = self._fetch('SELECT url_hash FROM article_links WHERE url_hash > ? ORDER BY url_hash LIMIT ?',
+                               (last_hash, self.page_size))
+            for (url_hash,) in rows:
+                yield url_hash
+            if len(rows) < self.page_size:
+                return
+            last_hash = rows[-1][0]
+
+    def _fetch(self, sql: str, parameters: Sequence[Any]) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _iter_all_links(self) -> Iterator[ArticleLink]:
+        last_hash = ''
+        while True:
+            rows = self._fetch(
+                'SELECT url_hash, url, link_added_at FROM article_links WHERE url_hash > ? '
+                'ORDER BY url_hash LIMIT ?',
+                (last_hash, self.page_size)
+            )
+            for row in rows:
+                yield self._to_link(row)
+            if len(rows) < self.page_size:
+                return
+            last_hash = rows[-1][0]
+
+    def _iter_links_by_date_range(self, start_date: str, end_date: str) -> Iterator[ArticleLink]:
+        self.logger.info('Retrieving links between dates: %s - %s', start_date, end_date)
+        last_added_at, last_hash = start_date, ''
+        while True:
+            rows = self._fetch(
+                'SELECT url_hash, url, link_added_at FROM article_links '
+                'WHERE link_added_at <= ? AND (link_added_at, url_hash) > (?, ?) '
+                'ORDER BY link_added_at, url_hash LIMIT ?',
+                (end_date, last_added_at, last_hash, self.page_size)
+            )
+            for row in rows:
+                yield self._to_link(row)
+            if len(rows) < self.page_size:
+                return
+            last_hash, _, last_added_at = rows[-1]
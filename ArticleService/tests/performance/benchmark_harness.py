@@ -0,0 +1,719 @@
+"""
+benchmark_harness.py
+
+Offline benchmark harness for the Scraper. It provides
+
+- a local HTTP/1.1 server that serves synthetic archive pages in the real `css-415ug css-o3Y69` markup,
+- an in-process stand-in for the Firestore collection used by FirestoreArticleLinkAdapter,
+- `run_scrape_benchmark`, which measures pages/sec, links/sec, p50/p99 page latency, peak RSS and
+  start-up time of `Scraper.scrape_links`,
+- `run_download_benchmark`, which measures articles/sec of `ArticleDownloader.download_pending`,
+- `run_export_benchmark`, which measures docs/sec of `export_links` from the Firestore stand-in,
+- `run_import_benchmark`, which measures links/sec of `LinkImporter.import_file` into the Firestore stand-in,
+- `run_known_link_index_benchmark`, which measures build time, lookups/sec and memory of `KnownLinkIndex`
+  against a set of hex strings,
+- and `write_results`, which stores the results as JSON.
+
+Each scenario can also be run in a fresh process, which gives an accurate peak RSS:
+
+    PYTHONPATH=. python tests/performance/benchmark_harness.py --pages 200 --known-links 50000 --max-workers 8
+"""
+
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from src.article_downloader import ArticleDownloader, DownloadLedger
+from src.article_handler import ArticleLink
+from src.article_store import LocalArticleStore
+from src.firestore_article_link_adapter import FirestoreArticleLinkAdapter
+from src.known_link_index import KnownLinkIndex
+from src.link_export import export_links
+from src.link_import import LinkImporter
+from src.link_scraper import Scraper, create_session
+from src.memory_article_link_adapter import InMemoryArticleLinkAdapter
+
+DEFAULT_RESULTS_DIR = 'benchmark_results'
+
+
+def synthetic_archive_page(page_number: int, links_per_page: int) -> bytes:
+    """
+    Render an archive page with `links_per_page` unique articles in the markup of the real archive.
+    """
+    articles = ''.join(
+        f'<article data-ctf-id="{page_number}-{i}" class="css-415ug css-o3Y69">'
+        f'<a href="/en/news/synthetic/article-{page_number}-{i}">'
+        f'<div class="css-3qxBv"><img src="/img/{page_number}-{i}.jpg" alt=""/></div>'
+        f'<h3 class="css-9f4rq">Synthetic article {page_number}-{i}</h3></a>'
+        f'<p class="css-p4BJO">Teaser text of the synthetic article.</p></article>'
+        for i in range(links_per_page)
+    )
+    navigation = ''.join(f'<li><a href="/en/news/section-{i}">Section {i}</a></li>' for i in range(100))
+    return (
+        f'<!DOCTYPE html><html><head><title>News Archive</title>{"<script>var x = 1;</script>" * 20}</head>'
+        f'<body><nav><ul>{navigation}</ul></nav><main>{articles}</main>'
+        f'<footer>{"<p>Footer</p>" * 100}</footer></body></html>'
+    ).encode()
+
+
+def synthetic_article_page(path: str) -> bytes:
+    """
+    Render an article page of roughly the size of a real article.
+    """
+    paragraphs = ''.join(f'<p>Paragraph {i} of the synthetic article {path}. {"Lorem ipsum dolor sit amet. " * 8}</p>'
+                         for i in range(40))
+    return (
+        f'<!DOCTYPE html><html><head><title>{path}</title>{"<script>var x = 1;</script>" * 20}</head>'
+        f'<body><nav>{"<a href=/en/news>News</a>" * 100}</nav><article><h1>{path}</h1>{paragraphs}</article>'
+        f'<footer>{"<p>Footer</p>" * 100}</footer></body></html>'
+    ).encode()
+
+
+class ArchiveRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves /archive?page=N as a synthetic archive page and /en/news/... as a synthetic article page,
+    with keep-alive support.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serve the requested archive or article page."""
+        if self.server.response_delay:
+            time.sleep(self.server.response_delay)
+        url = urlparse(self.path)
+        if url.path.startswith('/en/news/'):
+            body = synthetic_article_page(url.path)
+        else:
+            page_number = int(parse_qs(url.query).get('page', ['1'])[0])
+            body = synthetic_archive_page(page_number, self.server.links_per_page)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):  # pylint: disable=arguments-differ
+        """Keep the benchmark output quiet."""
+
+
+class SyntheticArchiveServer:
+    """
+    Local stand-in for the WotC archive, running in a background thread.
+    """
+    def __init__(self, links_per_page: int = 24, response_delay: float = 0.0) -> None:
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), ArchiveRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.links_per_page = links_per_page
+        self.httpd.response_delay = response_delay
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the server for ArticleDownloader(base_url=...)."""
+        return f'http://127.0.0.1:{self.httpd.server_port}/'
+
+    @property
+    def archive_url(self) -> str:
+        """Archive URL template for Scraper(archive_url=...)."""
+        return f'http://127.0.0.1:{self.httpd.server_port}/archive?page={{page_number}}'
+
+    def __enter__(self) -> 'SyntheticArchiveServer':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeDocumentSnapshot:
+    """
+    Minimal stand-in for a Firestore DocumentSnapshot.
+    """
+    def __init__(self, doc_id: str, data: Optional[Dict[str, Any]], reference: 'FakeDocumentReference') -> None:
+        self.id = doc_id  # pylint: disable=invalid-name
+        self._data = data
+        self.reference = reference
+
+    @property
+    def exists(self) -> bool:
+        """Whether the document exists."""
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        """Return a copy of the document data."""
+        return dict(self._data) if self._data is not None else None
+
+    def get(self, field: str) -> Any:
+        """Return a single field of the document."""
+        return self._data[field]
+
+
+class FakeDocumentReference:
+    """
+    Minimal stand-in for a Firestore DocumentReference.
+    """
+    def __init__(self, collection: 'FakeCollection', doc_id: str) -> None:
+        self.collection = collection
+        self.id = doc_id  # pylint: disable=invalid-name
+
+    def set(self, data: Dict[str, Any]) -> None:
+        """Write the document."""
+        self.collection.rpc()
+        with self.collection.lock:
+            self.collection.documents[self.id] = dict(data)
+            self.collection.writes += 1
+
+    def get(self) -> FakeDocumentSnapshot:
+        """Read the document."""
+        self.collection.rpc()
+        with self.collection.lock:
+            self.collection.reads += 1
+            return FakeDocumentSnapshot(self.id, self.collection.documents.get(self.id), self)
+
+    def delete(self) -> None:
+        """Delete the document."""
+        self.collection.rpc()
+        with self.collection.lock:
+            self.collection.documents.pop(self.id, None)
+
+
+class FakeWriteBatch:
+    """
+    Minimal stand-in for a Firestore WriteBatch.
+    """
+    def __init__(self, collection: 'FakeCollection') -> None:
+        self.collection = collection
+        self.writes: List[Any] = []
+
+    def set(self, reference: FakeDocumentReference, data: Dict[str, Any]) -> None:
+        """Queue a write."""
+        self.writes.append((reference.id, dict(data)))
+
+    def commit(self) -> None:
+        """Apply all queued writes with one simulated round trip."""
+        self.collection.rpc()
+        with self.collection.lock:
+            for doc_id, data in self.writes:
+                self.collection.documents[doc_id] = data
+            self.collection.writes += len(self.writes)
+        self.writes = []
+
+
+class FakeBulkWriteOperation:
+    """
+    Minimal stand-in for the operation of a Firestore BulkWriteFailure.
+    """
+    def __init__(self, reference: FakeDocumentReference) -> None:
+        self.reference = reference
+
+
+class FakeBulkWriteFailure:
+    """
+    Minimal stand-in for a Firestore BulkWriteFailure.
+    """
+    def __init__(self, reference: FakeDocumentReference, code: int) -> None:
+        self.operation = FakeBulkWriteOperation(reference)
+        self.code = code
+        self.attempts = 1
+
+
+class FakeBulkWriter:
+    """
+    Minimal stand-in for a Firestore BulkWriter that creates documents in batches of BATCH_SIZE, one simulated
+    round trip each. A create of an existing document fails with ALREADY_EXISTS.
+    """
+    BATCH_SIZE = 20
+    ALREADY_EXISTS = 6
+
+    def __init__(self, collection: 'FakeCollection') -> None:
+        self.collection = collection
+        self.creates: List[Any] = []
+        self._on_result = None
+        self._on_error = None
+
+    def on_write_result(self, callback) -> None:
+        """Register the callback of successful writes."""
+        self._on_result = callback
+
+    def on_write_error(self, callback) -> None:
+        """Register the callback of failed writes."""
+        self._on_error = callback
+
+    def create(self, reference: FakeDocumentReference, data: Dict[str, Any]) -> None:
+        """Queue a create."""
+        self.creates.append((reference, dict(data)))
+
+    def close(self) -> None:
+        """Apply all queued creates and report their outcome to the callbacks."""
+        for start in range(0, len(self.creates), self.BATCH_SIZE):
+            self.collection.rpc()
+            outcomes = []
+            with self.collection.lock:
+                for reference, data in self.creates[start:start + self.BATCH_SIZE]:
+                    created = reference.id not in self.collection.documents
+                    if created:
+                        self.collection.documents[reference.id] = data
+                        self.collection.writes += 1
+                    outcomes.append((reference, created))
+            for reference, created in outcomes:
+                if created:
+                    self._on_result(reference, None, self)
+                else:
+                    self._on_error(FakeBulkWriteFailure(reference, self.ALREADY_EXISTS), self)
+        self.creates = []
+
+
+class FakeClient:
+    """
+    Minimal stand-in for the Firestore client behind a collection.
+    """
+    def __init__(self, collection: 'FakeCollection') -> None:
+        self.collection = collection
+
+    def batch(self) -> FakeWriteBatch:
+        """Create a write batch."""
+        return FakeWriteBatch(self.collection)
+
+    def bulk_writer(self) -> FakeBulkWriter:
+        """Create a bulk writer."""
+        return FakeBulkWriter(self.collection)
+
+    def get_all(self, references: List[FakeDocumentReference],
+                field_paths: Optional[List[str]] = None) -> Iterator[FakeDocumentSnapshot]:
+        """Read several documents with one RPC, projected to field_paths if given."""
+        self.collection.rpc()
+        with self.collection.lock:
+            documents = [(reference, self.collection.documents.get(reference.id)) for reference in references]
+        for reference, data in documents:
+            self.collection.reads += 1
+            if data is not None and field_paths is not None:
+                data = {field: data[field] for field in field_paths if field in data}
+            yield FakeDocumentSnapshot(reference.id, data, reference)
+
+
+class FakeQuery:
+    """
+    Minimal stand-in for a Firestore query with where filters and field projections.
+    """
+    OPERATORS = {
+        '>=': lambda value, bound: value >= bound,
+        '<=': lambda value, bound: value <= bound,
+        '>': lambda value, bound: value > bound,
+        '<': lambda value, bound: value < bound,
+        '==': lambda value, bound: value == bound,
+    }
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, collection: 'FakeCollection', filters=(), projection: Optional[List[str]] = None, *,
+                 order=(), limit: Optional[int] = None, cursor: Optional[FakeDocumentSnapshot] = None) -> None:
+        self.collection = collection
+        self.filters = list(filters)
+        self.projection = projection
+        self.order = list(order)
+        self.limit_count = limit
+        self.cursor = cursor
+
+    def _derive(self, **changes: Any) -> 'FakeQuery':
+        arguments = {'filters': self.filters, 'projection': self.projection, 'order': self.order,
+                     'limit': self.limit_count, 'cursor': self.cursor}
+        arguments.update(changes)
+        return FakeQuery(self.collection, **arguments)
+
+    def where(self, field: str, operator: str, value: Any) -> 'FakeQuery':
+        """Add a filter."""
+        return self._derive(filters=self.filters + [(field, operator, value)])
+
+    def select(self, field_paths: List[str]) -> 'FakeQuery':
+        """Project the given fields; ['__name__'] is a keys-only query."""
+        return self._derive(projection=list(field_paths))
+
+    def order_by(self, field: str) -> 'FakeQuery':
+        """Order by a field; '__name__' orders by document ID."""
+        return self._derive(order=self.order + [field])
+
+    def limit(self, count: int) -> 'FakeQuery':
+        """Return at most `count` documents."""
+        return self._derive(limit=count)
+
+    def start_after(self, snapshot: FakeDocumentSnapshot) -> 'FakeQuery':
+        """Continue after the given document of the ordering."""
+        return self._derive(cursor=snapshot)
+
+    def _sort_key(self, doc_id: str, data: Dict[str, Any]) -> tuple:
+        return tuple(doc_id if field == '__name__' else data.get(field) for field in self.order) + (doc_id,)
+
+    def _matches(self, data: Dict[str, Any]) -> bool:
+        for field, operator, bound in self.filters:
+            if field not in data or data[field] is None or not self.OPERATORS[operator](data[field], bound):
+                return False
+        return True
+
+    def stream(self) -> Iterator[FakeDocumentSnapshot]:
+        """Stream the matching documents."""
+        self.collection.rpc()
+        with self.collection.lock:
+            items = [(doc_id, data) for doc_id, data in self.collection.documents.items() if self._matches(data)]
+        items.sort(key=lambda item: self._sort_key(*item))
+        if self.cursor is not None:
+            cursor_key = self._sort_key(self.cursor.id, self.collection.documents.get(self.cursor.id, {}))
+            items = [item for item in items if self._sort_key(*item) > cursor_key]
+        if self.limit_count is not None:
+            items = items[:self.limit_count]
+        for doc_id, data in items:
+            self.collection.reads += 1
+            if self.projection is not None:
+                data = {field: data[field] for field in self.projection if field in data}
+            yield FakeDocumentSnapshot(doc_id, data, FakeDocumentReference(self.collection, doc_id))
+
+
+class FakeCollection(FakeQuery):
+    """
+    In-process stand-in for the Firestore CollectionReference used by FirestoreArticleLinkAdapter.
+    Every round trip sleeps `rpc_latency` seconds to model network latency.
+    """
+    def __init__(self, rpc_latency: float = 0.0) -> None:
+        super().__init__(self)
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.rpc_latency = rpc_latency
+        self.rpcs = 0
+        self.reads = 0
+        self.writes = 0
+        self._client = FakeClient(self)
+
+    def rpc(self) -> None:
+        """Account for one simulated round trip."""
+        self.rpcs += 1
+        if self.rpc_latency:
+            time.sleep(self.rpc_latency)
+
+    def document(self, doc_id: str) -> FakeDocumentReference:
+        """Return a reference to a document."""
+        return FakeDocumentReference(self, doc_id)
+
+    def seed(self, count: int) -> None:
+        """Store `count` known links that do not appear in the synthetic archive."""
+        link_added_at = datetime.datetime.now() - datetime.timedelta(days=1)
+        for i in range(count):
+            url = f'https://magic.wizards.com/en/news/seeded/article-{i}'
+            self.documents[hashlib.md5(url.encode()).hexdigest()] = {'url': url, 'link_added_at': link_added_at}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Return the nearest-rank percentile of the values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of the current process in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def run_scrape_benchmark(*, pages: int = 100, links_per_page: int = 24, known_links: int = 10000,
+                         max_workers: int = 4, rpc_latency: float = 0.0, response_delay: float = 0.0,
+                         parser=None) -> Dict[str, Any]:
+    """
+    Run `Scraper.scrape_links` over `pages` synthetic archive pages against the Firestore stand-in
+    seeded with `known_links` links, and return the measurements.
+    """
+    collection = FakeCollection(rpc_latency=rpc_latency)
+    collection.seed(known_links)
+    adapter = FirestoreArticleLinkAdapter(collection)
+
+    with SyntheticArchiveServer(links_per_page=links_per_page, response_delay=response_delay) as server:
+        session = create_session(max_workers)
+        page_latencies: List[float] = []
+        session_get = session.get
+
+        def timed_get(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return session_get(*args, **kwargs)
+            finally:
+                page_latencies.append(time.perf_counter() - start_time)
+
+        session.get = timed_get
+        scraper = Scraper(adapter, max_workers=max_workers, requests_per_second=None, session=session,
+                          parser=parser, archive_url=server.archive_url)
+        startup_times: List[float] = []
+        # pylint: disable=protected-access
+        load_known_link_ids = scraper._load_known_link_ids
+
+        def timed_load_known_link_ids():
+            start_time = time.perf_counter()
+            known_link_ids = load_known_link_ids()
+            startup_times.append(time.perf_counter() - start_time)
+            return known_link_ids
+
+        scraper._load_known_link_ids = timed_load_known_link_ids
+        start_time = time.perf_counter()
+        scraper.scrape_links(1, pages + 1)
+        elapsed_time = time.perf_counter() - start_time
+        session.close()
+
+    links_saved = len(collection.documents) - known_links
+    return {
+        'parameters': {
+            'pages': pages,
+            'links_per_page': links_per_page,
+            'known_links': known_links,
+            'max_workers': max_workers,
+            'rpc_latency': rpc_latency,
+            'response_delay': response_delay,
+            'parser': type(scraper.parser).__name__,
+        },
+        'elapsed_seconds': elapsed_time,
+        'startup_seconds': startup_times[0] if startup_times else 0.0,
+        'pages_per_second': pages / elapsed_time,
+        'links_per_second': links_saved / elapsed_time,
+        'links_saved': links_saved,
+        'page_latency_p50_ms': percentile(page_latencies, 0.50) * 1000,
+        'page_latency_p99_ms': percentile(page_latencies, 0.99) * 1000,
+        'page_latency_mean_ms': statistics.fmean(page_latencies) * 1000 if page_latencies else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'firestore_rpcs': collection.rpcs,
+        'firestore_reads': collection.reads,
+        'firestore_writes': collection.writes,
+    }
+
+
+def run_download_benchmark(*, articles: int = 500, max_concurrency: int = 8,
+                           response_delay: float = 0.0) -> Dict[str, Any]:
+    """
+    Run `ArticleDownloader.download_pending` over `articles` synthetic articles into a local store in a
+    temporary directory, and return the measurements. A second run measures the cost of skipping
+    articles that are already downloaded.
+    """
+    adapter = InMemoryArticleLinkAdapter()
+    adapter.save_links([ArticleLink(f'/en/news/synthetic/article-{i}') for i in range(articles)])
+
+    with SyntheticArchiveServer(response_delay=response_delay) as server, \
+            tempfile.TemporaryDirectory() as directory, \
+            DownloadLedger(os.path.join(directory, 'downloads.db')) as ledger:
+        store = LocalArticleStore(os.path.join(directory, 'articles'))
+        with ArticleDownloader(adapter, store, ledger, max_concurrency=max_concurrency, requests_per_second=None,
+                               base_url=server.base_url) as downloader:
+            stats = downloader.download_pending()
+            rerun_stats = downloader.download_pending()
+
+    return {
+        'parameters': {
+            'articles': articles,
+            'max_concurrency': max_concurrency,
+            'response_delay': response_delay,
+        },
+        'elapsed_seconds': stats['elapsed_seconds'],
+        'articles_per_second': stats['articles_per_second'],
+        'articles_downloaded': stats['downloaded'],
+        'articles_failed': stats['failed'],
+        'rerun_seconds': rerun_stats['elapsed_seconds'],
+        'rerun_skipped': rerun_stats['skipped'],
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_export_benchmark(*, documents: int = 20000, page_size: int = 1000, export_format: str = 'jsonl',
+                         rpc_latency: float = 0.0) -> Dict[str, Any]:
+    """
+    Run `export_links` over the Firestore stand-in seeded with `documents` links into a temporary file, and
+    return the measurements.
+    """
+    collection = FakeCollection(rpc_latency=rpc_latency)
+    collection.seed(documents)
+    adapter = FirestoreArticleLinkAdapter(collection, page_size=page_size)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'links.jsonl.gz' if export_format == 'jsonl' else 'links.parquet')
+        stats = export_links(adapter, path, export_format=export_format)
+        file_size = os.path.getsize(path)
+
+    return {
+        'parameters': {
+            'documents': documents,
+            'page_size': page_size,
+            'export_format': export_format,
+            'rpc_latency': rpc_latency,
+        },
+        'elapsed_seconds': stats['elapsed_seconds'],
+        'docs_per_second': stats['docs_per_second'],
+        'exported': stats['exported'],
+        'file_bytes': file_size,
+        'firestore_rpcs': collection.rpcs,
+        'firestore_reads': collection.reads,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_import_benchmark(*, links: int = 20000, known_links: int = 5000, batch_size: int = 500,
+                         write_workers: int = 8, rpc_latency: float = 0.0) -> Dict[str, Any]:
+    """
+    Run `LinkImporter.import_file` over a gzip JSONL file of `links` links, of which the first `known_links`
+    are already stored in the Firestore stand-in, and return the measurements.
+    """
+    collection = FakeCollection(rpc_latency=rpc_latency)
+    collection.seed(known_links)
+    adapter = FirestoreArticleLinkAdapter(collection, batch_size=min(batch_size, 500))
+    link_added_at = datetime.datetime.now().isoformat()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'links.jsonl.gz')
+        with gzip.open(path, 'wt', encoding='utf-8') as links_file:
+            for i in range(links):
+                links_file.write(json.dumps({'url': f'https://magic.wizards.com/en/news/seeded/article-{i}',
+                                             'link_added_at': link_added_at}) + '\n')
+        stats = LinkImporter(adapter, batch_size=batch_size, write_workers=write_workers).import_file(path)
+
+    return {
+        'parameters': {
+            'links': links,
+            'known_links': known_links,
+            'batch_size': batch_size,
+            'write_workers': write_workers,
+            'rpc_latency': rpc_latency,
+        },
+        'elapsed_seconds': stats['elapsed_seconds'],
+        'links_per_second': stats['records_per_second'],
+        'imported': stats['imported'],
+        'existing': stats['existing'],
+        'firestore_rpcs': collection.rpcs,
+        'firestore_reads': collection.reads,
+        'firestore_writes': collection.writes,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def _measure_build(build, url_hashes: List[str]) -> Dict[str, Any]:
+    """
+    Build a container of the url hashes and return it with its build time and the memory it holds. The hashes
+    are passed as fresh strings, as the adapter yields them, so a container holding strings pays for them.
+    Memory is measured in a second build, as tracing allocations slows the build down.
+    """
+    start_time = time.perf_counter()
+    container = build(url_hash[:16] + url_hash[16:] for url_hash in url_hashes)
+    elapsed_time = time.perf_counter() - start_time
+    tracemalloc.start()
+    try:
+        traced_container = build(url_hash[:16] + url_hash[16:] for url_hash in url_hashes)
+        memory_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del traced_container
+    return {'container': container, 'build_seconds': elapsed_time, 'memory_mb': memory_bytes / 2 ** 20}
+
+
+def _lookups_per_second(container, url_hashes: List[str]) -> float:
+    start_time = time.perf_counter()
+    for url_hash in url_hashes:
+        _ = url_hash in container
+    return len(url_hashes) / (time.perf_counter() - start_time)
+
+
+def run_known_link_index_benchmark(*, hashes: int = 200000) -> Dict[str, Any]:
+    """
+    Build a `KnownLinkIndex` and a set of hex strings from `hashes` url hashes and return the build times,
+    the memory held by each and the lookups/sec of known and unknown hashes. The build time is the start-up
+    cost of a scrape without a snapshot.
+    """
+    url_hashes = [hashlib.md5(f'https://magic.wizards.com/en/news/seeded/article-{i}'.encode()).hexdigest()
+                  for i in range(hashes)]
+    unknown_hashes = [hashlib.md5(f'https://magic.wizards.com/en/news/unknown/article-{i}'.encode()).hexdigest()
+                      for i in range(hashes)]
+    index = _measure_build(KnownLinkIndex, url_hashes)
+    hex_set = _measure_build(set, url_hashes)
+
+    return {
+        'parameters': {
+            'hashes': hashes,
+        },
+        'index_build_seconds': index['build_seconds'],
+        'set_build_seconds': hex_set['build_seconds'],
+        'index_memory_mb': index['memory_mb'],
+        'set_memory_mb': hex_set['memory_mb'],
+        'index_lookups_per_second': _lookups_per_second(index['container'], url_hashes + unknown_hashes),
+        'set_lookups_per_second': _lookups_per_second(hex_set['container'], url_hashes + unknown_hashes),
+        'index_size': len(index['container']),
+    }
+
+
+def git_revision() -> str:
+    """
+    Short hash of the checked out commit, or 'unknown' outside of a git work tree.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def write_results(name: str, results: Dict[str, Any], results_dir: Optional[str] = None) -> str:
+    """
+    Store benchmark results as JSON, named after the benchmark and the current commit, and return the path.
+    The directory defaults to $BENCHMARK_RESULTS_DIR or ./benchmark_results.
+    """
+    results_dir = results_dir or os.getenv('BENCHMARK_RESULTS_DIR', DEFAULT_RESULTS_DIR)
+    os.makedirs(results_dir, exist_ok=True)
+    revision = git_revision()
+    document = {
+        'benchmark': name,
+        'revision': revision,
+        'recorded_at': datetime.datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+    path = os.path.join(results_dir, f'{name}-{revision}.json')
+    with open(path, 'w', encoding='utf-8') as results_file:
+        json.dump(document, results_file, indent=2)
+    return path
+
+
+def main() -> None:
+    """
+    Run one benchmark scenario in this process and print and store its results.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--name', default='scrape_links')
+    arg_parser.add_argument('--pages', type=int, default=100)
+    arg_parser.add_argument('--links-per-page', type=int, default=24)
+    arg_parser.add_argument('--known-links', type=int, default=10000)
+    arg_parser.add_argument('--max-workers', type=int, default=4)
+    arg_parser.add_argument('--rpc-latency', type=float, default=0.0)
+    arg_parser.add_argument('--response-delay', type=float, default=0.0)
+    arg_parser.add_argument('--results-dir', default=None)
+    args = arg_parser.parse_args()
+
+    results = run_scrape_benchmark(pages=args.pages, links_per_page=args.links_per_page,
+                                   known_links=args.known_links, max_workers=args.max_workers,
+                                   rpc_latency=args.rpc_latency, response_delay=args.response_delay)
+    print(json.dumps(results, indent=2))
+    print(write_results(args.name, results, args.results_dir))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+test_article_download_benchmark.py
+
+This module runs the offline ArticleDownloader benchmark: synthetic articles are served by the local HTTP
+server of the benchmark harness and stored in a temporary directory, so the benchmark needs neither network
+access nor credentials. The measurements are logged and stored as JSON for comparison across commits.
+"""
+
+import logging
+
+import pytest
+
+from tests.performance.benchmark_harness import run_download_benchmark, write_results
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("max_concurrency", [1, 8])
+def test_article_download_benchmark(tmp_path, monkeypatch, max_concurrency):
+    """
+    Benchmark downloading 300 synthetic articles with 5 ms server latency, and a rerun that skips them all.
+    """
+    monkeypatch.setenv("BENCHMARK_RESULTS_DIR", str(tmp_path))
+    results = run_download_benchmark(articles=300, max_concurrency=max_concurrency, response_delay=0.005)
+
+    for metric, value in results.items():
+        logger.info("%s: %s", metric, value)
+    path = write_results(f"article_download_{max_concurrency}", results)
+    logger.info("Stored benchmark results in %s", path)
+
+    assert results["articles_downloaded"] == 300
+    assert results["articles_failed"] == 0
+    assert results["rerun_skipped"] == 300
+    assert results["articles_per_second"] > 0
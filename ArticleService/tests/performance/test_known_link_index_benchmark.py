@@ -0,0 +1,35 @@
+"""
+test_known_link_index_benchmark.py
+
+This module runs the offline benchmark of the KnownLinkIndex: the index and a set of hex strings are built from
+the same url hashes, so the benchmark tracks the start-up cost of a scrape as well as the memory of the index.
+The measurements are logged and stored as JSON for comparison across commits.
+"""
+
+import logging
+
+import pytest
+
+from tests.performance.benchmark_harness import run_known_link_index_benchmark, write_results
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.performance
+def test_known_link_index_benchmark(tmp_path, monkeypatch):
+    """
+    Benchmark building and probing an index of 200000 url hashes against a set of hex strings.
+    """
+    monkeypatch.setenv("BENCHMARK_RESULTS_DIR", str(tmp_path))
+    results = run_known_link_index_benchmark(hashes=200000)
+
+    for metric, value in results.items():
+        logger.info("%s: %s", metric, value)
+    path = write_results("known_link_index", results)
+    logger.info("Stored benchmark results in %s", path)
+
+    assert results["index_size"] == 200000
+    assert results["index_memory_mb"] < results["set_memory_mb"]
+    # The index converts every hex hash to a digest, but must stay well under a second for 200000 hashes
+    assert results["index_build_seconds"] < 10 * results["set_build_seconds"] + 0.1
+    assert results["index_build_seconds"] < 1.0
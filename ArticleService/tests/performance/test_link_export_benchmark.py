@@ -0,0 +1,36 @@
+"""
+test_link_export_benchmark.py
+
+This module runs the offline export benchmark: links are streamed from the in-process Firestore stand-in of the
+benchmark harness into a temporary export file, so the benchmark needs neither network access nor credentials.
+The measurements are logged and stored as JSON for comparison across commits.
+"""
+
+import logging
+
+import pytest
+
+from tests.performance.benchmark_harness import run_export_benchmark, write_results
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("export_format", ["jsonl", "parquet"])
+def test_link_export_benchmark(tmp_path, monkeypatch, export_format):
+    """
+    Benchmark exporting 20000 links in cursor pages of 1000 documents.
+    """
+    if export_format == "parquet":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setenv("BENCHMARK_RESULTS_DIR", str(tmp_path))
+    results = run_export_benchmark(documents=20000, page_size=1000, export_format=export_format)
+
+    for metric, value in results.items():
+        logger.info("%s: %s", metric, value)
+    path = write_results(f"link_export_{export_format}", results)
+    logger.info("Stored benchmark results in %s", path)
+
+    assert results["exported"] == 20000
+    assert results["firestore_rpcs"] == 21
+    assert results["docs_per_second"] > 0
@@ -0,0 +1,36 @@
+"""
+test_link_import_benchmark.py
+
+This module runs the offline import benchmark: links are imported from a temporary JSONL file into the
+in-process Firestore stand-in of the benchmark harness, whose RPCs take a fixed latency, so the benchmark needs
+neither network access nor credentials. The measurements are logged and stored as JSON for comparison across
+commits.
+"""
+
+import logging
+
+import pytest
+
+from tests.performance.benchmark_harness import run_import_benchmark, write_results
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("write_workers", [1, 8])
+def test_link_import_benchmark(tmp_path, monkeypatch, write_workers):
+    """
+    Benchmark importing 20000 links, 5000 of them already stored, with 5 ms per Firestore RPC.
+    """
+    monkeypatch.setenv("BENCHMARK_RESULTS_DIR", str(tmp_path))
+    results = run_import_benchmark(links=20000, known_links=5000, write_workers=write_workers, rpc_latency=0.005)
+
+    for metric, value in results.items():
+        logger.info("%s: %s", metric, value)
+    path = write_results(f"link_import_{write_workers}", results)
+    logger.info("Stored benchmark results in %s", path)
+
+    assert results["imported"] == 15000
+    assert results["existing"] == 5000
+    assert results["firestore_writes"] == 15000
+    assert results["links_per_second"] > 0
@@ -0,0 +1,47 @@
+"""
+test_offline_benchmark.py
+
+This module runs the offline Scraper benchmark: synthetic archive pages are served by a local HTTP server
+and links are stored in an in-process Firestore stand-in, so the benchmark needs neither network access nor
+credentials and can run in CI. The measurements are logged and stored as JSON for comparison across commits.
+"""
+
+import logging
+
+import pytest
+
+from src.page_parser import create_page_parser
+from tests.performance.benchmark_harness import run_scrape_benchmark, write_results
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.performance
+def test_offline_scrape_benchmark(tmp_path, monkeypatch):
+    """
+    Benchmark a concurrent scrape of 50 synthetic pages against 20000 known links.
+    """
+    monkeypatch.setenv("BENCHMARK_RESULTS_DIR", str(tmp_path))
+    results = run_scrape_benchmark(pages=50, links_per_page=24, known_links=20000, max_workers=4)
+
+    for metric, value in results.items():
+        logger.info("%s: %s", metric, value)
+    path = write_results("offline_scrape", results)
+    logger.info("Stored benchmark results in %s", path)
+
+    assert results["links_saved"] == 50 * 24
+    assert results["pages_per_second"] > 0
+    assert results["page_latency_p99_ms"] >= results["page_latency_p50_ms"]
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("backend", ["html.parser", "strainer", "lxml"])
+def test_offline_parser_benchmark(backend):
+    """
+    Compare the parser backends on the same synthetic archive.
+    """
+    results = run_scrape_benchmark(pages=30, known_links=0, max_workers=1, parser=create_page_parser(backend))
+    logger.info("%s: %.1f pages/sec, p50 %.2f ms", backend, results["pages_per_second"],
+                results["page_latency_p50_ms"])
+
+    assert results["links_saved"] == 30 * 24
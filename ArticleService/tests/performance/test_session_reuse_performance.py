@@ -0,0 +1,99 @@
+"""
+test_session_reuse_performance.py
+
+This module compares the per-page latency of the Scraper with a pooled keep-alive session against
+a session that opens a new connection for every page. The archive is served by a local HTTP/1.1 server,
+so no credentials or network access are required.
+"""
+
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from src.link_scraper import FirestoreArticleLinkAdapter, Scraper
+
+logger = logging.getLogger(__name__)
+
+PAGES = 200
+ARCHIVE_PAGE = ''.join(
+    f'<article class="css-415ug css-o3Y69"><a href="/en/news/article-{i}"><h3>Article {i}</h3></a></article>'
+    for i in range(20)
+).encode()
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    """
+    Request handler serving the same synthetic archive page with keep-alive support.
+    """
+    protocol_version = 'HTTP/1.1'
+    # Avoid Nagle/delayed-ACK stalls on the reused connection, which would hide the saving
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connection_count += 1
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serve the archive page."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(ARCHIVE_PAGE)))
+        self.end_headers()
+        self.wfile.write(ARCHIVE_PAGE)
+
+    def log_message(self, *_args):  # pylint: disable=arguments-differ
+        """Keep the test output quiet."""
+
+
+@pytest.fixture(name="archive_server")
+def fixture_archive_server():
+    """
+    Pytest fixture that runs the local archive server for the duration of a test.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ArchiveHandler)
+    server.connection_count = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def measure_page_latency(server, session):
+    """
+    Scrape PAGES pages from the local server and return the mean seconds per page and the connections opened.
+    """
+    server.connection_count = 0
+    archive_url = f'http://127.0.0.1:{server.server_port}/archive?page={{page_number}}'
+    scraper = Scraper(MagicMock(spec=FirestoreArticleLinkAdapter), requests_per_second=None, session=session,
+                      archive_url=archive_url)
+    start_time = time.perf_counter()
+    scraper.scrape_links(1, PAGES + 1)
+    elapsed_time = time.perf_counter() - start_time
+    session.close()
+    return elapsed_time / PAGES, server.connection_count
+
+
+@pytest.mark.performance
+def test_pooled_session_latency(archive_server):
+    """
+    Performance test showing the per-page latency saving of reusing pooled keep-alive connections.
+    """
+    closing_session = requests.Session()
+    closing_session.headers['Connection'] = 'close'
+    fresh_latency, fresh_connections = measure_page_latency(archive_server, closing_session)
+
+    pooled_scraper = Scraper(MagicMock(spec=FirestoreArticleLinkAdapter))
+    pooled_latency, pooled_connections = measure_page_latency(archive_server, pooled_scraper.session)
+
+    logger.info("New connection per page: %.3f ms per page, %s connections", fresh_latency * 1000, fresh_connections)
+    logger.info("Pooled session: %.3f ms per page, %s connections", pooled_latency * 1000, pooled_connections)
+    logger.info("Saving per page: %.3f ms", (fresh_latency - pooled_latency) * 1000)
+
+    assert fresh_connections == PAGES
+    assert pooled_connections == 1
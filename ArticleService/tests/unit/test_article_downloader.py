@@ -0,0 +1,176 @@
+# test_article_downloader.py
+"""
+Test module for the ArticleDownloader and DownloadLedger classes. Links are kept in an InMemoryArticleLinkAdapter,
+articles in a LocalArticleStore under a temporary directory, and the HTTP session is mocked.
+"""
+
+import datetime
+import logging
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from src.article_downloader import ArticleDownloader, DownloadLedger, extract_article_text
+from src.article_handler import ArticleLink
+from src.article_store import LocalArticleStore
+from src.fetch_policy import FetchPolicy
+from src.memory_article_link_adapter import InMemoryArticleLinkAdapter
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+START = datetime.datetime(2023, 5, 1, 12, 0, 0)
+
+
+def article_page(url):
+    """
+    Helper function returning the HTML of an article page.
+    """
+    return (f'<html><head><script>var x = 1;</script></head><body><nav>Menu</nav>'
+            f'<article><h1>Title of {url}</h1><p>Body text</p></article></body></html>').encode()
+
+
+class FakeSession:
+    """
+    Stand-in for a requests session answering article requests, with 404 responses for the urls in `missing`.
+    It records the requested urls and the highest number of concurrent requests.
+    """
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.requested = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, **_kwargs):
+        """Answer a GET request."""
+        with self._lock:
+            self.requested.append(url)
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            if url in self.missing:
+                response = MagicMock(status_code=404, headers={})
+                response.raise_for_status.side_effect = requests.HTTPError('404 Error', response=response)
+                return response
+            return MagicMock(content=article_page(url))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+@pytest.fixture(name="adapter")
+def fixture_adapter():
+    """
+    Pytest fixture that returns an adapter holding six relative article links added an hour apart.
+    """
+    adapter = InMemoryArticleLinkAdapter()
+    adapter.save_links([
+        ArticleLink(f'/en/news/article-{i}', START + datetime.timedelta(hours=i)) for i in range(6)
+    ])
+    return adapter
+
+
+@pytest.fixture(name="store")
+def fixture_store(tmp_path):
+    """
+    Pytest fixture that returns a local article store.
+    """
+    return LocalArticleStore(str(tmp_path / 'articles'))
+
+
+@pytest.fixture(name="ledger")
+def fixture_ledger(tmp_path):
+    """
+    Pytest fixture that returns a download ledger.
+    """
+    with DownloadLedger(str(tmp_path / 'downloads.db')) as ledger:
+        yield ledger
+
+
+def downloader(adapter, store, ledger, session, **kwargs):
+    """
+    Helper function creating an unthrottled downloader that does not retry.
+    """
+    return ArticleDownloader(adapter, store, ledger, session=session, requests_per_second=None,
+                             fetch_policy=FetchPolicy(max_retries=0), base_url='https://example.com/', **kwargs)
+
+
+def test_extract_article_text():
+    """
+    Test that the text of the article element is extracted without scripts and navigation.
+    """
+    assert extract_article_text(article_page('x')) == 'Title of x\nBody text'
+    assert extract_article_text(b'<html><body><p>Only</p><p>body</p></body></html>') == 'Only\nbody'
+
+
+def test_download_pending_stores_every_article(adapter, store, ledger):
+    """
+    Test that every article is fetched from the absolute url and stored with its text.
+    """
+    session = FakeSession()
+    stats = downloader(adapter, store, ledger, session, max_concurrency=3).download_pending()
+
+    assert (stats["downloaded"], stats["skipped"], stats["failed"]) == (6, 0, 0)
+    assert stats["articles_per_second"] > 0
+    assert sorted(session.requested) == sorted(f'https://example.com/en/news/article-{i}' for i in range(6))
+    assert session.max_in_flight <= 3
+    link = ArticleLink('/en/news/article-2')
+    assert store.load_text(link.url_hash) == 'Title of https://example.com/en/news/article-2\nBody text'
+    assert ledger.counts() == {"done": 6}
+
+
+def test_rerun_only_downloads_missing_articles(adapter, store, ledger):
+    """
+    Test that a rerun retries failed articles until they use up their attempts and skips downloaded ones.
+    """
+    session = FakeSession(missing={'https://example.com/en/news/article-4'})
+    stats = downloader(adapter, store, ledger, session, max_attempts=2).download_pending()
+    assert (stats["downloaded"], stats["skipped"], stats["failed"]) == (5, 0, 1)
+
+    session.requested.clear()
+    stats = downloader(adapter, store, ledger, session, max_attempts=2).download_pending()
+    assert (stats["downloaded"], stats["skipped"], stats["failed"]) == (0, 5, 1)
+    assert session.requested == ['https://example.com/en/news/article-4']
+    assert ledger.state(ArticleLink('/en/news/article-4').url_hash) == ('failed', 2)
+
+    session.requested.clear()
+    stats = downloader(adapter, store, ledger, session, max_attempts=2).download_pending()
+    assert (stats["downloaded"], stats["skipped"], stats["failed"]) == (0, 6, 0)
+    assert not session.requested
+
+
+def test_download_without_ledger_uses_store(adapter, store):
+    """
+    Test that without a ledger the articles already in the store are skipped.
+    """
+    store.save(ArticleLink('/en/news/article-0').url_hash, b'<html></html>', '')
+    session = FakeSession()
+    stats = downloader(adapter, store, None, session).download_pending()
+
+    assert (stats["downloaded"], stats["skipped"]) == (5, 1)
+    assert 'https://example.com/en/news/article-0' not in session.requested
+
+
+def test_download_pending_by_date_range(adapter, store, ledger):
+    """
+    Test that only the articles whose links were added in the date range are downloaded.
+    """
+    session = FakeSession()
+    stats = downloader(adapter, store, ledger, session).download_pending(
+        START + datetime.timedelta(hours=1), START + datetime.timedelta(hours=3))
+
+    assert stats["downloaded"] == 3
+    assert sorted(session.requested) == [f'https://example.com/en/news/article-{i}' for i in range(1, 4)]
+
+
+def test_invalid_arguments(adapter, store):
+    """
+    Test that the concurrency and the attempts must be positive.
+    """
+    with pytest.raises(ValueError):
+        ArticleDownloader(adapter, store, max_concurrency=0)
+    with pytest.raises(ValueError):
+        ArticleDownloader(adapter, store, max_attempts=0)
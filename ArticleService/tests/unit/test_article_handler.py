@@ -9,7 +9,7 @@ from datetime import datetime
 
 import pytest
 
-from src.article_handler import ArticleLink
+from src.article_handler import ArticleLink, ArticleLinkBatch
 
 # Setup logger right below imports
 logger = logging.getLogger(__name__)
@@ -44,3 +44,42 @@ def test_article_link_init_default_link_added_at(test_link_url):
     assert article_link.url == test_link_url
     assert article_link.url_hash == hashlib.md5(test_link_url.encode()).hexdigest()
     assert article_link.link_added_at is None
+
+
+def test_article_link_precomputed_hash(test_link_url):
+    """
+    Test that a precomputed url hash, e.g. a Firestore document ID, is used without hashing the URL
+    """
+    article_link = ArticleLink(test_link_url, url_hash="66ddaa70da65a525b5dc64efc8fe17b8")
+
+    assert article_link.url_hash == "66ddaa70da65a525b5dc64efc8fe17b8"
+
+
+def test_article_link_is_slotted(test_link_url):
+    """
+    Test that ArticleLink has no per-instance __dict__
+    """
+    article_link = ArticleLink(test_link_url)
+
+    assert not hasattr(article_link, '__dict__')
+    with pytest.raises(AttributeError):
+        setattr(article_link, 'title', 'title')
+
+
+def test_article_link_batch(test_link_url):
+    """
+    Test that ArticleLinkBatch hashes its URLs in bulk and yields ArticleLinks with the batch time
+    """
+    link_added_at = datetime.now()
+    urls = [test_link_url, test_link_url + '-2']
+    batch = ArticleLinkBatch(urls, link_added_at)
+
+    assert len(batch) == 2
+    assert batch.url_hashes == [hashlib.md5(url.encode()).hexdigest() for url in urls]
+    links = list(batch)
+    assert [link.url for link in links] == urls
+    assert [link.url_hash for link in links] == batch.url_hashes
+    assert all(link.link_added_at == link_added_at for link in links)
+
+    with pytest.raises(ValueError):
+        ArticleLinkBatch(urls, url_hashes=batch.url_hashes[:1])
@@ -0,0 +1,102 @@
+# test_article_store.py
+"""
+Test module for the LocalArticleStore and BucketArticleStore classes. Both stores run the same tests; the bucket
+is an in-memory stand-in for a Cloud Storage bucket.
+"""
+
+import gzip
+import logging
+
+import pytest
+
+from src.article_store import BucketArticleStore, LocalArticleStore
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+HTML = '<html><body><article><h1>Title</h1><p>Body text</p></article></body></html>'.encode()
+
+
+class FakeBlob:
+    """
+    Minimal stand-in for a Cloud Storage blob.
+    """
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_encoding = None
+
+    def exists(self):
+        """Whether the object exists."""
+        return self.name in self.bucket.objects
+
+    def upload_from_string(self, data, content_type=None):
+        """Store the object with its metadata."""
+        self.bucket.objects[self.name] = (data, content_type, self.content_encoding)
+
+    def download_as_bytes(self, raw_download=False):
+        """Return the stored bytes, decompressed unless a raw download is requested."""
+        data, _content_type, content_encoding = self.bucket.objects[self.name]
+        return data if raw_download or content_encoding != 'gzip' else gzip.decompress(data)
+
+
+class FakeBucket:
+    """
+    Minimal stand-in for a Cloud Storage bucket.
+    """
+    def __init__(self):
+        self.objects = {}
+
+    def blob(self, name):
+        """Return a blob of the bucket."""
+        return FakeBlob(self, name)
+
+
+@pytest.fixture(name="store", params=["local", "bucket"])
+def fixture_store(request, tmp_path):
+    """
+    Pytest fixture that returns each article store.
+    """
+    if request.param == "local":
+        return LocalArticleStore(str(tmp_path / 'articles'))
+    return BucketArticleStore(FakeBucket())
+
+
+def test_save_and_load_article(store):
+    """
+    Test that a saved article is reported as stored and loads back unchanged.
+    """
+    assert not store.exists('abcdef')
+    assert store.load_html('abcdef') is None
+    assert store.load_text('abcdef') is None
+
+    store.save('abcdef', HTML, 'Title\nBody text')
+
+    assert store.exists('abcdef')
+    assert store.load_html('abcdef') == HTML
+    assert store.load_text('abcdef') == 'Title\nBody text'
+
+
+def test_local_store_compresses_files(tmp_path):
+    """
+    Test that the local store writes gzip files into a subdirectory named after the hash prefix.
+    """
+    store = LocalArticleStore(str(tmp_path))
+    store.save('abcdef', HTML, 'text')
+
+    with open(tmp_path / 'ab' / 'abcdef.html.gz', 'rb') as html_file:
+        assert gzip.decompress(html_file.read()) == HTML
+    assert not list(tmp_path.glob('ab/*.tmp'))
+
+
+def test_bucket_store_uploads_gzip_objects():
+    """
+    Test that the bucket store uploads compressed objects with a gzip content encoding under its prefix.
+    """
+    bucket = FakeBucket()
+    BucketArticleStore(bucket, prefix='raw/').save('abcdef', HTML, 'text')
+
+    data, content_type, content_encoding = bucket.objects['raw/abcdef.html.gz']
+    assert gzip.decompress(data) == HTML
+    assert (content_type, content_encoding) == ('text/html', 'gzip')
+    assert 'raw/abcdef.txt.gz' in bucket.objects
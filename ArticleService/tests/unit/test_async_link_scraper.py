@@ -0,0 +1,133 @@
+# test_async_link_scraper.py
+"""
+This module contains unit tests for the AsyncScraper class, the asyncio counterpart of the Scraper class.
+The aiohttp session and the async adapter are mocked, so the tests exercise the fetch, extract and save
+flow of the scraper without any network or database access.
+"""
+
+import asyncio
+import datetime
+import logging
+import re
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+import pytest
+
+from src.article_handler import ArticleLink
+from src.async_link_scraper import AsyncScraper
+from src.firestore_async_article_link_adapter import FirestoreAsyncArticleLinkAdapter
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+EXISTING_LINK = (
+    'https://magic.wizards.com/en/news/announcements/'
+    'the-lord-of-the-rings-tales-of-middle-earth-battle-of-the-pelennor-fields'
+)
+NEW_LINK = 'https://magic.wizards.com/en/news/making-magic/crafting-the-ring-part-1'
+
+
+@pytest.fixture(name="html_content_2_links")
+def html_content_two_articles():
+    """
+    Pytest fixture that returns a string of HTML content containing two article links.
+    """
+    return """
+    <article data-ctf-id="6un7L8lTRL696HYxwyVICi" class="css-415ug css-o3Y69">
+        <a href="/en/news/announcements/the-lord-of-the-rings-tales-of-middle-earth-battle-of-the-pelennor-fields">
+            <h3 class="css-9f4rq">The Lord of the Rings: Tales of Middle-earth™ Battle of the Pelennor Fields Statement</h3>
+        </a>
+    </article>
+        <article data-ctf-id="3J34TTSUAm8MO8o9fjk5Ek" class="css-415ug css-o3Y69">
+        <a href="/en/news/making-magic/crafting-the-ring-part-1">
+            <h3 class="css-9f4rq">Crafting the Ring, Part 1</h3>
+        </a>
+    </article>
+    """
+
+
+async def async_iter(items):
+    """
+    Helper async generator yielding the given items.
+    """
+    for item in items:
+        yield item
+
+
+def make_session(pages):
+    """
+    Helper function that returns a mocked aiohttp session serving the given page number to HTML mapping.
+    """
+    session = MagicMock()
+
+    def get_side_effect(url, **_kwargs):
+        page_number = int(re.search(r'page=(\d+)', url).group(1))
+        response = MagicMock()
+        if page_number in pages:
+            response.text = AsyncMock(return_value=pages[page_number])
+        else:
+            response.raise_for_status.side_effect = aiohttp.ClientResponseError(MagicMock(), (), status=500)
+        context_manager = MagicMock()
+        context_manager.__aenter__ = AsyncMock(return_value=response)
+        context_manager.__aexit__ = AsyncMock(return_value=False)
+        return context_manager
+
+    session.get.side_effect = get_side_effect
+    return session
+
+
+@pytest.fixture(name="adapter")
+def fixture_adapter():
+    """
+    Pytest fixture that returns a mocked async adapter with one known link.
+    """
+    adapter = MagicMock(spec=FirestoreAsyncArticleLinkAdapter)
+    known_link_ids = [ArticleLink(EXISTING_LINK, datetime.datetime.now()).url_hash]
+    adapter.iter_link_hashes = MagicMock(side_effect=lambda: async_iter(known_link_ids))
+    adapter.save_link = AsyncMock()
+    return adapter
+
+
+def test_scrape_links(adapter, html_content_2_links):
+    """
+    Test for the `scrape_links` method of the AsyncScraper class.
+    Only the unknown link of the page should be saved.
+    """
+    session = make_session({1: html_content_2_links})
+    scraper = AsyncScraper(adapter, requests_per_second=None, session=session)
+
+    stopped_on_existing = asyncio.run(scraper.scrape_links(1, 2))
+
+    assert stopped_on_existing is False
+    assert session.get.call_count == 1
+    adapter.save_link.assert_awaited_once()
+    assert adapter.save_link.await_args.args[0].url == NEW_LINK
+
+
+def test_scrape_existing_links_and_stop(adapter, html_content_2_links):
+    """
+    Test that the AsyncScraper stops at the first page with a known link, even with pages in flight.
+    """
+    session = make_session({page: html_content_2_links for page in range(1, 6)})
+    scraper = AsyncScraper(adapter, max_concurrency=3, requests_per_second=None, session=session)
+
+    stopped_on_existing = asyncio.run(scraper.scrape_links(1, 6, True))
+
+    assert stopped_on_existing is True
+    assert adapter.save_link.await_count == 1
+
+
+def test_scrape_links_skips_failed_pages(adapter, html_content_2_links):
+    """
+    Test that a page failing with an HTTP error is skipped and the following pages are still scraped.
+    """
+    adapter.iter_link_hashes.side_effect = lambda: async_iter([])
+    session = make_session({2: html_content_2_links})
+    scraper = AsyncScraper(adapter, max_concurrency=2, requests_per_second=None, session=session)
+
+    stopped_on_existing = asyncio.run(scraper.scrape_links(1, 3, True))
+
+    assert stopped_on_existing is False
+    assert session.get.call_count == 2
+    assert adapter.save_link.await_count == 2
@@ -0,0 +1,86 @@
+# test_crawl_checkpoint.py
+"""
+Test module for the CrawlCheckpoint class and its checkpoint stores. The file store writes to a temporary
+directory provided by pytest, the Firestore document is mocked.
+"""
+
+import logging
+from unittest.mock import MagicMock
+
+from src.crawl_checkpoint import CrawlCheckpoint, FileCheckpointStore, FirestoreCheckpointStore
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+
+def test_commit_and_fail_pages():
+    """
+    Test that committed and failed pages advance the next page and that committing a failed page clears it.
+    """
+    checkpoint = CrawlCheckpoint(1, 10)
+    assert checkpoint.next_page == 1
+
+    checkpoint.commit_page(1)
+    checkpoint.fail_page(2)
+    checkpoint.commit_page(3)
+    assert checkpoint.next_page == 4
+    assert checkpoint.failed_pages == [2]
+
+    checkpoint.commit_page(2)
+    assert checkpoint.failed_pages == []
+    assert checkpoint.last_committed_page == 3
+
+    checkpoint.stopped_on_existing = True
+    assert checkpoint.next_page == 10
+
+
+def test_file_store_round_trip(tmp_path):
+    """
+    Test that a checkpoint written to a file is loaded with the same progress.
+    """
+    store = FileCheckpointStore(str(tmp_path / 'checkpoint.json'))
+    assert store.load() is None
+
+    checkpoint = CrawlCheckpoint(1, 10, stop_on_existing=True)
+    checkpoint.commit_page(1)
+    checkpoint.fail_page(2)
+    store.save(checkpoint)
+
+    loaded = store.load()
+    assert loaded.run_id == checkpoint.run_id
+    assert loaded.matches(1, 10, True)
+    assert not loaded.matches(1, 10, False)
+    assert loaded.last_committed_page == 2
+    assert loaded.failed_pages == [2]
+    assert not loaded.completed
+
+
+def test_file_store_ignores_unreadable_checkpoint(tmp_path):
+    """
+    Test that a corrupt checkpoint file is treated as missing.
+    """
+    path = tmp_path / 'checkpoint.json'
+    path.write_text('{"from_page": 1', encoding='utf-8')
+
+    assert FileCheckpointStore(str(path)).load() is None
+
+
+def test_firestore_store_round_trip():
+    """
+    Test that the Firestore store writes the checkpoint to its document and reads it back.
+    """
+    document = MagicMock()
+    store = FirestoreCheckpointStore(document)
+    checkpoint = CrawlCheckpoint(1, 10)
+    checkpoint.commit_page(1)
+
+    store.save(checkpoint)
+    stored = document.set.call_args.args[0]
+    document.get.return_value = MagicMock(exists=True, to_dict=MagicMock(return_value=stored))
+
+    loaded = store.load()
+    assert loaded.run_id == checkpoint.run_id
+    assert loaded.next_page == 2
+
+    document.get.return_value = MagicMock(exists=False)
+    assert store.load() is None
@@ -0,0 +1,91 @@
+# test_fetch_policy.py
+"""
+Test module for the FetchPolicy and AdaptiveRateController classes
+"""
+
+import email.utils
+import logging
+import time
+
+import pytest
+
+from src.fetch_policy import AdaptiveRateController, FetchPolicy
+from src.rate_limiter import RateLimiter
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+
+def test_backoff_is_jittered_and_bounded():
+    """
+    Test that the backoff stays within the exponential bound and the configured maximum
+    """
+    policy = FetchPolicy(backoff_base=1.0, backoff_max=5.0)
+
+    for attempt in range(6):
+        delays = [policy.backoff(attempt) for _ in range(50)]
+        assert all(0 <= delay <= min(5.0, 2 ** attempt) for delay in delays)
+        assert len(set(delays)) > 1
+
+
+def test_backoff_honours_retry_after():
+    """
+    Test that a Retry-After delay is a lower bound of the backoff, capped at the maximum
+    """
+    policy = FetchPolicy(backoff_base=0.0, backoff_max=30.0)
+
+    assert policy.backoff(0, retry_after=7) == 7
+    assert policy.backoff(0, retry_after=120) == 30.0
+
+
+def test_parse_retry_after():
+    """
+    Test parsing of Retry-After headers in seconds and as HTTP date
+    """
+    http_date = email.utils.formatdate(time.time() + 60, usegmt=True)
+
+    assert FetchPolicy.parse_retry_after("120") == 120.0
+    assert 55 <= FetchPolicy.parse_retry_after(http_date) <= 60
+    assert FetchPolicy.parse_retry_after("soon") is None
+    assert FetchPolicy.parse_retry_after(None) is None
+
+
+def test_retryable_status_codes():
+    """
+    Test that throttling and transient server errors are retryable, client errors are not
+    """
+    assert FetchPolicy.is_retryable(429)
+    assert FetchPolicy.is_retryable(503)
+    assert not FetchPolicy.is_retryable(404)
+
+
+def test_adaptive_rate_controller():
+    """
+    Test that the controller speeds up on fast responses, halves the rate on errors and stays within bounds
+    """
+    rate_limiter = RateLimiter(requests_per_second=1.0)
+    controller = AdaptiveRateController(0.5, 1.2, target_latency=0.5, increase_step=0.1)
+
+    controller.on_success(rate_limiter, latency=0.1)
+    assert rate_limiter.requests_per_second == pytest.approx(1.1)
+    controller.on_success(rate_limiter, latency=2.0)
+    assert rate_limiter.requests_per_second == pytest.approx(1.1)
+    for _ in range(5):
+        controller.on_success(rate_limiter, latency=0.1)
+    assert rate_limiter.requests_per_second == pytest.approx(1.2)
+    controller.on_error(rate_limiter)
+    assert rate_limiter.requests_per_second == pytest.approx(0.6)
+    controller.on_error(rate_limiter)
+    assert rate_limiter.requests_per_second == pytest.approx(0.5)
+
+
+def test_on_failure_pauses_rate_limiter():
+    """
+    Test that a Retry-After delay holds back the next request of every worker
+    """
+    rate_limiter = RateLimiter(requests_per_second=None)
+    policy = FetchPolicy()
+
+    policy.on_failure(rate_limiter, retry_after=0.05)
+
+    assert rate_limiter.acquire() > 0.0
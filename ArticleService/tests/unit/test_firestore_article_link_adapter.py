@@ -10,13 +10,15 @@ events for easier debugging and test validation.
 
 
 import logging
+import threading
+import time
 from datetime import datetime
 from unittest.mock import MagicMock, PropertyMock
 
 import pytest
 
 from src.article_handler import ArticleLink
-from src.firestore_article_link_adapter import FirestoreArticleLinkAdapter
+from src.firestore_article_link_adapter import ALREADY_EXISTS, MAX_WRITE_ATTEMPTS, FirestoreArticleLinkAdapter
 
 # Setup logger right below imports
 logger = logging.getLogger(__name__)
@@ -82,6 +84,183 @@ def test_save_link(firestore_adapter):
     })
 
 
+def test_save_links_in_batches(firestore_adapter):
+    """
+    Test that the save_links method of FirestoreArticleLinkAdapter commits at most batch_size writes per batch.
+    """
+    _, _, mock_collection, _, _ = firestore_adapter
+    adapter = FirestoreArticleLinkAdapter(mock_collection, batch_size=2)
+    mock_batch = MagicMock()
+    # pylint: disable=protected-access
+    mock_collection._client.batch.return_value = mock_batch
+    article_links = [ArticleLink(f"https://magic.wizards.com/en/news/article-{i}") for i in range(5)]
+
+    adapter.save_links(article_links)
+
+    assert mock_collection._client.batch.call_count == 3
+    assert mock_batch.commit.call_count == 3
+    assert mock_batch.set.call_count == 5
+    mock_collection.document.assert_called_with(article_links[-1].url_hash)
+    assert adapter.metrics.counter('firestore_writes') == 5
+
+
+def test_create_links_keeps_existing_documents(firestore_adapter):
+    """
+    Test that create_links writes with create-if-absent semantics and returns only the links it created.
+    """
+    _, _, mock_collection, _, _ = firestore_adapter
+    adapter = FirestoreArticleLinkAdapter(mock_collection)
+    article_links = [ArticleLink(f"https://magic.wizards.com/en/news/article-{i}") for i in range(2)]
+    existing_hash = article_links[0].url_hash
+    mock_collection.document.side_effect = lambda url_hash: MagicMock(id=url_hash)
+    bulk_writer = MagicMock()
+    # pylint: disable=protected-access
+    mock_collection._client.bulk_writer.return_value = bulk_writer
+
+    def close():
+        on_result = bulk_writer.on_write_result.call_args.args[0]
+        on_error = bulk_writer.on_write_error.call_args.args[0]
+        for call in bulk_writer.create.call_args_list:
+            reference = call.args[0]
+            if reference.id == existing_hash:
+                failure = MagicMock(code=ALREADY_EXISTS, attempts=1, operation=MagicMock(reference=reference))
+                assert not on_error(failure, bulk_writer)
+            else:
+                assert on_error(MagicMock(code=14, attempts=1), bulk_writer)
+                on_result(reference, MagicMock(), bulk_writer)
+
+    bulk_writer.close.side_effect = close
+
+    created_links = adapter.create_links(article_links)
+
+    assert bulk_writer.create.call_count == 2
+    assert created_links == [article_links[1]]
+    # Only the create that succeeded is a write, the existing document is a conflict
+    assert adapter.metrics.counter('firestore_writes') == 1
+    assert adapter.metrics.counter('firestore_create_conflicts') == 1
+
+
+def test_create_links_raises_when_retries_run_out(firestore_adapter):
+    """
+    Test that a create failing with a transient error is retried up to MAX_WRITE_ATTEMPTS times and then raises
+    instead of being reported like a link that was already stored.
+    """
+    _, _, mock_collection, _, _ = firestore_adapter
+    adapter = FirestoreArticleLinkAdapter(mock_collection)
+    article_link = ArticleLink("https://magic.wizards.com/en/news/article-1")
+    mock_collection.document.side_effect = lambda url_hash: MagicMock(id=url_hash)
+    bulk_writer = MagicMock()
+    # pylint: disable=protected-access
+    mock_collection._client.bulk_writer.return_value = bulk_writer
+    retries = []
+
+    def close():
+        on_error = bulk_writer.on_write_error.call_args.args[0]
+        reference = bulk_writer.create.call_args.args[0]
+        for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+            failure = MagicMock(code=14, attempts=attempt, message='unavailable',
+                                operation=MagicMock(reference=reference))
+            retries.append(on_error(failure, bulk_writer))
+
+    bulk_writer.close.side_effect = close
+
+    with pytest.raises(RuntimeError, match=article_link.url_hash):
+        adapter.create_links([article_link])
+
+    assert retries == [True] * (MAX_WRITE_ATTEMPTS - 1) + [False]
+    assert adapter.metrics.counter('firestore_writes') == 0
+    assert adapter.metrics.counter('firestore_create_conflicts') == 0
+
+
+def test_write_behind_coalesces_and_flushes(firestore_adapter):
+    """
+    Test that with write_behind, saved links are buffered without a write, duplicates are coalesced and
+    flush() stores them with create-if-absent writes.
+    """
+    _, _, mock_collection, _, _ = firestore_adapter
+    article_links = [ArticleLink(f"https://magic.wizards.com/en/news/article-{i}") for i in range(2)]
+    with FirestoreArticleLinkAdapter(mock_collection, write_behind=True, flush_interval=60) as adapter:
+        adapter.create_links = MagicMock(side_effect=lambda links: links)
+
+        adapter.save_links(article_links)
+        adapter.save_link(ArticleLink(article_links[0].url))
+        adapter.create_links.assert_not_called()
+
+        adapter.flush()
+
+        adapter.create_links.assert_called_once()
+        assert [link.url for link in adapter.create_links.call_args.args[0]] == [link.url for link in article_links]
+    mock_collection.document.return_value.set.assert_not_called()
+    assert adapter._writer is None  # pylint: disable=protected-access
+
+
+def test_write_behind_waits_flush_interval_for_partial_batch(firestore_adapter):
+    """
+    Test that a partial batch is held for flush_interval although every save wakes the writer, and that a
+    full batch is written without waiting.
+    """
+    _, _, mock_collection, _, _ = firestore_adapter
+    article_links = [ArticleLink(f"https://magic.wizards.com/en/news/article-{i}") for i in range(3)]
+    written = threading.Event()
+    with FirestoreArticleLinkAdapter(mock_collection, batch_size=3, write_behind=True, flush_interval=60) as adapter:
+        adapter.create_links = MagicMock(side_effect=lambda links: written.set() or links)
+
+        adapter.save_link(article_links[0])
+        # Let the writer start waiting for the partial batch before the next save wakes it
+        time.sleep(0.1)
+        adapter.save_link(article_links[1])
+        assert not written.wait(0.1)
+
+        adapter.save_link(article_links[2])
+        assert written.wait(5)
+
+    adapter.create_links.assert_called_once()
+    assert [link.url for link in adapter.create_links.call_args.args[0]] == [link.url for link in article_links]
+
+
+def test_write_behind_flush_raises_write_errors(firestore_adapter):
+    """
+    Test that an error of a background write is raised by the next flush().
+    """
+    _, _, mock_collection, _, _ = firestore_adapter
+    adapter = FirestoreArticleLinkAdapter(mock_collection, write_behind=True, flush_interval=0)
+    adapter.create_links = MagicMock(side_effect=RuntimeError('unavailable'))
+
+    adapter.save_link(ArticleLink("https://magic.wizards.com/en/news/article-0"))
+
+    with pytest.raises(RuntimeError):
+        adapter.flush()
+    adapter.close()
+
+
+def test_existing_hashes_uses_batched_gets(firestore_adapter):
+    """
+    Test that existing_hashes looks up at most batch_size documents per keys-only batched get.
+    """
+    _, _, mock_collection, _, _ = firestore_adapter
+    adapter = FirestoreArticleLinkAdapter(mock_collection, batch_size=2)
+    mock_collection.document.side_effect = lambda url_hash: url_hash
+    # pylint: disable=protected-access
+    mock_collection._client.get_all.side_effect = lambda references, field_paths: [
+        MagicMock(id=reference, exists=reference in ("b", "c")) for reference in references
+    ]
+
+    existing = adapter.existing_hashes(["a", "b", "c"])
+
+    assert existing == {"b", "c"}
+    assert [call.args[0] for call in mock_collection._client.get_all.call_args_list] == [["a", "b"], ["c"]]
+    mock_collection._client.get_all.assert_called_with(["c"], field_paths=[])
+    assert adapter.metrics.counter('firestore_reads') == 3
+
+
+def test_invalid_batch_size():
+    """
+    Test that FirestoreArticleLinkAdapter rejects batch sizes Firestore would refuse.
+    """
+    with pytest.raises(ValueError):
+        FirestoreArticleLinkAdapter(MagicMock(), batch_size=501)
+
+
 def test_get_links(firestore_adapter):
     """
     Test the get_links method of FirestoreArticleLinkAdapter.
@@ -93,8 +272,59 @@ def test_get_links(firestore_adapter):
     test_get_links_logger.info("Get Links...")
     adapter.get_links()
 
-    # Assert that the stream method is called on the mock collection
-    mock_collection.stream.assert_called_once()
+    # Assert that the collection is read through an ordered query instead of streaming it unpaginated
+    mock_collection.order_by.assert_called_once_with("__name__")
+    mock_collection.order_by.return_value.limit.return_value.stream.assert_called_once()
+    mock_collection.stream.assert_not_called()
+
+
+def test_iter_links_paginates_with_cursor(firestore_adapter):
+    """
+    Test that iter_links reads the collection in pages of page_size documents, starting after the last
+    document of the previous page.
+    """
+    _, _, mock_collection, _, timestamp = firestore_adapter
+    adapter = FirestoreArticleLinkAdapter(mock_collection, page_size=2)
+    docs = [
+        MagicMock(to_dict=MagicMock(return_value={
+            "url": f"https://magic.wizards.com/en/news/article-{i}", "link_added_at": timestamp
+        }))
+        for i in range(3)
+    ]
+    ordered_query = mock_collection.order_by.return_value
+    first_page = MagicMock()
+    first_page.stream.return_value = docs[:2]
+    second_page = MagicMock()
+    second_page.stream.return_value = docs[2:]
+    ordered_query.limit.return_value = first_page
+    first_page.start_after.return_value = second_page
+
+    links = adapter.iter_links()
+    assert next(links).url == "https://magic.wizards.com/en/news/article-0"
+    first_page.start_after.assert_not_called()
+
+    assert [link.url for link in links] == [
+        "https://magic.wizards.com/en/news/article-1", "https://magic.wizards.com/en/news/article-2"
+    ]
+    ordered_query.limit.assert_called_with(2)
+    first_page.start_after.assert_called_once_with(docs[1])
+
+
+def test_iter_link_hashes(firestore_adapter):
+    """
+    Test that iter_link_hashes of FirestoreArticleLinkAdapter reads document IDs through a keys-only query.
+    """
+    adapter, _, mock_collection, _, _ = firestore_adapter
+    mock_query = MagicMock()
+    mock_query.stream.return_value = [MagicMock(id="66ddaa70da65a525b5dc64efc8fe17b8")]
+    mock_collection.select.return_value = mock_query
+
+    url_hashes = list(adapter.iter_link_hashes())
+
+    mock_collection.select.assert_called_once_with(["__name__"])
+    mock_collection.stream.assert_not_called()
+    assert url_hashes == ["66ddaa70da65a525b5dc64efc8fe17b8"]
+    assert adapter.metrics.counter('firestore_reads') == 1
 
 
 def test_get_link_by_hash(firestore_adapter):
@@ -142,6 +372,8 @@ def test_get_links_by_date_range(firestore_adapter):
     mock_query = MagicMock()
     mock_query.stream.return_value = [mock_doc]
     mock_query.where.return_value = mock_query  # return mock_query on second where call
+    mock_query.order_by.return_value = mock_query
+    mock_query.limit.return_value = mock_query
     mock_collection.where.return_value = mock_query
 
     test_get_links_by_date_range_logger.info(
@@ -154,6 +386,7 @@ def test_get_links_by_date_range(firestore_adapter):
 
     mock_collection.where.assert_called_once_with("link_added_at", ">=", start_date)
     mock_query.where.assert_called_once_with("link_added_at", "<=", end_date)
+    mock_query.order_by.assert_any_call("link_added_at")
     mock_query.stream.assert_called_once()
 
     assert len(links) == 1
@@ -0,0 +1,166 @@
+# test_firestore_async_article_link_adapter.py
+"""
+This module contains tests for FirestoreAsyncArticleLinkAdapter, the asyncio variant of the Firestore adapter.
+The async Firestore collection is mocked, the coroutines are driven with asyncio.run.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.article_handler import ArticleLink
+from src.firestore_async_article_link_adapter import FirestoreAsyncArticleLinkAdapter
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+TEST_URL = "https://magic.wizards.com/en/news/mtg-arena/mtg-arena-announcements-may-1-2023"
+
+
+async def async_stream(*docs):
+    """
+    Helper async generator mimicking the stream of an async Firestore query.
+    """
+    for doc in docs:
+        yield doc
+
+
+def mock_paged_query(*pages):
+    """
+    Helper function returning a mocked async query whose filters, ordering and cursors return the query itself,
+    and whose consecutive streams yield the given pages of documents.
+    """
+    mock_query = MagicMock()
+    for method in ("where", "order_by", "limit", "start_after"):
+        getattr(mock_query, method).return_value = mock_query
+    page_iterator = iter(pages)
+    mock_query.stream.side_effect = lambda: async_stream(*next(page_iterator, []))
+    return mock_query
+
+
+@pytest.fixture(name="firestore_async_adapter")
+def fixture_firestore_async_adapter():
+    """
+    Pytest fixture to set up a FirestoreAsyncArticleLinkAdapter with a mocked async collection and document.
+    """
+    timestamp = datetime.now()
+    mock_collection = MagicMock()
+    mock_doc = MagicMock()
+    mock_doc.exists = True
+    mock_doc.id = ArticleLink(TEST_URL).url_hash
+    mock_doc.to_dict.return_value = {"url": TEST_URL, "link_added_at": timestamp}
+    mock_doc_ref = MagicMock()
+    mock_doc_ref.set = AsyncMock()
+    mock_doc_ref.get = AsyncMock(return_value=mock_doc)
+    mock_collection.document.return_value = mock_doc_ref
+    mock_collection.order_by.return_value = mock_paged_query([mock_doc])
+    adapter = FirestoreAsyncArticleLinkAdapter(mock_collection)
+    return adapter, mock_collection, mock_doc_ref, mock_doc, timestamp
+
+
+def test_save_link(firestore_async_adapter):
+    """
+    Test the save_link coroutine of FirestoreAsyncArticleLinkAdapter.
+    """
+    adapter, mock_collection, mock_doc_ref, _, _ = firestore_async_adapter
+    article_link = ArticleLink(TEST_URL)
+
+    asyncio.run(adapter.save_link(article_link))
+
+    mock_collection.document.assert_called_once_with(article_link.url_hash)
+    mock_doc_ref.set.assert_awaited_once_with({
+        "url": article_link.url,
+        "link_added_at": article_link.link_added_at
+    })
+
+
+def test_get_links(firestore_async_adapter):
+    """
+    Test the get_links coroutine of FirestoreAsyncArticleLinkAdapter without filters.
+    """
+    adapter, mock_collection, _, mock_doc, timestamp = firestore_async_adapter
+
+    links = asyncio.run(adapter.get_links())
+
+    mock_collection.order_by.assert_called_once_with("__name__")
+    assert [(link.url, link.link_added_at) for link in links] == [(TEST_URL, timestamp)]
+    assert links[0].url_hash == mock_doc.id
+
+
+def test_iter_links_pages_with_cursors(firestore_async_adapter):
+    """
+    Test that iter_links of FirestoreAsyncArticleLinkAdapter reads pages of page_size documents, continuing
+    each page after the last document of the previous one.
+    """
+    _, mock_collection, _, _, timestamp = firestore_async_adapter
+    docs = []
+    for i in range(3):
+        doc = MagicMock(id=f"hash-{i}")
+        doc.to_dict.return_value = {"url": f"{TEST_URL}-{i}", "link_added_at": timestamp}
+        docs.append(doc)
+    mock_query = mock_paged_query(docs[:2], docs[2:])
+    mock_collection.order_by.return_value = mock_query
+    adapter = FirestoreAsyncArticleLinkAdapter(mock_collection, page_size=2)
+
+    async def collect():
+        return [link async for link in adapter.iter_links()]
+
+    links = asyncio.run(collect())
+
+    # The url hashes are taken from the document IDs instead of being computed from the urls
+    assert [link.url_hash for link in links] == ["hash-0", "hash-1", "hash-2"]
+    assert mock_query.stream.call_count == 2
+    mock_query.limit.assert_called_with(2)
+    mock_query.start_after.assert_called_once_with(docs[1])
+
+
+def test_iter_link_hashes(firestore_async_adapter):
+    """
+    Test that iter_link_hashes of FirestoreAsyncArticleLinkAdapter reads document IDs through a keys-only query.
+    """
+    adapter, mock_collection, _, _, _ = firestore_async_adapter
+    mock_query = MagicMock()
+    mock_query.stream.side_effect = lambda: async_stream(MagicMock(id="66ddaa70da65a525b5dc64efc8fe17b8"))
+    mock_collection.select.return_value = mock_query
+
+    async def collect():
+        return [url_hash async for url_hash in adapter.iter_link_hashes()]
+
+    assert asyncio.run(collect()) == ["66ddaa70da65a525b5dc64efc8fe17b8"]
+    mock_collection.select.assert_called_once_with(["__name__"])
+
+
+def test_get_link_by_hash(firestore_async_adapter):
+    """
+    Test the get_links coroutine of FirestoreAsyncArticleLinkAdapter filtered by hash.
+    """
+    adapter, mock_collection, mock_doc_ref, _, _ = firestore_async_adapter
+    url_hash = ArticleLink(TEST_URL).url_hash
+
+    links = asyncio.run(adapter.get_links(url_hash=url_hash))
+
+    mock_collection.document.assert_called_once_with(url_hash)
+    mock_doc_ref.get.assert_awaited_once()
+    assert len(links) == 1
+    assert links[0].url_hash == url_hash
+
+
+def test_get_links_by_date_range(firestore_async_adapter):
+    """
+    Test the get_links coroutine of FirestoreAsyncArticleLinkAdapter filtered by date range.
+    """
+    adapter, mock_collection, _, mock_doc, timestamp = firestore_async_adapter
+    start_date = datetime.now()
+    end_date = start_date
+    mock_query = mock_paged_query([mock_doc])
+    mock_collection.where.return_value = mock_query
+
+    links = asyncio.run(adapter.get_links(start_date=start_date, end_date=end_date))
+
+    mock_collection.where.assert_called_once_with("link_added_at", ">=", start_date)
+    mock_query.where.assert_called_once_with("link_added_at", "<=", end_date)
+    assert [call.args for call in mock_query.order_by.call_args_list] == [("link_added_at",), ("__name__",)]
+    assert [(link.url, link.link_added_at) for link in links] == [(TEST_URL, timestamp)]
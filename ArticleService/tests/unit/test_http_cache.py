@@ -0,0 +1,118 @@
+# test_http_cache.py
+"""
+Test module for the HttpCache class. Responses are mocked and the cache is written to a temporary directory
+provided by pytest.
+"""
+
+import logging
+from unittest.mock import MagicMock
+
+from src.http_cache import HttpCache
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+URL = 'https://magic.wizards.com/en/news/archive?page=50'
+
+
+def response(content=b'<html></html>', status_code=200, headers=None):
+    """
+    Helper function returning a mocked response.
+    """
+    return MagicMock(status_code=status_code, content=content, headers=headers or {})
+
+
+def test_conditional_headers_after_commit(tmp_path):
+    """
+    Test that the validators of a body are only sent once the body has been committed.
+    """
+    cache = HttpCache(str(tmp_path))
+    assert not cache.is_unchanged(URL, response(headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 01 May 2023'}))
+    assert not cache.conditional_headers(URL)
+
+    cache.commit(URL)
+
+    assert cache.conditional_headers(URL) == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 May 2023'}
+    assert cache.read_body(URL) == b'<html></html>'
+
+
+def test_not_modified_and_unchanged_digest_are_hits(tmp_path):
+    """
+    Test that a 304 response and a body with the cached digest are hits, and a changed body is a miss.
+    """
+    cache = HttpCache(str(tmp_path))
+    cache.is_unchanged(URL, response())
+    cache.commit(URL)
+
+    assert cache.is_unchanged(URL, response(content=b'', status_code=304))
+    assert cache.is_unchanged(URL, response())
+    assert not cache.is_unchanged(URL, response(content=b'<html>new</html>'))
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_uncommitted_body_is_not_used(tmp_path):
+    """
+    Test that a body whose page was not committed does not make the page count as unchanged.
+    """
+    cache = HttpCache(str(tmp_path))
+    cache.is_unchanged(URL, response())
+
+    assert not cache.is_unchanged(URL, response())
+
+
+def test_lru_eviction(tmp_path):
+    """
+    Test that the least recently used bodies are evicted once the cache exceeds its size.
+    """
+    cache = HttpCache(str(tmp_path), max_bytes=10)
+    for page in range(3):
+        url = f'{URL}{page}'
+        cache.is_unchanged(url, response(content=b'12345'))
+        cache.commit(url)
+        if page == 1:
+            cache.is_unchanged(f'{URL}0', response(content=b'', status_code=304))
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 10
+    assert cache.read_body(f'{URL}1') is None
+    assert cache.read_body(f'{URL}0') == b'12345'
+
+
+def test_index_survives_restart(tmp_path):
+    """
+    Test that committed entries are loaded again by a new cache on the same directory.
+    """
+    cache = HttpCache(str(tmp_path))
+    cache.is_unchanged(URL, response(headers={'ETag': '"v1"'}))
+    cache.commit(URL)
+
+    reopened = HttpCache(str(tmp_path))
+
+    assert reopened.conditional_headers(URL) == {'If-None-Match': '"v1"'}
+    assert reopened.is_unchanged(URL, response())
+
+
+def test_uncommitted_body_survives_restart_as_previous_body(tmp_path):
+    """
+    Test that a changed body that was not committed before a restart neither replaces the committed body nor
+    its validators.
+    """
+    cache = HttpCache(str(tmp_path))
+    cache.is_unchanged(URL, response(headers={'ETag': '"v1"'}))
+    cache.commit(URL)
+    assert not cache.is_unchanged(URL, response(content=b'<html>new</html>', headers={'ETag': '"v2"'}))
+    assert cache.read_body(URL) == b'<html>new</html>'
+
+    reopened = HttpCache(str(tmp_path))
+
+    assert reopened.conditional_headers(URL) == {'If-None-Match': '"v1"'}
+    assert reopened.read_body(URL) == b'<html></html>'
+    assert reopened.is_unchanged(URL, response())
+
+    cache.commit(URL)
+    committed = HttpCache(str(tmp_path))
+
+    assert committed.conditional_headers(URL) == {'If-None-Match': '"v2"'}
+    assert committed.read_body(URL) == b'<html>new</html>'
@@ -0,0 +1,88 @@
+# test_known_link_index.py
+"""
+Test module for the KnownLinkIndex class
+"""
+
+import hashlib
+import logging
+import sys
+
+import pytest
+
+from src.known_link_index import DIGEST_SIZE, KnownLinkIndex
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+
+def url_hash(i):
+    """
+    Helper function returning the md5 hex hash of a numbered article url.
+    """
+    return hashlib.md5(f"https://magic.wizards.com/en/news/article-{i}".encode()).hexdigest()
+
+
+def test_add_and_contains():
+    """
+    Test membership and insert of md5 hex hashes
+    """
+    index = KnownLinkIndex([url_hash(1)])
+
+    assert url_hash(1) in index
+    assert url_hash(2) not in index
+    assert index.add(url_hash(2)) is True
+    assert index.add(url_hash(2)) is False
+    assert url_hash(2) in index
+    assert len(index) == 2
+
+
+def test_bulk_load_keeps_all_hashes():
+    """
+    Test that loading many hashes at once keeps every hash
+    """
+    url_hashes = [url_hash(i) for i in range(5000)]
+    index = KnownLinkIndex(url_hashes)
+
+    assert len(index) == 5000
+    assert all(h in index for h in url_hashes)
+    assert url_hash(5000) not in index
+    assert sorted(index) == sorted(url_hashes)
+
+
+def test_zero_digest_is_tracked():
+    """
+    Test that the all-zero digest can be stored like any other digest
+    """
+    index = KnownLinkIndex()
+    zero_hash = bytes(DIGEST_SIZE).hex()
+
+    assert zero_hash not in index
+    assert index.add(zero_hash) is True
+    assert zero_hash in index
+    assert list(index) == [zero_hash]
+    assert len(index) == 1
+
+
+def test_invalid_hashes():
+    """
+    Test that anything but an md5 hex hash is never a member and cannot be added
+    """
+    index = KnownLinkIndex([url_hash(1)])
+
+    assert 'nonexistenthash' not in index
+    assert url_hash(1)[:8] not in index
+    assert None not in index
+    with pytest.raises(ValueError):
+        index.add('abc')
+
+
+def test_index_is_smaller_than_hex_string_set():
+    """
+    Test that the index needs less memory than a set of hex strings
+    """
+    url_hashes = {url_hash(i) for i in range(20000)}
+    index = KnownLinkIndex(url_hashes)
+
+    set_bytes = sys.getsizeof(url_hashes) + sum(sys.getsizeof(h) for h in url_hashes)
+    logger.info("Set of hex strings: %s bytes, index: %s bytes", set_bytes, index.nbytes)
+    assert index.nbytes < set_bytes
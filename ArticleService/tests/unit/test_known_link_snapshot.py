@@ -0,0 +1,103 @@
+# test_known_link_snapshot.py
+"""
+Test module for the KnownLinkSnapshot class. The adapter is mocked and the snapshot is written to a
+temporary directory provided by pytest.
+"""
+
+import datetime
+import logging
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.article_handler import ArticleLink
+from src.firestore_article_link_adapter import FirestoreArticleLinkAdapter
+from src.known_link_snapshot import KnownLinkSnapshot
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+
+def article_link(i):
+    """
+    Helper function returning a numbered ArticleLink.
+    """
+    return ArticleLink(f"https://magic.wizards.com/en/news/article-{i}", datetime.datetime.now())
+
+
+@pytest.fixture(name="adapter")
+def fixture_adapter():
+    """
+    Pytest fixture that returns a mocked adapter storing the links 0 and 1.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.side_effect = lambda: iter([article_link(0).url_hash, article_link(1).url_hash])
+    adapter.iter_links.return_value = []
+    return adapter
+
+
+def test_first_sync_loads_all_link_ids(tmp_path, adapter):
+    """
+    Test that a sync without a snapshot loads all link ids and that save writes a snapshot that loads again.
+    """
+    snapshot = KnownLinkSnapshot(str(tmp_path / "known_links.bin"))
+
+    index = snapshot.sync(adapter)
+    index.add(article_link(2).url_hash)
+    snapshot.save(index)
+
+    adapter.iter_link_hashes.assert_called_once()
+    adapter.iter_links.assert_not_called()
+    loaded_index, high_water_mark, reconciled_at = snapshot.load()
+    assert sorted(loaded_index) == sorted(article_link(i).url_hash for i in range(3))
+    assert high_water_mark is not None
+    assert reconciled_at == high_water_mark
+
+
+def test_incremental_sync_only_reads_new_links(tmp_path, adapter):
+    """
+    Test that a sync with a snapshot only queries the links added since the high-water mark.
+    """
+    snapshot = KnownLinkSnapshot(str(tmp_path / "known_links.bin"))
+    snapshot.save(snapshot.sync(adapter))
+    _, high_water_mark, _ = snapshot.load()
+    adapter.iter_link_hashes.reset_mock()
+    adapter.iter_links.return_value = [article_link(3)]
+
+    index = KnownLinkSnapshot(str(tmp_path / "known_links.bin")).sync(adapter)
+
+    adapter.iter_link_hashes.assert_not_called()
+    assert adapter.iter_links.call_args.kwargs["start_date"] == high_water_mark
+    assert len(index) == 3
+    assert article_link(3).url_hash in index
+
+
+def test_reconcile_runs_in_background(tmp_path, adapter):
+    """
+    Test that an overdue snapshot is reconciled with a full read of the link ids in a background thread.
+    """
+    path = str(tmp_path / "known_links.bin")
+    snapshot = KnownLinkSnapshot(path)
+    snapshot.save(snapshot.sync(MagicMock(iter_link_hashes=MagicMock(return_value=[]))))
+
+    snapshot = KnownLinkSnapshot(path, reconcile_interval=datetime.timedelta(0))
+    index = snapshot.sync(adapter)
+    snapshot.wait_for_reconcile()
+    snapshot.save(index)
+
+    adapter.iter_link_hashes.assert_called_once()
+    loaded_index, _, _ = snapshot.load()
+    assert len(loaded_index) == 2
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path, adapter):
+    """
+    Test that an unreadable snapshot falls back to loading all link ids.
+    """
+    path = tmp_path / "known_links.bin"
+    path.write_bytes(b"not a snapshot")
+
+    index = KnownLinkSnapshot(str(path)).sync(adapter)
+
+    adapter.iter_link_hashes.assert_called_once()
+    assert len(index) == 2
@@ -0,0 +1,152 @@
+# test_link_export.py
+"""
+Test module for export_links, the link writers and the ExportWatermark class. Links are exported from an
+InMemoryArticleLinkAdapter into a temporary directory provided by pytest.
+"""
+
+import datetime
+import gzip
+import json
+import logging
+
+import pytest
+
+from src.article_handler import ArticleLink
+from src.link_export import ExportWatermark, JsonlLinkWriter, create_link_writer, export_links
+from src.memory_article_link_adapter import InMemoryArticleLinkAdapter
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+START = datetime.datetime(2023, 5, 1, 12, 0, 0)
+
+
+def article_link(i):
+    """
+    Helper function returning a numbered ArticleLink added i hours after START.
+    """
+    return ArticleLink(f"https://magic.wizards.com/en/news/article-{i}", START + datetime.timedelta(hours=i))
+
+
+def read_jsonl(path):
+    """
+    Helper function returning the records of a gzip compressed JSONL file.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as export_file:
+        return [json.loads(line) for line in export_file]
+
+
+@pytest.fixture(name="adapter")
+def fixture_adapter():
+    """
+    Pytest fixture that returns an adapter holding five links added an hour apart.
+    """
+    adapter = InMemoryArticleLinkAdapter()
+    adapter.save_links([article_link(i) for i in range(5)])
+    return adapter
+
+
+def test_export_all_links(adapter, tmp_path):
+    """
+    Test that every link is exported with its hash, url and ISO 8601 time and that throughput is reported.
+    """
+    path = tmp_path / 'links.jsonl.gz'
+
+    stats = export_links(adapter, str(path))
+
+    records = read_jsonl(path)
+    assert stats["exported"] == 5
+    assert stats["docs_per_second"] > 0
+    assert sorted(record["url"] for record in records) == sorted(article_link(i).url for i in range(5))
+    assert {
+        "url_hash": article_link(2).url_hash,
+        "url": article_link(2).url,
+        "link_added_at": "2023-05-01T14:00:00"
+    } in records
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_export_date_range(adapter, tmp_path):
+    """
+    Test that only the links added in the date range are exported.
+    """
+    path = tmp_path / 'links.jsonl.gz'
+
+    stats = export_links(adapter, str(path), start_date=START + datetime.timedelta(hours=1),
+                         end_date=START + datetime.timedelta(hours=3))
+
+    assert stats["exported"] == 3
+    assert [record["url"] for record in read_jsonl(path)] == [article_link(i).url for i in range(1, 4)]
+
+
+def test_incremental_export_since_watermark(adapter, tmp_path):
+    """
+    Test that an export with a watermark only exports the links added after the previous export.
+    """
+    watermark = ExportWatermark(str(tmp_path / 'watermark.json'))
+    first_stats = export_links(adapter, str(tmp_path / 'first.jsonl.gz'), watermark=watermark)
+    adapter.save_links([article_link(i) for i in range(5, 7)])
+
+    second_stats = export_links(adapter, str(tmp_path / 'second.jsonl.gz'), watermark=watermark,
+                                end_date=START + datetime.timedelta(days=1))
+    third_stats = export_links(adapter, str(tmp_path / 'third.jsonl.gz'), watermark=watermark,
+                               end_date=START + datetime.timedelta(days=1))
+
+    assert first_stats["exported"] == 5
+    assert [record["url"] for record in read_jsonl(tmp_path / 'second.jsonl.gz')] == [
+        article_link(5).url, article_link(6).url
+    ]
+    assert second_stats["exported"] == 2
+    assert third_stats["exported"] == 0
+    assert watermark.load() == article_link(6).link_added_at
+
+
+def test_aware_watermark_with_naive_start(adapter, tmp_path):
+    """
+    Test that an aware watermark is compared in UTC with a naive start date and with the naive stored times.
+    """
+    watermark = ExportWatermark(str(tmp_path / 'watermark.json'))
+    cet = datetime.timezone(datetime.timedelta(hours=1))
+    watermark.save((START + datetime.timedelta(hours=3)).replace(tzinfo=datetime.timezone.utc).astimezone(cet))
+
+    stats = export_links(adapter, str(tmp_path / 'links.jsonl.gz'), watermark=watermark, start_date=START,
+                         end_date=START + datetime.timedelta(days=1))
+
+    assert stats["exported"] == 1
+    assert [record["url"] for record in read_jsonl(tmp_path / 'links.jsonl.gz')] == [article_link(4).url]
+    assert watermark.load() == article_link(4).link_added_at
+
+
+def test_failed_export_leaves_no_file(tmp_path):
+    """
+    Test that a writer left with an error removes its temporary file instead of publishing a partial export.
+    """
+    path = tmp_path / 'links.jsonl.gz'
+    with pytest.raises(RuntimeError):
+        with JsonlLinkWriter(str(path)) as writer:
+            writer.write(article_link(0))
+            raise RuntimeError('interrupted')
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_unknown_format(tmp_path):
+    """
+    Test that an unknown export format is rejected.
+    """
+    with pytest.raises(ValueError):
+        create_link_writer(str(tmp_path / 'links.csv'), 'csv')
+
+
+def test_export_parquet(adapter, tmp_path):
+    """
+    Test that a Parquet export holds every link with its hash.
+    """
+    parquet = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'links.parquet'
+
+    stats = export_links(adapter, str(path), export_format='parquet')
+
+    table = parquet.read_table(str(path))
+    assert stats["exported"] == table.num_rows == 5
+    assert sorted(table.column('url_hash').to_pylist()) == sorted(article_link(i).url_hash for i in range(5))
@@ -0,0 +1,162 @@
+# test_link_import.py
+"""
+Test module for LinkImporter, ImportProgress and read_link_records. Links are imported from files in a temporary
+directory provided by pytest into an InMemoryArticleLinkAdapter.
+"""
+
+import datetime
+import gzip
+import json
+import logging
+
+import pytest
+
+from src.article_handler import ArticleLink
+from src.link_export import export_links
+from src.link_import import ImportProgress, LinkImporter, detect_format, read_link_records
+from src.memory_article_link_adapter import InMemoryArticleLinkAdapter
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+START = datetime.datetime(2023, 5, 1, 12, 0, 0)
+
+
+def url(i):
+    """
+    Helper function returning a numbered article url.
+    """
+    return f"https://magic.wizards.com/en/news/article-{i}"
+
+
+def write_jsonl(path, count):
+    """
+    Helper function writing a gzip compressed JSONL file with count links added an hour apart.
+    """
+    with gzip.open(path, 'wt', encoding='utf-8') as jsonl_file:
+        for i in range(count):
+            jsonl_file.write(json.dumps({
+                "url": url(i),
+                "link_added_at": (START + datetime.timedelta(hours=i)).isoformat()
+            }) + '\n')
+
+
+class FailingAdapter(InMemoryArticleLinkAdapter):
+    """
+    In-memory adapter whose create_links fails once on the given call.
+    """
+    def __init__(self, fail_on_call):
+        super().__init__()
+        self.fail_on_call = fail_on_call
+        self.calls = 0
+
+    def create_links(self, article_links):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError('commit failed')
+        return super().create_links(article_links)
+
+
+class FailingFlushAdapter(InMemoryArticleLinkAdapter):
+    """
+    In-memory adapter whose flush fails, like a write-behind adapter whose background write failed.
+    """
+    def flush(self):
+        raise RuntimeError('background write failed')
+
+
+def test_read_csv_with_and_without_header(tmp_path):
+    """
+    Test that CSV files are read by column name with a header and by position without one.
+    """
+    with_header = tmp_path / 'with_header.csv'
+    with_header.write_text(f'link_added_at,url\n2023-05-01T12:00:00,{url(0)}\n,{url(1)}\n\n', encoding='utf-8')
+    without_header = tmp_path / 'without_header.csv'
+    without_header.write_text(f'{url(0)}\n{url(1)},2023-05-01T13:00:00\n', encoding='utf-8')
+
+    assert list(read_link_records(str(with_header))) == [(url(0), START), (url(1), None)]
+    assert list(read_link_records(str(without_header))) == [
+        (url(0), None), (url(1), START + datetime.timedelta(hours=1))
+    ]
+
+
+def test_detect_format():
+    """
+    Test that the format is taken from the extension, ignoring a .gz suffix.
+    """
+    assert detect_format('links.jsonl.gz') == 'jsonl'
+    assert detect_format('links.csv') == 'csv'
+    with pytest.raises(ValueError):
+        detect_format('links.parquet')
+
+
+def test_import_skips_existing_and_duplicate_links(tmp_path):
+    """
+    Test that links that are stored or appear earlier in the file are not written again.
+    """
+    path = tmp_path / 'links.jsonl.gz'
+    write_jsonl(path, 10)
+    with gzip.open(path, 'at', encoding='utf-8') as jsonl_file:
+        jsonl_file.write(json.dumps({"url": url(3)}) + '\n')
+    adapter = InMemoryArticleLinkAdapter()
+    adapter.save_links([ArticleLink(url(i), START) for i in (0, 1)])
+
+    stats = LinkImporter(adapter, batch_size=3, write_workers=2).import_file(str(path))
+
+    assert (stats["records"], stats["imported"], stats["existing"], stats["duplicates"]) == (11, 8, 2, 1)
+    assert stats["records_per_second"] > 0
+    assert len(adapter.get_links()) == 10
+    assert adapter.get_links(url_hash=ArticleLink(url(5)).url_hash)[0].link_added_at == \
+        START + datetime.timedelta(hours=5)
+
+
+def test_interrupted_import_resumes(tmp_path):
+    """
+    Test that an import that fails on a batch continues after the last committed batch when it is run again.
+    """
+    path = tmp_path / 'links.jsonl.gz'
+    write_jsonl(path, 10)
+    progress = ImportProgress(str(tmp_path / 'progress.json'))
+    adapter = FailingAdapter(fail_on_call=3)
+    importer = LinkImporter(adapter, batch_size=3, write_workers=1, progress=progress)
+
+    with pytest.raises(RuntimeError):
+        importer.import_file(str(path))
+    assert progress.load(str(path))["records"] == 6
+
+    stats = importer.import_file(str(path))
+
+    assert (stats["resumed_from"], stats["records"], stats["imported"]) == (6, 10, 10)
+    assert len(adapter.get_links()) == 10
+    assert progress.load(str(tmp_path / 'other.jsonl')) is None
+
+
+def test_progress_is_saved_only_after_flush(tmp_path):
+    """
+    Test that a batch is not recorded in the progress file when the adapter fails to flush its writes.
+    """
+    path = tmp_path / 'links.jsonl.gz'
+    write_jsonl(path, 10)
+    progress = ImportProgress(str(tmp_path / 'progress.json'))
+    importer = LinkImporter(FailingFlushAdapter(), batch_size=3, write_workers=1, progress=progress)
+
+    with pytest.raises(RuntimeError):
+        importer.import_file(str(path))
+
+    assert progress.load(str(path)) is None
+
+
+def test_export_round_trip(tmp_path):
+    """
+    Test that an export of link_export imports into an empty adapter unchanged.
+    """
+    source = InMemoryArticleLinkAdapter()
+    source.save_links([ArticleLink(url(i), START + datetime.timedelta(hours=i)) for i in range(5)])
+    path = tmp_path / 'links.jsonl.gz'
+    export_links(source, str(path))
+    target = InMemoryArticleLinkAdapter()
+
+    LinkImporter(target).import_file(str(path))
+
+    assert sorted((link.url_hash, link.link_added_at) for link in target.get_links()) == \
+        sorted((link.url_hash, link.link_added_at) for link in source.get_links())
@@ -14,10 +14,19 @@ import re
 from unittest.mock import MagicMock, patch
 
 import pytest
+import requests
 from bs4 import BeautifulSoup
 
 from src.article_handler import ArticleLink
-from src.link_scraper import FirestoreArticleLinkAdapter, Scraper
+from src.crawl_checkpoint import FileCheckpointStore
+from src.fetch_policy import FetchPolicy
+from src.http_cache import HttpCache
+from src.known_link_index import KnownLinkIndex
+from src.known_link_snapshot import KnownLinkSnapshot
+from src.link_scraper import FirestoreArticleLinkAdapter, Scraper, create_session
+from src.metrics import MetricsRegistry
+from src.page_fingerprints import PageFingerprints
+from src.page_parser import create_page_parser
 
 # Setup logger right below imports
 logger = logging.getLogger(__name__)
@@ -73,6 +82,13 @@ def html_content_two_articles():
     """
 
 
+def saved_links(adapter):
+    """
+    Helper function that returns all ArticleLinks passed to the bulk `save_links` method of a mocked adapter.
+    """
+    return [link for call in adapter.save_links.call_args_list for link in call.args[0]]
+
+
 @pytest.fixture(name="scraper")
 def fixture_scraper():
     """
@@ -84,7 +100,7 @@ def fixture_scraper():
     return Scraper(adapter), adapter
 
 
-@patch('src.link_scraper.requests.get')
+@patch('src.link_scraper.requests.Session.get')
 def test_fetch_and_parse_page(mock_get, scraper):
     """
     Test for the `_fetch_and_parse_page_content` method of the Scraper class.
@@ -128,10 +144,26 @@ def test_extract_links_from_soup(scraper, html_cont_1, html_cont_2):
     assert result2 == ['https://magic.wizards.com/en/news/making-magic/crafting-the-ring-part-1']
 
 
+@pytest.mark.parametrize("backend", ["html.parser", "strainer", "lxml"])
+def test_parser_backends_match_full_tree(backend, html_cont_1, html_cont_2, html_content_2_links):
+    """
+    Test that every parser backend extracts the same links as the full html.parser tree of the previous
+    implementation for the sample pages.
+    """
+    reference_parser = create_page_parser('html.parser')
+    scraper_obj = Scraper(MagicMock(spec=FirestoreArticleLinkAdapter), parser=create_page_parser(backend))
+
+    for html in [html_cont_1, html_cont_2, html_content_2_links, '']:
+        expected_result = reference_parser.extract_links(BeautifulSoup(html, 'html.parser'))
+        # pylint: disable=protected-access
+        assert scraper_obj._extract_links_from_soup(scraper_obj.parser.parse(html)) == expected_result
+
+
 def test_load_known_link_ids(scraper):
     """
     Test for the `_load_known_link_ids` method of the Scraper class.
-    This method is supposed to load all known link IDs from the FirestoreArticleLinkAdapter.
+    This method is supposed to load all known link IDs from the FirestoreArticleLinkAdapter
+    through the keys-only `iter_link_hashes` method.
     """
     link1 = ArticleLink(
         'https://magic.wizards.com/en/news/announcements/'
@@ -145,13 +177,17 @@ def test_load_known_link_ids(scraper):
     )
 
     scraper_obj, adapter = scraper
-    adapter.get_links.return_value = [link1, link2]
+    adapter.iter_link_hashes.return_value = iter([link1.url_hash, link2.url_hash])
 
     # pylint: disable=protected-access
     result = scraper_obj._load_known_link_ids()
 
-    adapter.get_links.assert_called_once()
-    assert result == [link1.url_hash, link2.url_hash]
+    adapter.iter_link_hashes.assert_called_once()
+    adapter.get_links.assert_not_called()
+    assert isinstance(result, KnownLinkIndex)
+    assert len(result) == 2
+    assert link1.url_hash in result
+    assert link2.url_hash in result
 
 
 def test_create_link_info(scraper):
@@ -187,15 +223,15 @@ def test_save_new_links(scraper):
     test_save_new_links_logger = logging.getLogger('test_save_new_links')
     test_save_new_links_logger.info('Running test_save_new_links...')
 
-    scraper_obj, _ = scraper
-    known_link_ids = [
+    scraper_obj, adapter = scraper
+    known_link_ids = KnownLinkIndex(
         ArticleLink(url, datetime.datetime.now()).url_hash
         for url in [
             'https://magic.wizards.com/en/news/announcements/'
             'the-lord-of-the-rings-tales-of-middle-earth-battle-of-the-pelennor-fields',
             'https://magic.wizards.com/en/news/making-magic/crafting-the-ring-part-1'
         ]
-    ]
+    )
 
     new_links = ['https://magic.wizards.com/new_link']
 
@@ -203,9 +239,28 @@ def test_save_new_links(scraper):
     scraper_obj._save_new_links(new_links, known_link_ids)
 
     assert len(known_link_ids) == 3
+    adapter.save_links.assert_called_once()
+    assert [link.url for link in saved_links(adapter)] == new_links
+
+
+def test_save_new_links_create_if_absent():
+    """
+    Test that with create_if_absent new links are created and links stored first by another writer count as
+    existing links.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.create_links.side_effect = lambda links: links[1:]
+    scraper_obj = Scraper(adapter, create_if_absent=True)
+    new_links = ['https://magic.wizards.com/new_link_1', 'https://magic.wizards.com/new_link_2']
+
+    # pylint: disable=protected-access
+    assert not scraper_obj._save_new_links(new_links, KnownLinkIndex())
+
+    adapter.save_links.assert_not_called()
+    assert [link.url for link in adapter.create_links.call_args.args[0]] == new_links
 
 
-@patch('src.link_scraper.requests.get')
+@patch('src.link_scraper.requests.Session.get')
 def test_scrape_links(mock_get, scraper, html_content_2_links):
     """
     Test for the `scrape_links` method of the Scraper class.
@@ -214,23 +269,23 @@ def test_scrape_links(mock_get, scraper, html_content_2_links):
     """
     scraper_obj, adapter = scraper
     mock_get.side_effect = [MagicMock(text=html_content_2_links)]
-    adapter.get_links.return_value = [
+    adapter.iter_link_hashes.return_value = [
         ArticleLink(
             'https://magic.wizards.com/en/news/announcements/'
             'the-lord-of-the-rings-tales-of-middle-earth-battle-of-the-pelennor-fields',
             datetime.datetime.now()
-        )
+        ).url_hash
     ]
 
     stopped_on_existing = scraper_obj.scrape_links(1, 2)
     assert stopped_on_existing is False
     assert mock_get.call_count == 1
-    adapter.save_link.assert_called()
+    adapter.save_links.assert_called()
     # 'https://magic.wizards.com/en/news/making-magic/crafting-the-ring-part-1' is a new link
-    assert adapter.save_link.call_count == 1
+    assert len(saved_links(adapter)) == 1
 
 
-@patch('src.link_scraper.requests.get')
+@patch('src.link_scraper.requests.Session.get')
 def test_scrape_existing_links_and_stop(mock_get, scraper, html_content_2_links):
     """
     Test for the `scrape_links` method of the Scraper class.
@@ -239,23 +294,23 @@ def test_scrape_existing_links_and_stop(mock_get, scraper, html_content_2_links)
     """
     scraper_obj, adapter = scraper
     mock_get.side_effect = [MagicMock(text=html_content_2_links)]
-    adapter.get_links.return_value = [
+    adapter.iter_link_hashes.return_value = [
         ArticleLink(
             'https://magic.wizards.com/en/news/announcements/'
             'the-lord-of-the-rings-tales-of-middle-earth-battle-of-the-pelennor-fields',
             datetime.datetime.now()
-        )
+        ).url_hash
     ]
 
     stopped_on_existing = scraper_obj.scrape_links(1, 2, True)
     assert stopped_on_existing is True
     assert mock_get.call_count == 1
-    adapter.save_link.assert_called()
+    adapter.save_links.assert_called()
     # 'https://magic.wizards.com/en/news/making-magic/crafting-the-ring-part-1' is a new link
-    assert adapter.save_link.call_count == 1
+    assert len(saved_links(adapter)) == 1
 
 
-@patch('src.link_scraper.requests.get')
+@patch('src.link_scraper.requests.Session.get')
 def test_scrape_nonexisting_links_and_continue(mock_get, scraper, html_content_2_links):
     """
     Test for the `scrape_links` method of the Scraper class.
@@ -268,9 +323,322 @@ def test_scrape_nonexisting_links_and_continue(mock_get, scraper, html_content_2
     stopped_on_existing = scraper_obj.scrape_links(1, 2, True)
     assert stopped_on_existing is False
     assert mock_get.call_count == 1
-    adapter.save_link.assert_called()
-    # Known links are not used for this test, so both should have been saved (call_count == 2)
-    assert adapter.save_link.call_count == 2
+    adapter.save_links.assert_called()
+    # Known links are not used for this test, so both should have been saved
+    assert len(saved_links(adapter)) == 2
+
+
+@patch('src.link_scraper.requests.Session.get')
+def test_scrape_links_concurrently_in_page_order(mock_get, html_cont_1, html_cont_2, html_content_2_links):
+    """
+    Test for the `scrape_links` method of the Scraper class with several pages in flight.
+    Pages may complete in any order, but links have to be committed in page order.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    scraper_obj = Scraper(adapter, max_workers=3, requests_per_second=None)
+    pages = {1: html_cont_1, 2: html_cont_2, 3: html_content_2_links}
+
+    def get_side_effect(url, **_kwargs):
+        page_number = int(re.search(r'page=(\d+)', url).group(1))
+        return MagicMock(text=pages[page_number])
+
+    mock_get.side_effect = get_side_effect
+
+    stopped_on_existing = scraper_obj.scrape_links(1, 4, True)
+    assert stopped_on_existing is True
+    assert mock_get.call_count == 3
+    saved_urls = [link.url for link in saved_links(adapter)]
+    assert saved_urls == [
+        'https://magic.wizards.com/en/news/announcements/'
+        'the-lord-of-the-rings-tales-of-middle-earth-battle-of-the-pelennor-fields',
+        'https://magic.wizards.com/en/news/making-magic/crafting-the-ring-part-1'
+    ]
+
+
+@patch('src.link_scraper.requests.Session.get')
+def test_scrape_links_records_metrics(mock_get, html_content_2_links):
+    """
+    Test that a run counts pages and new and duplicate links and times every stage of the hot path.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = [
+        ArticleLink('https://magic.wizards.com/en/news/making-magic/crafting-the-ring-part-1').url_hash
+    ]
+    mock_get.return_value = MagicMock(text=html_content_2_links)
+    metrics = MetricsRegistry()
+    scraper_obj = Scraper(adapter, requests_per_second=None, metrics=metrics)
+
+    scraper_obj.scrape_links(1, 3)
+
+    assert metrics.counter('pages') == 2
+    assert metrics.counter('links_found') == 4
+    assert metrics.counter('links_new') == 1
+    assert metrics.counter('links_duplicate') == 3
+    for stage in ('sleep', 'http', 'parse', 'extract', 'dedup', 'write'):
+        assert metrics.histogram(stage).count >= 1, stage
+
+
+@patch('src.link_scraper.requests.Session.get')
+def test_run_metrics_cover_only_the_run(mock_get, html_content_2_links):
+    """
+    Test that the end-of-run summary reports the values of the run, not the lifetime totals of a registry that
+    outlives it.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = []
+    mock_get.return_value = MagicMock(text=html_content_2_links)
+    metrics = MetricsRegistry()
+    metrics.inc('pages', 10)
+    metrics.observe('http', 0.5)
+    scraper_obj = Scraper(adapter, requests_per_second=None, metrics=metrics)
+
+    scraper_obj.scrape_links(1, 2)
+
+    assert metrics.counter('pages') == 11
+    assert scraper_obj.last_run_metrics["counters"]["pages"] == 1
+    assert scraper_obj.last_run_metrics["counters"]["links_found"] == 2
+    assert scraper_obj.last_run_metrics["stages"]["http"]["count"] == 1
+
+
+def test_scraper_shares_adapter_metrics():
+    """
+    Test that a Scraper uses the metrics registry of its adapter unless one is passed in.
+    """
+    adapter = FirestoreArticleLinkAdapter(MagicMock())
+    assert Scraper(adapter).metrics is adapter.metrics
+    assert Scraper(MagicMock(spec=FirestoreArticleLinkAdapter)).metrics is not adapter.metrics
+
+
+def test_scraper_rejects_invalid_worker_count():
+    """
+    Test that the Scraper class refuses a worker pool without workers.
+    """
+    with pytest.raises(ValueError):
+        Scraper(MagicMock(spec=FirestoreArticleLinkAdapter), max_workers=0)
+
+
+def test_scraper_uses_injected_session(html_content_2_links):
+    """
+    Test that the Scraper class fetches pages through an injected session and leaves it open on close.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    session = MagicMock()
+    session.get.return_value = MagicMock(text=html_content_2_links)
+
+    with Scraper(adapter, requests_per_second=None, session=session) as scraper_obj:
+        scraper_obj.scrape_links(1, 3)
+
+    assert session.get.call_count == 2
+    assert session.get.call_args.kwargs['timeout'] == 60
+    session.close.assert_not_called()
+
+
+def test_create_session():
+    """
+    Test that `create_session` returns a keep-alive session with a pool of the requested size.
+    """
+    session = create_session(pool_size=4)
+
+    http_adapter = session.get_adapter('https://magic.wizards.com')
+    # pylint: disable=protected-access
+    assert http_adapter._pool_maxsize == 4
+    assert 'gzip' in session.headers['Accept-Encoding']
+    assert session.headers['Connection'] == 'keep-alive'
+    session.close()
+
+
+@patch('src.link_scraper.requests.Session.get')
+def test_scrape_links_updates_snapshot(mock_get, html_content_2_links):
+    """
+    Test that a Scraper with a known link snapshot syncs it before and saves it after the run.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    snapshot = MagicMock(spec=KnownLinkSnapshot)
+    snapshot.sync.return_value = KnownLinkIndex()
+    mock_get.return_value = MagicMock(text=html_content_2_links)
+
+    Scraper(adapter, requests_per_second=None, snapshot=snapshot).scrape_links(1, 2)
+
+    snapshot.sync.assert_called_once_with(adapter)
+    adapter.iter_link_hashes.assert_not_called()
+    saved_index = snapshot.save.call_args.args[0]
+    assert len(saved_index) == 2
+
+
+def http_error_response(status_code, headers=None):
+    """
+    Helper function that returns a mocked response failing with the given HTTP status code.
+    """
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.raise_for_status.side_effect = requests.HTTPError(f'{status_code} Error', response=response)
+    return response
+
+
+@patch('src.link_scraper.requests.Session.get')
+def test_fetch_retries_transient_errors(mock_get, html_content_2_links):
+    """
+    Test that throttled and failed requests are retried until the page is fetched.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    mock_get.side_effect = [
+        http_error_response(429, {'Retry-After': '0'}),
+        requests.ConnectionError('connection reset'),
+        MagicMock(text=html_content_2_links)
+    ]
+    scraper_obj = Scraper(adapter, requests_per_second=None, fetch_policy=FetchPolicy(backoff_base=0.0))
+
+    scraper_obj.scrape_links(1, 2)
+
+    assert mock_get.call_count == 3
+    assert len(saved_links(adapter)) == 2
+    assert scraper_obj.metrics.counter('retries') == 2
+    assert scraper_obj.metrics.histogram('http').count == 3
+
+
+@patch('src.link_scraper.requests.Session.get')
+def test_fetch_gives_up_after_max_retries(mock_get, html_content_2_links):
+    """
+    Test that a page is skipped after the retries are exhausted and on errors that are not retryable.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    mock_get.side_effect = [http_error_response(503)] * 3 + [
+        http_error_response(404),
+        MagicMock(text=html_content_2_links)
+    ]
+    scraper_obj = Scraper(adapter, requests_per_second=None,
+                          fetch_policy=FetchPolicy(max_retries=2, backoff_base=0.0))
+
+    # pylint: disable=protected-access
+    assert scraper_obj._fetch_and_parse_page_content(1) is None
+    assert scraper_obj._fetch_and_parse_page_content(2) is None
+    assert scraper_obj._fetch_and_parse_page_content(3) is not None
+    assert mock_get.call_count == 5
+
+
+@patch('src.link_scraper.requests.Session.get')
+def test_resume_retries_failed_pages_and_continues(mock_get, tmp_path, html_cont_1, html_cont_2):
+    """
+    Test that an interrupted run records its progress and that resuming it retries only the failed page
+    and continues after the last committed page.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = []
+    store = FileCheckpointStore(str(tmp_path / 'checkpoint.json'))
+    mock_get.side_effect = [
+        http_error_response(404),
+        MagicMock(text=html_cont_1),
+        KeyboardInterrupt()
+    ]
+    scraper_obj = Scraper(adapter, requests_per_second=None, archive_url='https://example.com/archive/{page_number}',
+                          checkpoint_store=store)
+
+    with pytest.raises(KeyboardInterrupt):
+        scraper_obj.scrape_links(1, 4)
+
+    checkpoint = store.load()
+    assert checkpoint.failed_pages == [1]
+    assert checkpoint.last_committed_page == 2
+    assert not checkpoint.completed
+    # Buffered writes are flushed before a page is recorded as committed
+    assert adapter.flush.call_count == 2
+
+    mock_get.reset_mock()
+    mock_get.side_effect = [MagicMock(text=html_cont_2), MagicMock(text='')]
+    scraper_obj.scrape_links(1, 4, resume=True)
+
+    assert [call.args[0].rsplit('/', 1)[1] for call in mock_get.call_args_list] == ['1', '3']
+    checkpoint = store.load()
+    assert checkpoint.failed_pages == []
+    assert checkpoint.last_committed_page == 3
+    assert checkpoint.completed
+
+
+@patch('src.link_scraper.requests.Session.get')
+def test_unchanged_pages_skip_parsing(mock_get, tmp_path, html_content_2_links):
+    """
+    Test that pages answered with 304 are neither parsed nor saved again and count as existing links.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = []
+    mock_get.side_effect = [
+        MagicMock(status_code=200, text=html_content_2_links, content=html_content_2_links.encode(),
+                  headers={'ETag': '"v1"'}),
+        MagicMock(status_code=304, text='', content=b'', headers={})
+    ]
+    parser = MagicMock(wraps=create_page_parser())
+    scraper_obj = Scraper(adapter, requests_per_second=None, parser=parser, http_cache=HttpCache(str(tmp_path)))
+
+    scraper_obj.scrape_links(1, 2)
+    assert scraper_obj.scrape_links(1, 2, stop_on_existing=True)
+
+    assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+    assert parser.parse.call_count == 1
+    assert len(saved_links(adapter)) == 2
+    assert scraper_obj.http_cache.stats()["hits"] == 1
+
+
+@patch('src.link_scraper.requests.Session.get')
+def test_unchanged_fingerprint_skips_saving(mock_get, html_content_2_links):
+    """
+    Test that a page with the link list of its recorded fingerprint skips the link processing and counts as
+    existing links.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = []
+    mock_get.return_value = MagicMock(text=html_content_2_links)
+    scraper_obj = Scraper(adapter, requests_per_second=None, page_fingerprints=PageFingerprints())
+
+    scraper_obj.scrape_links(1, 2)
+    with patch.object(scraper_obj, '_save_new_links') as save_new_links:
+        assert scraper_obj.scrape_links(1, 2, stop_on_existing=True)
+
+    save_new_links.assert_not_called()
+    assert len(saved_links(adapter)) == 2
+
+
+def archive_page(page_number):
+    """
+    Helper function returning the HTML of an archive page with one article link per page number.
+    """
+    return f"""
+    <article class="css-415ug css-o3Y69">
+        <a href="/en/news/article-{page_number}"><h3 class="css-9f4rq">Article {page_number}</h3></a>
+    </article>
+    """
+
+
+@pytest.mark.parametrize("boundary", [1, 2, 7, 40, 100])
+@patch('src.link_scraper.requests.Session.get')
+def test_scrape_new_links_finds_boundary(mock_get, boundary):
+    """
+    Test that scrape_new_links finds the first page with only known links in O(log n) probes and saves only the
+    links of the pages before it.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = [
+        ArticleLink(f"https://magic.wizards.com/en/news/article-{page}").url_hash for page in range(boundary, 100)
+    ]
+    mock_get.side_effect = lambda url, **_kwargs: MagicMock(text=archive_page(int(url.rsplit('/', 1)[1])))
+    scraper_obj = Scraper(adapter, max_workers=4, requests_per_second=None,
+                          archive_url='https://example.com/archive/{page_number}')
+
+    assert scraper_obj.scrape_new_links(1, 100) == boundary
+
+    assert [link.url for link in saved_links(adapter)] == [
+        f"https://magic.wizards.com/en/news/article-{page}" for page in range(1, boundary)
+    ]
+    probes = mock_get.call_count - (boundary - 1)
+    assert probes <= 2 * 7 + 1
+
+
+def test_resume_requires_checkpoint_store():
+    """
+    Test that resuming without a checkpoint store is rejected.
+    """
+    scraper_obj = Scraper(MagicMock(spec=FirestoreArticleLinkAdapter))
+
+    with pytest.raises(ValueError):
+        scraper_obj.scrape_links(1, 2, resume=True)
 
 
 # Check if link format is valid
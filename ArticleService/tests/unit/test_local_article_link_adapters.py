@@ -0,0 +1,139 @@
+# test_local_article_link_adapters.py
+"""
+Test module for the InMemoryArticleLinkAdapter and SqliteArticleLinkAdapter classes. Both adapters run the same
+contract tests; the SQLite database is written to a temporary directory provided by pytest.
+"""
+
+import datetime
+import logging
+import threading
+
+import pytest
+
+from src.article_handler import ArticleLink, copy_links
+from src.memory_article_link_adapter import InMemoryArticleLinkAdapter
+from src.sqlite_article_link_adapter import MAX_VARIABLES, SqliteArticleLinkAdapter
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+START = datetime.datetime(2023, 5, 1, 12, 0, 0)
+
+
+def article_link(i):
+    """
+    Helper function returning a numbered ArticleLink added i hours after START.
+    """
+    return ArticleLink(f"https://magic.wizards.com/en/news/article-{i}", START + datetime.timedelta(hours=i))
+
+
+@pytest.fixture(name="adapter", params=["memory", "sqlite"])
+def fixture_adapter(request, tmp_path):
+    """
+    Pytest fixture that returns each local adapter, with a page size small enough to read several pages.
+    """
+    if request.param == "memory":
+        yield InMemoryArticleLinkAdapter()
+    else:
+        with SqliteArticleLinkAdapter(str(tmp_path / 'links.db'), page_size=2) as adapter:
+            yield adapter
+
+
+def test_save_and_get_links(adapter):
+    """
+    Test that saved links are returned by hash and in full, and that saving a link again replaces it.
+    """
+    adapter.save_link(article_link(0))
+    adapter.save_links([article_link(i) for i in range(1, 5)])
+    adapter.save_link(ArticleLink(article_link(0).url, START - datetime.timedelta(days=1)))
+
+    links = adapter.get_links(url_hash=article_link(3).url_hash)
+    assert [(link.url, link.link_added_at) for link in links] == [(article_link(3).url, article_link(3).link_added_at)]
+    assert sorted(link.url_hash for link in adapter.get_links()) == sorted(article_link(i).url_hash for i in range(5))
+    assert sorted(adapter.iter_link_hashes()) == sorted(article_link(i).url_hash for i in range(5))
+    assert adapter.get_links(url_hash=article_link(9).url_hash) == []
+
+
+def test_existing_hashes(adapter):
+    """
+    Test that existing_hashes returns only the stored hashes, across several lookup pages.
+    """
+    adapter.save_links([article_link(i) for i in range(3)])
+    url_hashes = [article_link(i).url_hash for i in range(6)]
+
+    assert adapter.existing_hashes(url_hashes) == set(url_hashes[:3])
+    assert adapter.existing_hashes([]) == set()
+
+
+def test_sqlite_existing_hashes_binds_at_most_max_variables(tmp_path):
+    """
+    Test that the SQLite lookup binds at most MAX_VARIABLES parameters per query, whatever the page size.
+    """
+    with SqliteArticleLinkAdapter(str(tmp_path / 'links.db'), page_size=5000) as adapter:
+        adapter.save_links([article_link(i) for i in range(3)])
+        url_hashes = [article_link(i).url_hash for i in range(2500)]
+        fetch = adapter._fetch  # pylint: disable=protected-access
+        parameter_counts = []
+
+        def counting_fetch(sql, parameters):
+            parameter_counts.append(len(parameters))
+            return fetch(sql, parameters)
+
+        adapter._fetch = counting_fetch  # pylint: disable=protected-access
+
+        assert adapter.existing_hashes(url_hashes) == set(url_hashes[:3])
+    assert parameter_counts == [MAX_VARIABLES, MAX_VARIABLES, 2500 - 2 * MAX_VARIABLES]
+
+
+def test_get_links_by_date_range(adapter):
+    """
+    Test that date range queries include both bounds and return the links in the order they were added.
+    """
+    adapter.save_links([article_link(i) for i in range(6)])
+
+    links = adapter.get_links(start_date=article_link(1).link_added_at, end_date=article_link(4).link_added_at)
+
+    assert [link.url for link in links] == [article_link(i).url for i in range(1, 5)]
+
+
+def test_create_links_keeps_existing(adapter):
+    """
+    Test that create_links only stores and returns the links that are not stored yet.
+    """
+    adapter.save_link(ArticleLink(article_link(0).url, START - datetime.timedelta(days=1)))
+
+    created = adapter.create_links([article_link(0), article_link(1)])
+
+    assert [link.url for link in created] == [article_link(1).url]
+    assert adapter.get_links(url_hash=article_link(0).url_hash)[0].link_added_at == START - datetime.timedelta(days=1)
+
+
+def test_concurrent_create_links(adapter):
+    """
+    Test that concurrent writers create every link exactly once.
+    """
+    links = [article_link(i) for i in range(50)]
+    created = []
+
+    def create():
+        created.extend(adapter.create_links(links))
+
+    threads = [threading.Thread(target=create) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(link.url for link in created) == sorted(link.url for link in links)
+
+
+def test_copy_links(adapter):
+    """
+    Test that copy_links creates the links of one adapter in another in batches.
+    """
+    target = InMemoryArticleLinkAdapter()
+    target.save_link(article_link(0))
+    adapter.save_links([article_link(i) for i in range(5)])
+
+    assert copy_links(adapter, target, batch_size=2) == 4
+    assert len(target) == 5
@@ -0,0 +1,114 @@
+# test_metrics.py
+"""
+Test module for the Histogram and MetricsRegistry classes.
+"""
+
+import json
+import logging
+
+import pytest
+
+from src.metrics import Histogram, MetricsRegistry
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+
+def test_histogram_buckets_and_quantiles():
+    """
+    Test that values fall into the first bucket whose bound they do not exceed and that quantiles are estimated
+    from the bucket bounds, capped by the maximum.
+    """
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative_counts() == [2, 3, 4]
+    assert (histogram.count, histogram.sum, histogram.max) == (4, 3.65, 3.0)
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(0.99) == 3.0
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_registry_counts_and_times_stages():
+    """
+    Test that counters accumulate and that timed blocks are recorded in the histogram of their stage.
+    """
+    metrics = MetricsRegistry()
+    metrics.inc('pages')
+    metrics.inc('links_found', 24)
+    metrics.inc('links_found', 24)
+    with metrics.time('parse'):
+        pass
+    metrics.observe('http', 0.2)
+
+    assert metrics.counter('pages') == 1
+    assert metrics.counter('links_found') == 48
+    assert metrics.counter('retries') == 0
+    assert metrics.histogram('parse').count == 1
+    assert metrics.histogram('dedup') is None
+
+
+def test_openmetrics_export():
+    """
+    Test that the export holds every counter as a counter family and every stage as cumulative histogram buckets.
+    """
+    metrics = MetricsRegistry(namespace='test', buckets=(0.1, 1.0))
+    metrics.inc('pages', 2)
+    metrics.observe('http', 0.05)
+    metrics.observe('http', 0.5)
+
+    lines = metrics.to_openmetrics().splitlines()
+
+    assert '# TYPE test_pages counter' in lines
+    assert 'test_pages_total 2' in lines
+    assert 'test_retries_total 0' in lines
+    assert '# TYPE test_stage_seconds histogram' in lines
+    assert 'test_stage_seconds_bucket{stage="http",le="0.1"} 1' in lines
+    assert 'test_stage_seconds_bucket{stage="http",le="1.0"} 2' in lines
+    assert 'test_stage_seconds_bucket{stage="http",le="+Inf"} 2' in lines
+    assert 'test_stage_seconds_count{stage="http"} 2' in lines
+    assert lines[-1] == '# EOF'
+
+
+def test_write_summary(tmp_path):
+    """
+    Test that the JSON summary holds the counters and the summarised stage timings.
+    """
+    metrics = MetricsRegistry()
+    metrics.inc('firestore_writes', 3)
+    metrics.observe('write', 0.01)
+    path = tmp_path / 'metrics.json'
+
+    metrics.write_summary(str(path))
+
+    with open(path, 'r', encoding='utf-8') as summary_file:
+        summary = json.load(summary_file)
+    assert summary == json.loads(metrics.to_json())
+    assert summary["counters"]["firestore_writes"] == 3
+    assert summary["stages"]["write"]["count"] == 1
+    assert summary["stages"]["write"]["max_seconds"] == 0.01
+
+
+def test_since_snapshot():
+    """
+    Test that since() returns only the counters and stage timings recorded after the snapshot.
+    """
+    metrics = MetricsRegistry()
+    metrics.inc('pages', 5)
+    metrics.observe('http', 2.0)
+    snapshot = metrics.snapshot()
+    metrics.inc('pages', 2)
+    metrics.observe('http', 0.003)
+    metrics.observe('parse', 0.01)
+
+    run = metrics.since(snapshot)
+
+    assert run.counter('pages') == 2
+    assert snapshot.counter('pages') == 5
+    assert run.histogram('http').count == 1
+    assert run.histogram('http').sum == pytest.approx(0.003)
+    # The maximum of the run is estimated as the bound of its highest bucket, not the lifetime maximum of 2.0
+    assert run.histogram('http').max == pytest.approx(0.005)
+    assert run.histogram('parse').count == 1
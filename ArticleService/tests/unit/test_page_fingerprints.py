@@ -0,0 +1,53 @@
+# test_page_fingerprints.py
+"""
+Test module for the PageFingerprints class. The fingerprints are written to a temporary directory provided
+by pytest.
+"""
+
+import logging
+
+from src.page_fingerprints import PageFingerprints, fingerprint_links
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+LINKS = ['https://magic.wizards.com/en/news/article-1', 'https://magic.wizards.com/en/news/article-2']
+
+
+def test_fingerprint_depends_on_links_and_order():
+    """
+    Test that the fingerprint changes with the links of a page and their order.
+    """
+    assert fingerprint_links(LINKS) == fingerprint_links(list(LINKS))
+    assert fingerprint_links(LINKS) != fingerprint_links(LINKS[:1])
+    assert fingerprint_links(LINKS) != fingerprint_links(LINKS[::-1])
+
+
+def test_record_and_match():
+    """
+    Test that a recorded fingerprint matches only the same page.
+    """
+    fingerprints = PageFingerprints()
+    fingerprint = fingerprint_links(LINKS)
+    assert not fingerprints.matches(1, fingerprint)
+
+    fingerprints.record(1, fingerprint)
+    fingerprints.save()
+
+    assert fingerprints.matches(1, fingerprint)
+    assert not fingerprints.matches(2, fingerprint)
+
+
+def test_fingerprints_survive_restart(tmp_path):
+    """
+    Test that saved fingerprints are loaded again and an unreadable file is ignored.
+    """
+    path = tmp_path / 'fingerprints.json'
+    fingerprints = PageFingerprints(str(path))
+    fingerprints.record(7, fingerprint_links(LINKS))
+    fingerprints.save()
+
+    assert PageFingerprints(str(path)).matches(7, fingerprint_links(LINKS))
+
+    path.write_text('[1, 2', encoding='utf-8')
+    assert len(PageFingerprints(str(path))) == 0
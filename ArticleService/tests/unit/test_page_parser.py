@@ -0,0 +1,56 @@
+# test_page_parser.py
+"""
+Test module for the parser backends of archive pages
+"""
+
+import logging
+
+import pytest
+
+from src.page_parser import LxmlPageParser, SoupPageParser, create_page_parser
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+PAGE = """
+<html><body>
+    <nav><a href="/en/news/archive">Archive</a></nav>
+    <article class="css-415ug css-o3Y69">
+        <div><h3>No link in this one</h3></div>
+    </article>
+    <article class="css-415ug css-o3Y69">
+        <a href="https://example.com/external">External</a>
+    </article>
+    <article class="css-415ug">
+        <a href="/en/news/other-class">Other class</a>
+    </article>
+    <article class="css-415ug css-o3Y69">
+        <div><a href="/en/news/first">First</a></div>
+        <a href="/en/news/second">Second</a>
+    </article>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize("parser", [
+    SoupPageParser(),
+    SoupPageParser(only_articles=True),
+    SoupPageParser(features='lxml', only_articles=True),
+    LxmlPageParser()
+])
+def test_extract_links_edge_cases(parser):
+    """
+    Test that every backend only takes the first relative link of each matching article
+    """
+    assert parser.extract_links(parser.parse(PAGE)) == ['https://magic.wizards.com/en/news/first']
+
+
+def test_create_page_parser():
+    """
+    Test the selection of parser backends by name
+    """
+    assert isinstance(create_page_parser('lxml'), LxmlPageParser)
+    assert create_page_parser('html.parser').parse_only is None
+    assert create_page_parser().parse_only is not None
+    with pytest.raises(ValueError):
+        create_page_parser('selectolax')
@@ -0,0 +1,190 @@
+# test_profiling.py
+"""
+Test module for the RunProfiler and StackSampler classes. Profiled runs scrape mocked pages with a Scraper and
+write their artifacts to a temporary directory provided by pytest.
+"""
+
+import cProfile
+import logging
+import pstats
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.link_scraper import FirestoreArticleLinkAdapter, Scraper
+from src.profiling import PROFILE_ALL_THREADS, PROFILE_DIR_ENV, RunProfiler, StackSampler
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PAGE = """
+<article class="css-415ug css-o3Y69">
+    <a href="/en/news/making-magic/crafting-the-ring-part-1"><h3 class="css-9f4rq">Crafting the Ring</h3></a>
+</article>
+"""
+
+
+def slow_get(*_args, **_kwargs):
+    """
+    Helper function answering a request after a short delay, so the stack sampler takes samples.
+    """
+    time.sleep(0.01)
+    return MagicMock(text=ARCHIVE_PAGE)
+
+
+class ExclusiveProfile(cProfile.Profile):
+    """
+    Profile that, like cProfile from Python 3.12, refuses to be enabled while another profile is active.
+    """
+    active = 0
+
+    def enable(self, *args, **kwargs):
+        if ExclusiveProfile.active:
+            raise ValueError('Another profiling tool is already active')
+        super().enable(*args, **kwargs)
+        ExclusiveProfile.active += 1
+        self.enabled = True  # pylint: disable=attribute-defined-outside-init
+
+    def disable(self):
+        super().disable()
+        if getattr(self, 'enabled', False):
+            ExclusiveProfile.active -= 1
+            self.enabled = False  # pylint: disable=attribute-defined-outside-init
+
+
+def call_count(stats_path, function_name, file_suffix=''):
+    """
+    Helper function returning how often a function was called in a pstats file.
+    """
+    stats = pstats.Stats(stats_path).stats  # pylint: disable=no-member
+    return sum(calls for (file_name, _, name), (_, calls, _, _, _) in stats.items()
+               if name == function_name and file_name.endswith(file_suffix))
+
+
+def test_from_env():
+    """
+    Test that the profiler is only enabled by the environment when a directory is set.
+    """
+    assert RunProfiler.from_env({}) is None
+    profiler = RunProfiler.from_env({
+        PROFILE_DIR_ENV: '/tmp/profiles',
+        'ARTICLE_SERVICE_PROFILE_SAMPLE_EVERY': '10',
+        'ARTICLE_SERVICE_PROFILE_MEMORY': '0'
+    })
+    assert (profiler.directory, profiler.sample_every, profiler.trace_memory) == ('/tmp/profiles', 10, False)
+    with pytest.raises(ValueError):
+        RunProfiler('/tmp/profiles', sample_every=0)
+
+
+def test_scraper_profiling_is_opt_in(monkeypatch, tmp_path):
+    """
+    Test that a Scraper only has a profiler when it is passed in or configured in the environment.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    monkeypatch.delenv(PROFILE_DIR_ENV, raising=False)
+    assert Scraper(adapter).profiler is None
+    monkeypatch.setenv(PROFILE_DIR_ENV, str(tmp_path))
+    assert Scraper(adapter).profiler.directory == str(tmp_path)
+
+
+@patch('src.link_scraper.requests.Session.get', side_effect=slow_get)
+def test_profiled_run_writes_artifacts(_mock_get, tmp_path):
+    """
+    Test that a profiled run merges the profiles of the worker threads and writes stack samples and allocations.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = []
+    profiler = RunProfiler(str(tmp_path), sample_interval=0.001)
+    scraper_obj = Scraper(adapter, max_workers=2, requests_per_second=None, profiler=profiler)
+
+    scraper_obj.scrape_links(1, 5)
+
+    assert set(profiler.artifacts) == {"pstats", "collapsed", "memory"}
+    assert call_count(profiler.artifacts["pstats"], '_fetch_page_text') == 4
+    assert call_count(profiler.artifacts["pstats"], '_save_new_links') == 4
+    with open(profiler.artifacts["collapsed"], 'r', encoding='utf-8') as collapsed_file:
+        lines = collapsed_file.read().splitlines()
+    assert lines
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any('link_scraper.py:' in line for line in lines)
+    with open(profiler.artifacts["memory"], 'r', encoding='utf-8') as memory_file:
+        assert memory_file.readline().startswith('Traced memory')
+
+
+@patch('src.link_scraper.requests.Session.get', side_effect=slow_get)
+def test_sampled_run_profiles_every_nth_page(_mock_get, tmp_path):
+    """
+    Test that a sampled run only profiles every n-th page and the load of the known links.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = []
+    profiler = RunProfiler(str(tmp_path), sample_every=2, trace_memory=False)
+    scraper_obj = Scraper(adapter, max_workers=2, requests_per_second=None, profiler=profiler)
+
+    scraper_obj.scrape_links(1, 5)
+
+    assert set(profiler.artifacts) == {"pstats", "collapsed"}
+    fetches = call_count(profiler.artifacts["pstats"], '_fetch_page_text')
+    saves = call_count(profiler.artifacts["pstats"], '_save_new_links')
+    # From Python 3.12 pages that are processed while a sampled page is profiled are profiled too
+    assert (fetches >= 2 and saves >= 2) if PROFILE_ALL_THREADS else (fetches == 2 and saves == 2)
+    assert call_count(profiler.artifacts["pstats"], '__init__', 'known_link_index.py') == 1
+
+
+@pytest.mark.parametrize("sample_every", [None, 2])
+@patch('src.link_scraper.requests.Session.get', side_effect=slow_get)
+def test_all_threads_profile_is_never_nested(_mock_get, tmp_path, monkeypatch, sample_every):
+    """
+    Test that with the single all-thread profile of Python 3.12, no profile is enabled while another is active.
+    """
+    monkeypatch.setattr('src.profiling.PROFILE_ALL_THREADS', True)
+    monkeypatch.setattr('src.profiling.cProfile.Profile', ExclusiveProfile)
+    warning = MagicMock()
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = []
+    profiler = RunProfiler(str(tmp_path), sample_every=sample_every, trace_memory=False)
+    profiler.logger.warning = warning
+    scraper_obj = Scraper(adapter, max_workers=2, requests_per_second=None, profiler=profiler)
+
+    scraper_obj.scrape_links(1, 5)
+
+    warning.assert_not_called()
+    assert ExclusiveProfile.active == 0
+    assert set(profiler.artifacts) == {"pstats", "collapsed"}
+    assert call_count(profiler.artifacts["pstats"], '_save_new_links') >= 2
+    adapter.save_links.assert_called_once()
+
+
+@patch('src.link_scraper.requests.Session.get', side_effect=slow_get)
+def test_profiler_error_does_not_break_run(_mock_get, tmp_path):
+    """
+    Test that a run continues without cProfile statistics when the profiler cannot be enabled.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = []
+    profiler = RunProfiler(str(tmp_path), trace_memory=False)
+    scraper_obj = Scraper(adapter, max_workers=2, requests_per_second=None, profiler=profiler)
+
+    with patch('src.profiling.cProfile.Profile.enable', side_effect=ValueError('Another profiling tool is active')):
+        scraper_obj.scrape_links(1, 5)
+
+    adapter.save_links.assert_called_once()
+    assert set(profiler.artifacts) == {"collapsed"}
+
+
+def test_stack_sampler_collapses_stacks(tmp_path):
+    """
+    Test that the sampler writes one line per distinct stack with the thread name as root frame.
+    """
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    time.sleep(0.05)
+    sampler.stop()
+    path = tmp_path / 'stacks.collapsed'
+
+    sampler.write(str(path))
+
+    with open(path, 'r', encoding='utf-8') as collapsed_file:
+        lines = collapsed_file.read().splitlines()
+    assert any(line.startswith('MainThread;') and 'test_profiling.py:' in line for line in lines)
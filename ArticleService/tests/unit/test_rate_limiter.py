@@ -0,0 +1,52 @@
+# test_rate_limiter.py
+"""
+Test module for the RateLimiter class
+"""
+
+import logging
+import time
+
+import pytest
+
+from src.rate_limiter import RateLimiter
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+
+def test_acquire_spaces_requests():
+    """
+    Test that consecutive acquisitions are spaced by the configured interval
+    """
+    rate_limiter = RateLimiter(requests_per_second=20)
+
+    start_time = time.monotonic()
+    for _ in range(3):
+        rate_limiter.acquire()
+    elapsed_time = time.monotonic() - start_time
+
+    # The first slot is free, the next two wait 0.05s each
+    assert elapsed_time >= 0.09
+
+
+def test_acquire_without_budget_does_not_wait():
+    """
+    Test that a limiter without a requests per second budget never waits
+    """
+    rate_limiter = RateLimiter(requests_per_second=None)
+
+    assert all(rate_limiter.acquire() == 0.0 for _ in range(100))
+
+
+@pytest.mark.parametrize("requests_per_second", [-1, 0, 0.0])
+def test_non_positive_budget_is_rejected(requests_per_second):
+    """
+    Test that a zero or negative requests per second budget raises a ValueError instead of disabling the limit
+    """
+    with pytest.raises(ValueError):
+        RateLimiter(requests_per_second=requests_per_second)
+
+    rate_limiter = RateLimiter(requests_per_second=1.0)
+    with pytest.raises(ValueError):
+        rate_limiter.set_rate(requests_per_second)
+    assert rate_limiter.requests_per_second == pytest.approx(1.0)
@@ -0,0 +1,96 @@
+# test_scrape_pipeline.py
+"""
+Test module for the ScrapePipeline class. The HTTP session and the adapter are mocked.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src.firestore_article_link_adapter import FirestoreArticleLinkAdapter
+from src.link_scraper import Scraper
+from src.scrape_pipeline import ScrapePipeline
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+
+def archive_page(page_number):
+    """
+    Helper function returning the HTML of an archive page with two article links per page number.
+    """
+    return "".join(f"""
+    <article class="css-415ug css-o3Y69">
+        <a href="/en/news/article-{page_number}-{i}"><h3 class="css-9f4rq">Article {page_number}</h3></a>
+    </article>
+    """ for i in range(2))
+
+
+def fetch_page(url, **_kwargs):
+    """
+    Helper function answering a request for an archive page, failing page 3 with a 404 response.
+    """
+    page_number = int(url.rsplit('/', 1)[1])
+    if page_number == 3:
+        response = MagicMock(status_code=404, headers={})
+        response.raise_for_status.side_effect = requests.HTTPError('404 Error', response=response)
+        return response
+    return MagicMock(text=archive_page(page_number))
+
+
+@pytest.fixture(name="adapter")
+def fixture_adapter():
+    """
+    Pytest fixture that returns a mocked adapter without stored links.
+    """
+    adapter = MagicMock(spec=FirestoreArticleLinkAdapter)
+    adapter.iter_link_hashes.return_value = []
+    return adapter
+
+
+@pytest.mark.parametrize("parse_processes", [None, 1])
+@patch('src.link_scraper.requests.Session.get', side_effect=fetch_page)
+def test_pipeline_saves_links_of_every_page(_mock_get, adapter, parse_processes):
+    """
+    Test that the pipeline saves the links of every fetched page once and reports the metrics of its stages.
+    """
+    scraper_obj = Scraper(adapter, requests_per_second=None, archive_url='https://example.com/archive/{page_number}')
+    pipeline = ScrapePipeline(scraper_obj, fetch_workers=3, parse_workers=2, write_workers=2, queue_size=2,
+                              parse_processes=parse_processes)
+
+    metrics = pipeline.run(1, 9)
+
+    urls = sorted(link.url for call in adapter.save_links.call_args_list for link in call.args[0])
+    assert urls == sorted(
+        f"https://magic.wizards.com/en/news/article-{page}-{i}" for page in range(1, 9) if page != 3 for i in range(2)
+    )
+    assert metrics["fetch"]["processed"] == 8
+    assert metrics["fetch"]["failed"] == 1
+    assert metrics["parse"]["processed"] == 7
+    assert metrics["write"]["processed"] == 7
+    assert metrics["write"]["max_queue_depth"] <= 2
+    assert metrics["write"]["queue_depth"] == 0
+
+
+@patch('src.link_scraper.requests.Session.get', side_effect=fetch_page)
+def test_parse_pool_spawns_its_workers(_mock_get, adapter):
+    """
+    Test that the parse pool spawns its workers instead of forking the multi-threaded pipeline process.
+    """
+    scraper_obj = Scraper(adapter, requests_per_second=None, archive_url='https://example.com/archive/{page_number}')
+
+    with patch('src.scrape_pipeline.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as mock_pool:
+        ScrapePipeline(scraper_obj, parse_processes=1).run(1, 3)
+
+    assert mock_pool.call_args.kwargs["mp_context"].get_start_method() == 'spawn'
+
+
+def test_pipeline_rejects_invalid_workers(adapter):
+    """
+    Test that stages without workers are rejected.
+    """
+    with pytest.raises(ValueError):
+        ScrapePipeline(Scraper(adapter), parse_workers=0)
@@ -0,0 +1,120 @@
+# test_shard_coordinator.py
+"""
+Test module for the ShardCoordinator class and the page range sharding helpers. The scrapers are mocked, and
+the process pool is replaced by a thread pool so the mocks do not have to be pickled.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.fetch_policy import AdaptiveRateController, FetchPolicy
+from src.link_scraper import Scraper
+from src.rate_limiter import RateLimiter
+from src.shard_coordinator import (ShardCoordinator, run_shard, share_rate_limit, split_page_range,
+                                   task_shard_from_env)
+
+# Setup logger right below imports
+logger = logging.getLogger(__name__)
+
+
+def mock_scraper_factory():
+    """
+    Helper function returning a scraper factory and the mocked scrapers it created, keyed by shard index.
+    Every scraper has a rate limit of 6 requests per second.
+    """
+    scrapers = {}
+
+    def scraper_factory(shard_index):
+        scraper = MagicMock()
+        scraper.__enter__.return_value = scraper
+        scraper.rate_limiter = RateLimiter(6.0)
+        scraper.fetch_policy = FetchPolicy()
+        scrapers[shard_index] = scraper
+        return scraper
+
+    return scraper_factory, scrapers
+
+
+def test_split_page_range():
+    """
+    Test that the page range is split into contiguous shards whose sizes differ by at most one.
+    """
+    assert split_page_range(1, 11, 3) == [(1, 5), (5, 8), (8, 11)]
+    assert split_page_range(1, 3, 4) == [(1, 2), (2, 3), (3, 3), (3, 3)]
+    with pytest.raises(ValueError):
+        split_page_range(1, 10, 0)
+
+
+def test_task_shard_from_env():
+    """
+    Test that the task index and count are read from the Cloud Run environment.
+    """
+    assert task_shard_from_env({}) == (0, 1)
+    assert task_shard_from_env({'CLOUD_RUN_TASK_INDEX': '2', 'CLOUD_RUN_TASK_COUNT': '4'}) == (2, 4)
+    with pytest.raises(ValueError):
+        task_shard_from_env({'CLOUD_RUN_TASK_INDEX': '4', 'CLOUD_RUN_TASK_COUNT': '4'})
+
+
+def test_run_shard_writes_create_if_absent():
+    """
+    Test that a shard scrapes its page range with create-if-absent writes and closes its scraper.
+    """
+    scraper_factory, scrapers = mock_scraper_factory()
+
+    run_shard(scraper_factory, 1, 5, 8)
+
+    assert scrapers[1].create_if_absent is True
+    scrapers[1].scrape_links.assert_called_once_with(5, 8)
+    scrapers[1].__exit__.assert_called_once()
+
+
+@patch('src.shard_coordinator.ProcessPoolExecutor', ThreadPoolExecutor)
+def test_run_local_runs_every_shard():
+    """
+    Test that run_local runs one scraper per non-empty shard.
+    """
+    scraper_factory, scrapers = mock_scraper_factory()
+
+    ShardCoordinator(scraper_factory).run_local(1, 4, 4)
+
+    assert sorted(scrapers) == [0, 1, 2]
+    assert [scrapers[i].scrape_links.call_args.args for i in range(3)] == [(1, 2), (2, 3), (3, 4)]
+    # Three shards run at once, so each gets a third of the rate limit
+    assert all(scrapers[i].rate_limiter.requests_per_second == pytest.approx(2.0) for i in range(3))
+
+
+@patch.dict('os.environ', {'CLOUD_RUN_TASK_INDEX': '1', 'CLOUD_RUN_TASK_COUNT': '2'})
+def test_run_task_runs_its_shard():
+    """
+    Test that run_task scrapes only the shard of its task index.
+    """
+    scraper_factory, scrapers = mock_scraper_factory()
+
+    ShardCoordinator(scraper_factory).run_task(1, 11)
+
+    assert list(scrapers) == [1]
+    scrapers[1].scrape_links.assert_called_once_with(6, 11)
+    assert scrapers[1].rate_limiter.requests_per_second == pytest.approx(3.0)
+
+
+def test_share_rate_limit_divides_budget():
+    """
+    Test that a shard's scraper gets its share of the requests per second and of the adaptive rate bounds,
+    and that a scraper without a limit stays unlimited.
+    """
+    rate_controller = AdaptiveRateController(min_requests_per_second=0.4, max_requests_per_second=4.0)
+    with Scraper(MagicMock(), requests_per_second=2.0, fetch_policy=FetchPolicy(rate_controller=rate_controller)) \
+            as scraper:
+        share_rate_limit(scraper, 4)
+
+        assert scraper.rate_limiter.requests_per_second == pytest.approx(0.5)
+        assert rate_controller.min_requests_per_second == pytest.approx(0.1)
+        assert rate_controller.max_requests_per_second == pytest.approx(1.0)
+
+    with Scraper(MagicMock(), requests_per_second=None) as scraper:
+        share_rate_limit(scraper, 4)
+
+        assert scraper.rate_limiter.requests_per_second is None